@@ -0,0 +1,125 @@
+# build_dataset.py vs the old prepare_dataset.py loop on a synthetic tree (default 25k images + 25k labels).
+# Usage: python ai/scripts/prepare_data/bench_build_dataset.py [--pairs 25000] [--classes 5] [--kb 40]
+# Runs: old serial listdir / exists / shutil.copy, build_dataset with copies, build_dataset with links
+# (cold), a rerun with nothing changed, and a rerun after 1% of the images changed. "new disk" is the
+# space the output takes on top of the source tree (hardlinked / reflinked files take none).
+import argparse
+import contextlib
+import io
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import build_dataset
+
+
+def make_tree(root, classes, pairs, kb):
+    blob = os.urandom(kb * 1024)
+    label = b"0 0.500000 0.500000 0.250000 0.300000\n"
+    for c in range(classes):
+        img_dir = os.path.join(root, "images", f"class{c}")
+        lbl_dir = os.path.join(root, "labels", f"class{c}")
+        os.makedirs(img_dir)
+        os.makedirs(lbl_dir)
+        for i in range(pairs // classes):
+            name = f"c{c}_{i:06d}"
+            with open(os.path.join(img_dir, name + ".jpg"), "wb") as f:
+                f.write(blob)
+            with open(os.path.join(lbl_dir, name + ".txt"), "wb") as f:
+                f.write(label)
+    return [f"class{c}" for c in range(classes)]
+
+
+def legacy(images_root, labels_root, out_dir, classes):
+    """prepare_dataset.py as it was: listdir, exists per label, shuffle, serial shutil.copy."""
+    for split in ["train", "val", "test"]:
+        os.makedirs(os.path.join(out_dir, "images", split), exist_ok=True)
+        os.makedirs(os.path.join(out_dir, "labels", split), exist_ok=True)
+    for class_name in classes:
+        img_folder = os.path.join(images_root, class_name)
+        lbl_folder = os.path.join(labels_root, class_name)
+        paired_list = []
+        for img in sorted(os.listdir(img_folder)):
+            label_path = os.path.join(lbl_folder, os.path.splitext(img)[0] + ".txt")
+            if not os.path.exists(label_path):
+                continue
+            paired_list.append((os.path.join(img_folder, img), label_path))
+        random.shuffle(paired_list)
+        train_end = int(len(paired_list) * 0.7)
+        splits = {"train": paired_list[:train_end], "val": paired_list[train_end:]}
+        for split_name, items in splits.items():
+            for img_path, lbl_path in items:
+                shutil.copy(img_path, os.path.join(out_dir, "images", split_name, os.path.basename(img_path)))
+                shutil.copy(lbl_path, os.path.join(out_dir, "labels", split_name, os.path.basename(lbl_path)))
+
+
+def new_disk_mb(out_dir, source_inodes):
+    total = 0
+    for root, _, files in os.walk(out_dir):
+        for name in files:
+            st = os.stat(os.path.join(root, name))
+            if st.st_ino not in source_inodes:
+                total += st.st_blocks * 512
+    return total / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pairs", type=int, default=25000, help="image + label pairs (2x files)")
+    parser.add_argument("--classes", type=int, default=5)
+    parser.add_argument("--kb", type=int, default=40, help="image file size")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--dir", help="where to build the tree (default: a temp dir)")
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="bench-dataset-", dir=args.dir)
+    try:
+        t0 = time.perf_counter()
+        classes = make_tree(root, args.classes, args.pairs, args.kb)
+        images, labels = os.path.join(root, "images"), os.path.join(root, "labels")
+        print(f"Synthetic tree: {args.pairs * 2} files in {args.classes} classes, {args.kb} KB images "
+              f"({time.perf_counter() - t0:.1f}s to create)")
+        source_inodes = {os.stat(os.path.join(d, f)).st_ino for d, _, fs in os.walk(root) for f in fs}
+
+        build_dataset.SPLIT_RATIOS = {"train": 0.7, "val": 0.3, "test": 0.0}
+        rows = []
+
+        def run(name, fn, out):
+            t = time.perf_counter()
+            counts = fn()
+            rows.append((name, time.perf_counter() - t, new_disk_mb(out, source_inodes), counts))
+
+        out = os.path.join(root, "out-legacy")
+        run("old prepare_dataset.py", lambda: legacy(images, labels, out, classes), out)
+        shutil.rmtree(out)
+
+        def build(out, link):
+            with contextlib.redirect_stdout(io.StringIO()):
+                return build_dataset.build("split", 0, link, args.workers, images, labels, out, classes=classes)
+
+        out = os.path.join(root, "out-copy")
+        run("build_dataset --link copy", lambda: build(out, "copy"), out)
+        shutil.rmtree(out)
+
+        out = os.path.join(root, "out")
+        run("build_dataset (cold)", lambda: build(out, "auto"), out)
+        run("rerun, nothing changed", lambda: build(out, "auto"), out)
+        changed = sorted(os.listdir(os.path.join(images, classes[0])))[:max(1, args.pairs // 100)]
+        for name in changed:
+            os.utime(os.path.join(images, classes[0], name))
+        run(f"rerun, {len(changed)} images changed", lambda: build(out, "auto"), out)
+
+        print(f"\n{'run':<28} {'time s':>8} {'files/s':>9} {'new disk MB':>12}  actions")
+        for name, secs, mb, counts in rows:
+            actions = ", ".join(f"{k} {v}" for k, v in (counts or {}).items() if v)
+            print(f"{name:<28} {secs:>8.2f} {args.pairs * 2 / secs:>9.0f} {mb:>12.1f}  {actions}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
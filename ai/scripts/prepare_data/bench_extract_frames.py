@@ -0,0 +1,101 @@
+# extract_frames.py vs the old read-every-frame loop on synthetic clips like data_recorder.py's (MJPG, 20 fps).
+# Usage: python ai/scripts/prepare_data/bench_extract_frames.py [--clips 40] [--frames 100] [--step 4]
+# Each clip is a textured scene with sensor noise; an object moves during half of the clip and stands
+# still otherwise, so some of the sampled frames are near-duplicates.
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import extract_frames
+
+
+def make_clips(folder, clips, frames, size=(640, 480), seed=0):
+    rng = np.random.default_rng(seed)
+    os.makedirs(folder)
+    w, h = size
+    noise = [rng.integers(0, 6, (h, w, 3), dtype=np.uint8) for _ in range(7)]
+    for c in range(clips):
+        scene = cv2.GaussianBlur(rng.integers(0, 256, (h, w, 3), dtype=np.uint8), (0, 0), 6)
+        scene = cv2.normalize(scene, None, 0, 255, cv2.NORM_MINMAX)
+        out = cv2.VideoWriter(os.path.join(folder, f"clip_{c:04d}.mp4"), cv2.VideoWriter_fourcc(*"MJPG"), 20.0, (w, h))
+        x = 50
+        for i in range(frames):
+            if i < frames // 2:
+                x += 8
+            frame = cv2.add(scene, noise[i % len(noise)])
+            cv2.rectangle(frame, (x, 180), (x + 120, 300), (40, 160, 220), -1)
+            out.write(frame)
+        out.release()
+
+
+def legacy(video_dir, output_dir, frame_interval):
+    """extract_frames.py as it was: cap.read() every frame, default-quality imwrite, one video at a time."""
+    os.makedirs(output_dir, exist_ok=True)
+    for name in sorted(os.listdir(video_dir)):
+        filename = name.split(".")[0]
+        cap = cv2.VideoCapture(os.path.join(video_dir, name))
+        frame_count = 0
+        while True:
+            success, frame = cap.read()
+            if not success:
+                break
+            if frame_count % frame_interval == 0:
+                cv2.imwrite(os.path.join(output_dir, f"{filename}_f{frame_count}.jpg"), frame)
+            frame_count += 1
+        cap.release()
+
+
+def folder_stats(folder):
+    names = os.listdir(folder)
+    return len(names), sum(os.path.getsize(os.path.join(folder, n)) for n in names) / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clips", type=int, default=40)
+    parser.add_argument("--frames", type=int, default=100, help="frames per clip")
+    parser.add_argument("--step", type=int, default=4)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--dir", help="where to write the clips (default: a temp dir)")
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="bench-frames-", dir=args.dir)
+    try:
+        clips = os.path.join(root, "clips")
+        t0 = time.perf_counter()
+        make_clips(clips, args.clips, args.frames)
+        total = args.clips * args.frames
+        print(f"Synthetic clips: {args.clips} x {args.frames} frames ({time.perf_counter() - t0:.1f}s to create)")
+
+        rows = []
+        out = os.path.join(root, "legacy")
+        t = time.perf_counter()
+        legacy(clips, out, args.step)
+        rows.append(("old extract_frames loop", time.perf_counter() - t, *folder_stats(out)))
+
+        for name, quality, dedup in [("grab + pool, q95, no dedup", 95, -1),
+                                     (f"grab + pool, q{extract_frames.JPEG_QUALITY}, no dedup",
+                                      extract_frames.JPEG_QUALITY, -1),
+                                     ("extract_frames (defaults)", extract_frames.JPEG_QUALITY,
+                                      extract_frames.DEDUP_DISTANCE)]:
+            out = os.path.join(root, name.replace(" ", "_"))
+            t = time.perf_counter()
+            extract_frames.extract_frames(clips, out, args.step, args.workers, quality, dedup)
+            rows.append((name, time.perf_counter() - t, *folder_stats(out)))
+
+        print(f"\n{'run':<30} {'time s':>8} {'frames/s':>9} {'images':>7} {'MB':>7}")
+        for name, secs, images, mb in rows:
+            print(f"{name:<30} {secs:>8.2f} {total / secs:>9.0f} {images:>7} {mb:>7.1f}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
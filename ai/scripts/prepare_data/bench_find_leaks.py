@@ -0,0 +1,96 @@
+# find_leaks.py on a synthetic dataset of short clips (default 100k frames), split by build_dataset.py
+# per frame, as before grouping, then regrouped by clip.
+# Usage: python ai/scripts/prepare_data/bench_find_leaks.py [--images 100000] [--frames 20] [--workers 8]
+# Every clip is a textured scene with a moving object and sensor noise (160x120 JPEGs), like the frames
+# extract_frames.py takes from data_recorder.py's clips. Reports hashing and indexing time and what an
+# all-pairs comparison of the same hashes would cost.
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import build_dataset
+import find_leaks
+import image_hash
+
+
+def make_tree(root, images, frames, classes, size=(160, 120), seed=0):
+    rng = np.random.default_rng(seed)
+    w, h = size
+    noise = [rng.integers(0, 6, (h, w, 3), dtype=np.uint8) for _ in range(7)]
+    label = b"0 0.500000 0.500000 0.250000 0.300000\n"
+    names = [f"class{c}" for c in range(classes)]
+    for name in names:
+        os.makedirs(os.path.join(root, "images", name))
+        os.makedirs(os.path.join(root, "labels", name))
+    for clip in range(images // frames):
+        cls = names[clip % classes]
+        scene = cv2.GaussianBlur(rng.integers(0, 256, (h, w, 3), dtype=np.uint8), (0, 0), 3)
+        scene = cv2.normalize(scene, None, 0, 255, cv2.NORM_MINMAX)
+        x, step = int(rng.integers(0, w // 2)), int(rng.integers(0, 3))
+        for f in range(frames):
+            frame = cv2.add(scene, noise[(clip + f) % len(noise)])
+            cv2.rectangle(frame, (x + f * step, 40), (x + f * step + 30, 80), (40, 160, 220), -1)
+            stem = f"clip_{clip:06d}_f{f * 4}"
+            cv2.imwrite(os.path.join(root, "images", cls, stem + ".jpg"), frame)
+            with open(os.path.join(root, "labels", cls, stem + ".txt"), "wb") as fl:
+                fl.write(label)
+    return names
+
+
+def all_pairs_seconds(hashes, sample=4000):
+    """Time to compare every pair of a sample, scaled to all pairs of hashes."""
+    sub = np.asarray(hashes, np.uint64)[:sample]
+    t = time.perf_counter()
+    for k in range(len(sub) - 1):
+        image_hash.hamming_many(np.full(len(sub) - k - 1, sub[k]), sub[k + 1:])
+    return (time.perf_counter() - t) * (len(hashes) / len(sub)) ** 2
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--images", type=int, default=100000)
+    parser.add_argument("--frames", type=int, default=20, help="frames per clip")
+    parser.add_argument("--classes", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--dir", help="where to build the tree (default: a temp dir)")
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="bench-leaks-", dir=args.dir)
+    try:
+        t0 = time.perf_counter()
+        classes = make_tree(root, args.images, args.frames, args.classes)
+        images, labels, out = (os.path.join(root, d) for d in ("images", "labels", "dataset"))
+        build_dataset.SPLIT_RATIOS = {"train": 0.7, "val": 0.3, "test": 0.0}
+        with contextlib.redirect_stdout(io.StringIO()):
+            build_dataset.build("split", workers=args.workers, images_root=images, labels_root=labels,
+                                out_dir=out, classes=classes)
+        print(f"Synthetic dataset: {args.images} frames of {args.images // args.frames} clips, split per "
+              f"frame ({time.perf_counter() - t0:.1f}s to create)\n")
+
+        t = time.perf_counter()
+        report = find_leaks.analyze(out, workers=args.workers)
+        total = time.perf_counter() - t
+        find_leaks.print_report(report, top=3)
+        print(f"Total {total:.1f}s; all-pairs comparison of the same hashes: "
+              f"~{all_pairs_seconds(list(report['hashes'].values())):.0f}s\n")
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            counts = find_leaks.regroup(report, workers=args.workers, images_root=images, labels_root=labels,
+                                        classes=classes)
+        print("Regrouped by clip: " + ", ".join(f"{k} {v}" for k, v in counts.items() if v))
+        find_leaks.print_report(find_leaks.analyze(out, workers=args.workers, known=report["hashes"]), top=3)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
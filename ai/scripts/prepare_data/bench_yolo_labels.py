@@ -0,0 +1,129 @@
+# yolo_labels.py vs the old per-line loops of check_yolo.py and change_id.py on synthetic labels.
+# Usage: python ai/scripts/prepare_data/bench_yolo_labels.py [--files 100000] [--boxes 3] [--bad 0.01]
+# A --bad fraction of the files gets one malformed line, so both sides find (and skip) the same ones.
+import argparse
+import contextlib
+import io
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import yolo_labels
+
+
+def make_labels(folder, files, boxes, bad, seed=0):
+    rng = random.Random(seed)
+    os.makedirs(folder)
+    for i in range(files):
+        lines = [f"{rng.randrange(6)} {rng.random():.6f} {rng.random():.6f} {rng.random():.6f} {rng.random():.6f}\n"
+                 for _ in range(rng.randint(1, 2 * boxes - 1))]
+        if rng.random() < bad:
+            lines.append(rng.choice(["0 0.5 0.5 0.5\n", "x 0.5 0.5 0.5 0.5\n", "inf 0.5 0.5 0.5 0.5\n",
+                                     "0 1.5 0.5 0.5 0.5\n"]))
+        with open(os.path.join(folder, f"{i:07d}.txt"), "w") as f:
+            f.writelines(lines)
+
+
+def legacy_check(folder):
+    """check_yolo.py as it was: read, split and float() every line of every file."""
+    errors = 0
+    for file in os.listdir(folder):
+        if not file.endswith(".txt"):
+            continue
+        with open(os.path.join(folder, file), "r") as f:
+            lines = f.read().strip().splitlines()
+        for line in lines:
+            parts = line.split()
+            if len(parts) != 5:
+                errors += 1
+                continue
+            cls, xc, yc, w, h = parts
+            if not cls.isdigit():
+                errors += 1
+            try:
+                xc, yc, w, h = map(float, [xc, yc, w, h])
+            except ValueError:
+                errors += 1
+                continue
+            errors += sum(not (0 <= v <= 1) for v in (xc, yc, w, h))
+    return errors
+
+
+def legacy_change_id(folder, new_class_id):
+    """change_id.py as it was: rewrite every line of every file."""
+    new_id_str = str(new_class_id)
+    for filename in os.listdir(folder):
+        if filename.endswith(".txt"):
+            file_path = os.path.join(folder, filename)
+            new_lines = []
+            try:
+                with open(file_path, "r") as f:
+                    lines = f.readlines()
+                for line in lines:
+                    parts = line.strip().split()
+                    if len(parts) > 1:
+                        new_lines.append(f"{new_id_str} {parts[1]} {parts[2]} {parts[3]} {parts[4]}\n")
+                    else:
+                        new_lines.append(line)
+                with open(file_path, "w") as f:
+                    f.writelines(new_lines)
+            except Exception as e:
+                print(f"Error processing file {filename}: {e}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=100000)
+    parser.add_argument("--boxes", type=int, default=3, help="average boxes per file")
+    parser.add_argument("--bad", type=float, default=0.01, help="fraction of files with a malformed line")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--dir", help="where to write the labels (default: a temp dir)")
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="bench-labels-", dir=args.dir)
+    try:
+        folder = os.path.join(root, "labels")
+        t0 = time.perf_counter()
+        make_labels(folder, args.files, args.boxes, args.bad)
+        print(f"Synthetic labels: {args.files} files ({time.perf_counter() - t0:.1f}s to create)")
+        rows = []
+
+        def run(name, fn):
+            t = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = fn()
+            rows.append((name, time.perf_counter() - t, result))
+            return result
+
+        run("old check_yolo loop", lambda: f"{legacy_check(folder)} errors")
+        labels = run("read_labels", lambda: yolo_labels.read_labels(folder, args.workers))
+        rows[-1] = rows[-1][:2] + (f"{len(labels)} boxes, {len(labels.bad)} bad lines",)
+        run("validate", lambda: f"{sum(int(m.sum()) for m in yolo_labels.validate(labels, 6).values())} flagged")
+        run("errors (messages)", lambda: f"{len(yolo_labels.errors(labels, 6))} errors")
+
+        # Malformed files are left as they are by write_labels, rewritten (and mangled) by the old loop,
+        # so time the old loop on a copy
+        copy = os.path.join(root, "copy")
+        shutil.copytree(folder, copy)
+        run("old change_id loop", lambda: legacy_change_id(copy, 8))
+
+        def change_id():
+            labels = yolo_labels.read_labels(folder, args.workers)
+            yolo_labels.remap(labels, 8)
+            written, skipped = yolo_labels.write_labels(labels, workers=args.workers)
+            return f"{written} written, {len(skipped)} skipped"
+        run("read + remap + write_labels", change_id)
+
+        print(f"\n{'run':<28} {'time s':>8} {'files/s':>10}  result")
+        for name, secs, result in rows:
+            print(f"{name:<28} {secs:>8.2f} {args.files / secs:>10.0f}  {result or ''}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
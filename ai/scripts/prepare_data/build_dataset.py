@@ -0,0 +1,323 @@
+# Build a YOLO dataset from per-class image / label folders in one pass (replaces prepare_dataset.py
+# and prepare_data-1.py).
+#   split:  <IMAGE_DIR>/<class>/*.jpg + <LABEL_DIR>/<class>/*.txt -> <OUTPUT_DIR>/{images,labels}/{train,val,test}
+#   subset: a fixed number of pairs per class -> <SUBSET_IMAGES>/<class>, <SUBSET_LABELS>/<class>
+# Usage: python ai/scripts/prepare_data/build_dataset.py [split|subset] [--seed 0] [--link auto] [--workers 8]
+#
+# Every source folder is listed once with os.scandir and images are paired with labels through a
+# dict on the file stem. The split / subset is a function of (seed, stem) only: files are ranked by a
+# hash, so a rerun gives the same dataset and adding files moves only a few others across a split
+# boundary. Images are reflinked or hardlinked when the filesystem allows it (no extra disk space),
+# labels are reflinked or copied: change_id.py rewrites labels in place and must not reach the source.
+# A manifest next to the output records what each file was made from, so a rerun only touches files
+# whose source changed and removes the ones that left the dataset.
+# If the output has a groups file (written by find_leaks.py --regroup: {stem: group}), files are ranked
+# by group and a group never straddles a split boundary, so frames of one clip stay in one split.
+import argparse
+import errno
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# ---- split (prepare_dataset.py) ----
+IMAGE_DIR = "ai/data/cam1/pic1"
+LABEL_DIR = "ai/data/cam1/label1"
+OUTPUT_DIR = "ai/data/final_yolo_trash_dataset"
+
+CLASSES = [
+    "battery",
+    "glass",
+    "metal",
+    # "organic",
+    "paper_cardboard",
+    "plastic"
+]
+
+SPLIT_RATIOS = {"train": 0.7, "val": 0.3, "test": 0.0}  # test gets whatever is left
+
+# ---- subset (prepare_data-1.py) ----
+SUBSET_SRC_IMAGES = "ai/data/new-dataset-trash-type-v3"
+SUBSET_SRC_LABELS = "ai/data/label_v3"   # <class>_txt or <class>
+SUBSET_IMAGES = "ai/data/new-dataset-trash-type-v7"
+SUBSET_LABELS = "ai/data/label_v7"
+
+TARGET_COUNTS = {
+    "paper_cardboard": 2500,
+    "metal":           2500,
+    "organic":         2200,
+    "battery":         1500,
+    "plastic":         1700,
+    "glass":           1100
+}
+DEFAULT_COUNT = 1500
+
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".bmp")
+MANIFEST = ".build_manifest.json"
+GROUPS = ".split_groups.json"
+SEED = 0
+
+FICLONE = 0x40049409  # linux/fs.h: share the source's extents (btrfs, xfs, ...)
+
+
+def scan_dir(path, exts):
+    """{stem: (path, size, mtime_ns)} for the files of path ending in exts, one directory listing."""
+    files = {}
+    if not os.path.isdir(path):
+        return files
+    with os.scandir(path) as it:
+        for entry in it:
+            stem, ext = os.path.splitext(entry.name)
+            if ext.lower() in exts and entry.is_file():
+                st = entry.stat()
+                files[stem] = (entry.path, st.st_size, st.st_mtime_ns)
+    return files
+
+
+def label_dir_for(labels_root, class_name):
+    for name in (class_name + "_txt", class_name):
+        if os.path.isdir(os.path.join(labels_root, name)):
+            return os.path.join(labels_root, name)
+    return None
+
+
+def scan_class(images_root, labels_root, class_name):
+    """(class_name, [(stem, image, label)], missing labels), image/label as scan_dir values."""
+    images = scan_dir(os.path.join(images_root, class_name), IMAGE_EXTS)
+    lbl_dir = label_dir_for(labels_root, class_name)
+    labels = scan_dir(lbl_dir, (".txt",)) if lbl_dir else {}
+    pairs = [(stem, img, labels[stem]) for stem, img in images.items() if stem in labels]
+    return class_name, pairs, len(images) - len(pairs)
+
+
+def rank(pairs, seed, class_name, groups=None):
+    """Pairs in a deterministic pseudo-random order that depends on the seed and each stem only (on the
+    stem's group when groups are given, so the members of a group are next to each other)."""
+    groups = groups or {}
+
+    def key(pair):
+        group = groups.get(pair[0], pair[0])
+        return hashlib.blake2b(f"{seed}:{class_name}:{group}".encode(), digest_size=8).digest(), pair[0]
+    return sorted(pairs, key=key)
+
+
+def split_plan(pairs, class_name, out_dir, ratios, seed, groups=None):
+    ranked = rank(pairs, seed, class_name, groups)
+    group_of = [groups.get(stem, stem) for stem, _, _ in ranked] if groups else None
+    plan = []
+    start = 0
+    names = list(ratios)
+    for i, split in enumerate(names):
+        end = len(ranked) if i == len(names) - 1 else start + int(len(ranked) * ratios[split])
+        if group_of:
+            while 0 < end < len(ranked) and group_of[end] == group_of[end - 1]:
+                end += 1
+        for stem, img, lbl in ranked[start:end]:
+            plan.append((os.path.join(out_dir, "images", split, os.path.basename(img[0])), img, "image"))
+            plan.append((os.path.join(out_dir, "labels", split, os.path.basename(lbl[0])), lbl, "label"))
+        start = end
+    return plan
+
+
+def subset_plan(pairs, class_name, images_out, labels_out, count, seed):
+    plan = []
+    for stem, img, lbl in rank(pairs, seed, class_name)[:count]:
+        plan.append((os.path.join(images_out, class_name, os.path.basename(img[0])), img, "image"))
+        plan.append((os.path.join(labels_out, class_name, os.path.basename(lbl[0])), lbl, "label"))
+    return plan
+
+
+class Materializer:
+    """Puts one source file at its destination: reflink, hardlink or copy, whatever works first."""
+
+    def __init__(self, link="auto"):
+        self.link = link
+        # Turned off after the first failure, a filesystem that refuses once refuses every time
+        self.can_reflink = link in ("auto", "reflink") and sys.platform.startswith("linux")
+        self.can_hardlink = link in ("auto", "hardlink")
+
+    def _reflink(self, src, dst):
+        import fcntl
+        with open(src, "rb") as fs, open(dst, "wb") as fd:
+            fcntl.ioctl(fd.fileno(), FICLONE, fs.fileno())
+
+    def place(self, src, dst, kind, exists=True):
+        if exists and os.path.lexists(dst):
+            os.unlink(dst)  # never write through an old hardlink into the source
+        if self.can_reflink:
+            try:
+                self._reflink(src, dst)
+                return "reflink"
+            except OSError as e:
+                if e.errno not in (errno.EOPNOTSUPP, errno.EXDEV, errno.EINVAL, errno.ENOTTY, errno.ENOSYS):
+                    raise
+                self.can_reflink = False
+                os.unlink(dst)
+        if kind == "image" and self.can_hardlink:
+            try:
+                os.link(src, dst)
+                return "hardlink"
+            except OSError as e:
+                if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP, errno.EOPNOTSUPP):
+                    raise
+                self.can_hardlink = False
+        shutil.copyfile(src, dst)
+        return "copy"
+
+
+def load_manifest(path):
+    try:
+        with open(path) as f:
+            return json.load(f).get("entries", {})
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(path, entries):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        f.write(json.dumps({"version": 1, "entries": entries}))  # json.dump would use the pure-Python encoder
+    os.replace(tmp, path)
+
+
+def load_groups(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def materialize(plan, manifest_path, link="auto", workers=8):
+    """Bring the output in line with plan [(dst, (src, size, mtime_ns), kind)]. Returns counts by action."""
+    root = os.path.dirname(os.path.abspath(manifest_path))
+    old = load_manifest(manifest_path)
+    entries = {}
+    todo = []
+    counts = {"unchanged": 0, "removed": 0, "reflink": 0, "hardlink": 0, "copy": 0}
+
+    existing = set()
+    for d in {os.path.dirname(dst) for dst, _, _ in plan}:
+        os.makedirs(d, exist_ok=True)
+        with os.scandir(d) as it:
+            existing.update(os.path.join(d, e.name) for e in it)
+
+    # Paths are resolved once per directory, not once per file
+    rel_dirs, abs_dirs = {}, {}
+    for dst, (src, size, mtime_ns), kind in plan:
+        d, name = os.path.split(dst)
+        if d not in rel_dirs:
+            rel_dirs[d] = os.path.relpath(os.path.abspath(d), root)
+        s, src_name = os.path.split(src)
+        if s not in abs_dirs:
+            abs_dirs[s] = os.path.abspath(s)
+        key = os.path.join(rel_dirs[d], name)
+        src_abs = os.path.join(abs_dirs[s], src_name)
+        prev = old.get(key)
+        if prev and prev[0] == src_abs and prev[1] == size and prev[2] == mtime_ns and dst in existing:
+            entries[key] = prev
+            counts["unchanged"] += 1
+        else:
+            todo.append((key, dst, src_abs, size, mtime_ns, kind, dst in existing))
+
+    for key in old.keys() - entries.keys() - {t[0] for t in todo}:
+        try:
+            os.unlink(os.path.join(root, key))
+            counts["removed"] += 1
+        except FileNotFoundError:
+            pass
+
+    placer = Materializer(link)
+
+    def work(items):
+        return [(key, [src, size, mtime_ns, placer.place(src, dst, kind, exists)])
+                for key, dst, src, size, mtime_ns, kind, exists in items]
+
+    # Links are metadata operations and copies wait on the disk: threads keep several in flight.
+    # Work goes out in chunks, a future per file would cost more than linking it.
+    chunks = [todo[i:i + 256] for i in range(0, len(todo), 256)]
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for done in pool.map(work, chunks):
+            for key, entry in done:
+                entries[key] = entry
+                counts[entry[3]] += 1
+    save_manifest(manifest_path, entries)
+    return counts
+
+
+def build(mode="split", seed=SEED, link="auto", workers=8, images_root=None, labels_root=None,
+          out_dir=None, out_labels=None, classes=None):
+    t0 = time.perf_counter()
+    if mode == "split":
+        images_root, labels_root = images_root or IMAGE_DIR, labels_root or LABEL_DIR
+        out_dir = out_dir or OUTPUT_DIR
+        classes = classes or CLASSES
+        manifest_path = os.path.join(out_dir, MANIFEST)
+        groups = load_groups(os.path.join(out_dir, GROUPS))
+        if groups:
+            print(f"Split by group: {len(set(groups.values()))} groups from {GROUPS}")
+    else:
+        images_root, labels_root = images_root or SUBSET_SRC_IMAGES, labels_root or SUBSET_SRC_LABELS
+        out_dir, out_labels = out_dir or SUBSET_IMAGES, out_labels or SUBSET_LABELS
+        if not os.path.isdir(images_root):
+            print("Can not find folder:", images_root)
+            return None
+        classes = classes or sorted(e.name for e in os.scandir(images_root) if e.is_dir())
+        manifest_path = os.path.join(out_dir, MANIFEST)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        scanned = list(pool.map(lambda c: scan_class(images_root, labels_root, c), classes))
+    t_scan = time.perf_counter() - t0
+
+    plan = []
+    for class_name, pairs, missing in scanned:
+        if mode == "split":
+            class_plan = split_plan(pairs, class_name, out_dir, SPLIT_RATIOS, seed, groups)
+        else:
+            count = min(len(pairs), TARGET_COUNTS.get(class_name.lower(), DEFAULT_COUNT))
+            class_plan = subset_plan(pairs, class_name, out_dir, out_labels, count, seed)
+        print(f"Class: {class_name:15} | pairs: {len(pairs):6} | missing label: {missing:5} | "
+              f"selected: {len(class_plan) // 2:6}")
+        plan.extend(class_plan)
+
+    # Same file name in two classes would land on one path in split mode: keep the first
+    seen = set()
+    unique = []
+    for item in plan:
+        if item[0] in seen:
+            print(f"Duplicate name, skipped: {item[1][0]}")
+            continue
+        seen.add(item[0])
+        unique.append(item)
+
+    counts = materialize(unique, manifest_path, link, workers)
+    if mode == "split":
+        with open(os.path.join(out_dir, "classes.txt"), "w") as f:
+            f.write("".join(c + "\n" for c in classes))
+    total = time.perf_counter() - t0
+    print(f"\nDone: {out_dir} ({len(unique)} files, scan {t_scan:.2f}s, total {total:.2f}s)")
+    print("  " + ", ".join(f"{k} {v}" for k, v in counts.items()))
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("mode", nargs="?", choices=["split", "subset"], default="split")
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--link", choices=["auto", "reflink", "hardlink", "copy"], default="auto",
+                        help="auto: reflink, else hardlink (images only), else copy")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--images", help="source image root (default from the constants above)")
+    parser.add_argument("--labels", help="source label root")
+    parser.add_argument("--out", help="output dataset (split) or output image root (subset)")
+    parser.add_argument("--out-labels", help="output label root (subset)")
+    args = parser.parse_args()
+    build(args.mode, args.seed, args.link, args.workers, args.images, args.labels, args.out, args.out_labels)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,8 @@
 import os
 
+from dataset_manifest import open_manifest
+
+
 def find_empty_label_files(target_folder):
     print(f"Start: {target_folder}")
 
@@ -7,23 +10,9 @@ def find_empty_label_files(target_folder):
         print(f"ERROR: Folder '{target_folder}' not found.")
         return
 
-    empty_files_found = []
-
-    for filename in os.listdir(target_folder):
-        if filename.endswith(".txt"):
-            file_path = os.path.join(target_folder, filename)
-            
-            try:
-                if os.path.getsize(file_path) == 0:
-                    empty_files_found.append(filename)
-                
-                # with open(file_path, 'r') as f:
-                #     content = f.read()
-                #     if not content.strip():
-                #         empty_files_found.append(filename)
-                         
-            except Exception as e:
-                print(f"Lỗi khi đọc file {filename}: {e}")
+    manifest = open_manifest(target_folder)
+    empty_files_found = [os.path.basename(p) for p in manifest.empty_labels(target_folder)]
+    manifest.close()
 
     if empty_files_found:
         print(f"\nFound {len(empty_files_found)} empty label files:")
@@ -34,4 +23,4 @@ def find_empty_label_files(target_folder):
 FOLDER = 'yolo_dataset/labels/train'
 
 if __name__ == "__main__":
-    find_empty_label_files(FOLDER)
\ No newline at end of file
+    find_empty_label_files(FOLDER)
@@ -0,0 +1,72 @@
+# yolo_labels.write_labels regression check: read -> remap -> write the way change_id.py does, on label
+# files with malformed lines (non-finite or non-numeric class ids, bad coordinates, wrong field count).
+# Usage: python ai/scripts/prepare_data/check_write_labels.py
+# Clean files must be rewritten with the new class id, files with a malformed line left byte for byte.
+# Exits with status 1 when a case fails.
+import os
+import shutil
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import yolo_labels
+
+GOOD = "0 0.5 0.5 0.1 0.1\n"
+CASES = {
+    "clean": GOOD + "3 0.25 0.75 0.2 0.3\n",
+    "class_inf": GOOD + "inf 0.5 0.5 0.1 0.1\n",
+    "class_overflow": GOOD + "1e400 0.5 0.5 0.1 0.1\n",
+    "class_neg_inf": GOOD + "-inf 0.5 0.5 0.1 0.1\n",
+    "class_nan": GOOD + "nan 0.5 0.5 0.1 0.1\n",
+    "class_text": GOOD + "x 0.5 0.5 0.1 0.1\n",
+    "coord_inf": GOOD + "1 inf 0.5 0.1 0.1\n",
+    "fields": GOOD + "0 0.5 0.5 0.1\n",
+}
+NEW_ID = 8
+
+
+def run(folder, mapping):
+    labels = yolo_labels.read_labels(folder)
+    yolo_labels.remap(labels, mapping)
+    written, skipped = yolo_labels.write_labels(labels)
+    return written, {os.path.splitext(os.path.basename(p))[0] for p in skipped}
+
+
+def main():
+    root = tempfile.mkdtemp(prefix="check-labels-")
+    failed = False
+    try:
+        for mapping in (NEW_ID, {0: NEW_ID, 3: NEW_ID}):
+            folder = os.path.join(root, "int" if isinstance(mapping, int) else "dict")
+            os.makedirs(folder)
+            for name, text in CASES.items():
+                with open(os.path.join(folder, name + ".txt"), "w") as f:
+                    f.write(text)
+            try:
+                written, skipped = run(folder, mapping)
+            except Exception as e:
+                print(f"remap {mapping}: {type(e).__name__}: {e}  FAIL")
+                failed = True
+                continue
+            expect_skipped = set(CASES) - {"clean"}
+            for name, text in CASES.items():
+                with open(os.path.join(folder, name + ".txt")) as f:
+                    got = f.read()
+                if name == "clean":
+                    ok = got == f"{NEW_ID} 0.500000 0.500000 0.100000 0.100000\n" \
+                                f"{NEW_ID} 0.250000 0.750000 0.200000 0.300000\n"
+                else:
+                    ok = got == text and name in skipped
+                failed |= not ok
+                print(f"remap {str(mapping):<12} {name:<15} {'skipped' if name in skipped else 'written':<8} "
+                      f"{'ok' if ok else 'FAIL'}")
+            if written != 1 or skipped != expect_skipped:
+                print(f"remap {mapping}: {written} written, skipped {sorted(skipped)}  FAIL")
+                failed = True
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+# Persistent manifest of a YOLO dataset: every image and label with size, mtime, content hash, image
+# size and parsed label lines, in one SQLite file shared by the checkers and metrix.py.
+# Usage: python ai/scripts/prepare_data/dataset_manifest.py <folder> [--db ai/data/dataset_manifest.sqlite]
+#
+# update(folder) stats every file (one scandir per directory) and reads only files whose size or mtime
+# changed. Image sizes and parsed labels are stored per content hash, so a renamed or copied file and
+# the thousands of identical (e.g. empty) labels are parsed once; new labels go through the bulk
+# parser of yolo_labels.py together. Everything else is a query.
+import argparse
+import hashlib
+import os
+import sqlite3
+import struct
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import yolo_labels
+
+DEFAULT_DB = "ai/data/dataset_manifest.sqlite"
+IMAGE_EXTS = {".jpg", ".jpeg", ".png", ".bmp", ".webp", ".tif", ".tiff"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,      -- absolute
+    dir TEXT NOT NULL,
+    stem TEXT NOT NULL,
+    kind TEXT NOT NULL,         -- 'image' or 'label'
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    hash TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_dir ON files(dir);
+CREATE INDEX IF NOT EXISTS files_hash ON files(hash);
+CREATE INDEX IF NOT EXISTS files_stem ON files(stem, kind);
+CREATE TABLE IF NOT EXISTS images (
+    hash TEXT PRIMARY KEY,
+    width INTEGER,              -- NULL when the header could not be read
+    height INTEGER
+);
+CREATE TABLE IF NOT EXISTS labels (
+    hash TEXT PRIMARY KEY,
+    lines INTEGER NOT NULL      -- non-blank lines
+);
+-- One row per non-blank line of a label file (yolo_labels.parse_buffers). Values are NULL when not a
+-- number, and on lines without exactly 5 fields.
+CREATE TABLE IF NOT EXISTS boxes (
+    hash TEXT NOT NULL,
+    line INTEGER NOT NULL,
+    fields INTEGER NOT NULL,
+    cls INTEGER,
+    xc REAL, yc REAL, w REAL, h REAL,
+    PRIMARY KEY (hash, line)
+) WITHOUT ROWID;
+"""
+
+
+def image_size(data):
+    """(width, height) from a PNG / JPEG / BMP / GIF header, None for anything else or a broken file."""
+    try:
+        if data[:8] == b"\x89PNG\r\n\x1a\n":
+            return struct.unpack(">II", data[16:24])
+        if data[:2] == b"BM":
+            w, h = struct.unpack("<ii", data[18:26])
+            return w, abs(h)
+        if data[:6] in (b"GIF87a", b"GIF89a"):
+            return struct.unpack("<HH", data[6:10])
+        if data[:2] == b"\xff\xd8":
+            i = 2
+            while i + 9 < len(data):
+                if data[i] != 0xFF:
+                    return None
+                marker = data[i + 1]
+                if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+                    i += 2
+                    continue
+                length = struct.unpack(">H", data[i + 2:i + 4])[0]
+                # SOF0..SOF15 except DHT (C4), JPG (C8), DAC (CC)
+                if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+                    h, w = struct.unpack(">HH", data[i + 5:i + 9])
+                    return w, h
+                i += 2 + length
+    except struct.error:
+        pass
+    return None
+
+
+def _read(path, kind, size, mtime_ns):
+    with open(path, "rb") as f:
+        data = f.read()
+    digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+    return path, kind, size, mtime_ns, digest, data
+
+
+class Manifest:
+    def __init__(self, db_path=DEFAULT_DB):
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.db = sqlite3.connect(db_path)
+        self.db.executescript(SCHEMA)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+
+    def close(self):
+        self.db.close()
+
+    # ---------------- Update ----------------
+
+    def scan(self, folder):
+        """{abs path: (kind, size, mtime_ns)} of the images and labels under folder."""
+        found = {}
+        stack = [os.path.abspath(folder)]
+        while stack:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                        continue
+                    ext = os.path.splitext(entry.name)[1].lower()
+                    if ext == ".txt" and entry.name != "classes.txt":
+                        kind = "label"
+                    elif ext in IMAGE_EXTS:
+                        kind = "image"
+                    else:
+                        continue
+                    st = entry.stat()
+                    found[entry.path] = (kind, st.st_size, st.st_mtime_ns)
+        return found
+
+    def update(self, folder, workers=8):
+        """Bring the manifest in line with folder. Returns {'files', 'read', 'parsed', 'removed', 'seconds'}."""
+        t0 = time.perf_counter()
+        root = os.path.abspath(folder)
+        found = self.scan(root)
+        known = {p: (s, m) for p, s, m in self.db.execute(
+            "SELECT path, size, mtime_ns FROM files WHERE path >= ? AND path < ?", _prefix_range(root))}
+        gone = [(p,) for p in known.keys() - found.keys()]
+        changed = [(p, kind, size, mtime) for p, (kind, size, mtime) in found.items()
+                   if known.get(p) != (size, mtime)]
+
+        have_images = {h for (h,) in self.db.execute("SELECT hash FROM images")}
+        have_labels = {h for (h,) in self.db.execute("SELECT hash FROM labels")}
+        new_labels = {}
+        parsed = 0
+        with self.db:
+            self.db.executemany("DELETE FROM files WHERE path = ?", gone)
+            # hashlib and file reads release the GIL: reads overlap, parsing stays on this thread.
+            # Chunked, so only a few hundred files are held in memory at a time.
+            with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+                results = (r for i in range(0, len(changed), 256)
+                           for r in pool.map(lambda c: _read(*c), changed[i:i + 256]))
+                for path, kind, size, mtime, digest, data in results:
+                    self.db.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                    (path, os.path.dirname(path), os.path.splitext(os.path.basename(path))[0],
+                                     kind, size, mtime, digest))
+                    if kind == "image" and digest not in have_images:
+                        self.db.execute("INSERT INTO images VALUES (?, ?, ?)", (digest, *(image_size(data) or (None, None))))
+                        have_images.add(digest)
+                        parsed += 1
+                    elif kind == "label" and digest not in have_labels:
+                        new_labels[digest] = data
+                        have_labels.add(digest)
+                        parsed += 1
+            self._insert_labels(new_labels)
+            if gone or changed:
+                # Content no file points to any more
+                self.db.execute("DELETE FROM images WHERE hash NOT IN (SELECT hash FROM files)")
+                self.db.execute("DELETE FROM boxes WHERE hash NOT IN (SELECT hash FROM files)")
+                self.db.execute("DELETE FROM labels WHERE hash NOT IN (SELECT hash FROM files)")
+        return {"files": len(found), "read": len(changed), "parsed": parsed, "removed": len(gone),
+                "seconds": round(time.perf_counter() - t0, 3)}
+
+    def _insert_labels(self, contents):
+        """Parse {hash: label bytes} in one go and store the lines (malformed ones with NULL values)."""
+        if not contents:
+            return
+        digests = list(contents)
+        boxes, line, bad = yolo_labels.parse_buffers([contents[d] for d in digests])
+        files = boxes[:, 0].astype(np.int64)
+        # NaN binds as NULL
+        rows = [(digests[f], ln, 5, *vals) for f, ln, vals in zip(files.tolist(), line.tolist(), boxes[:, 1:].tolist())]
+        rows += [(digests[f], ln, n, None, None, None, None, None) for f, ln, n in bad.tolist()]
+        lines = np.bincount(files, minlength=len(digests)) + np.bincount(bad[:, 0], minlength=len(digests))
+        self.db.executemany("INSERT INTO labels VALUES (?, ?)", zip(digests, lines.tolist()))
+        self.db.executemany("INSERT INTO boxes VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    # ---------------- Queries ----------------
+    # folder limits a query to the files under it (recursively), None means the whole manifest.
+
+    def _where(self, folder, alias="f"):
+        if folder is None:
+            return "1", ()
+        root = os.path.abspath(folder)
+        return f"({alias}.path >= ? AND {alias}.path < ?)", _prefix_range(root)
+
+    def count(self, kind, folder=None):
+        where, args = self._where(folder)
+        return self.db.execute(f"SELECT COUNT(*) FROM files f WHERE f.kind = ? AND {where}", (kind, *args)).fetchone()[0]
+
+    def empty_labels(self, folder=None):
+        """Label files of size 0 (check_empty.py)."""
+        where, args = self._where(folder)
+        return [p for (p,) in self.db.execute(
+            f"SELECT f.path FROM files f WHERE f.kind = 'label' AND f.size = 0 AND {where} ORDER BY f.path", args)]
+
+    def labels_without_boxes(self, folder=None):
+        """Label files with no non-blank line (what metrix.py counts as empty images)."""
+        where, args = self._where(folder)
+        return self.db.execute(
+            f"SELECT COUNT(*) FROM files f JOIN labels l ON l.hash = f.hash "
+            f"WHERE f.kind = 'label' AND l.lines = 0 AND {where}", args).fetchone()[0]
+
+    def class_counts(self, folder=None):
+        """{class id as written in the file: instances} over every non-blank line (check_label.py).
+        Lines whose first field is not an integer count under their raw class id None."""
+        where, args = self._where(folder)
+        return dict(self.db.execute(
+            f"SELECT b.cls, COUNT(*) FROM files f JOIN boxes b ON b.hash = f.hash "
+            f"WHERE f.kind = 'label' AND b.fields > 0 AND {where} GROUP BY b.cls ORDER BY b.cls", args))
+
+    def unpaired(self, image_folder, label_folder):
+        """(images without a label, labels without an image), matched on the file stem (check_single.py)."""
+        iw, ia = self._where(image_folder, "i")
+        lw, la = self._where(label_folder, "l")
+        missing_labels = [p for (p,) in self.db.execute(
+            f"SELECT i.path FROM files i WHERE i.kind = 'image' AND {iw} AND NOT EXISTS "
+            f"(SELECT 1 FROM files l WHERE l.kind = 'label' AND l.stem = i.stem AND {lw}) ORDER BY i.path", ia + la)]
+        missing_images = [p for (p,) in self.db.execute(
+            f"SELECT l.path FROM files l WHERE l.kind = 'label' AND {lw} AND NOT EXISTS "
+            f"(SELECT 1 FROM files i WHERE i.kind = 'image' AND i.stem = l.stem AND {iw}) ORDER BY l.path", la + ia)]
+        return missing_labels, missing_images
+
+    def label_errors(self, folder=None, num_classes=None):
+        """[(path, line, message)] for malformed lines (check_yolo.py). SQL narrows the rows down to the
+        suspicious ones, yolo_labels.errors() judges them like it does a folder read from disk."""
+        where, args = self._where(folder)
+        rows = self.db.execute(
+            f"SELECT f.path, b.line, b.fields, b.cls, b.xc, b.yc, b.w, b.h FROM files f JOIN boxes b ON b.hash = f.hash "
+            f"WHERE f.kind = 'label' AND {where} AND b.fields > 0 AND (b.fields != 5 OR b.cls IS NULL OR b.cls < 0 "
+            f"OR b.cls != CAST(b.cls AS INTEGER) OR b.cls >= ? "
+            f"OR b.xc IS NULL OR b.yc IS NULL OR b.w IS NULL OR b.h IS NULL "
+            f"OR b.xc NOT BETWEEN 0 AND 1 OR b.yc NOT BETWEEN 0 AND 1 OR b.w NOT BETWEEN 0 AND 1 "
+            f"OR b.h NOT BETWEEN 0 AND 1)", (*args, num_classes if num_classes is not None else 2**62)).fetchall()
+        paths = sorted({r[0] for r in rows})
+        index = {p: i for i, p in enumerate(paths)}
+        good = [r for r in rows if r[2] == 5]
+        boxes = np.array([[index[r[0]], *r[3:]] for r in good], dtype=np.float64).reshape(-1, 6)
+        line = np.array([r[1] for r in good], dtype=np.int32)
+        bad = np.array([[index[r[0]], r[1], r[2]] for r in rows if r[2] != 5], dtype=np.int64).reshape(-1, 3)
+        return yolo_labels.errors(yolo_labels.LabelSet(paths, boxes, line, bad), num_classes)
+
+    def image_sizes(self, folder=None):
+        """{(width, height): images}, (None, None) for unreadable headers."""
+        where, args = self._where(folder)
+        return dict(((w, h), n) for w, h, n in self.db.execute(
+            f"SELECT i.width, i.height, COUNT(*) FROM files f JOIN images i ON i.hash = f.hash "
+            f"WHERE f.kind = 'image' AND {where} GROUP BY i.width, i.height", args))
+
+    def duplicates(self, kind="image", folder=None):
+        """Groups of paths with identical content."""
+        where, args = self._where(folder)
+        groups = {}
+        for digest, path in self.db.execute(
+                f"SELECT f.hash, f.path FROM files f WHERE f.kind = ? AND {where} AND f.hash IN "
+                f"(SELECT hash FROM files WHERE kind = ? GROUP BY hash HAVING COUNT(*) > 1) ORDER BY f.path",
+                (kind, *args, kind)):
+            groups.setdefault(digest, []).append(path)
+        return [g for g in groups.values() if len(g) > 1]
+
+
+def _prefix_range(root):
+    """(low, high) such that low <= path < high holds exactly for the paths below root (an index range scan)."""
+    low = root.rstrip(os.sep) + os.sep
+    return low, low[:-1] + chr(ord(os.sep) + 1)
+
+
+def open_manifest(folder, db_path=DEFAULT_DB, quiet=False):
+    """Manifest updated for folder, the way the checkers start."""
+    manifest = Manifest(db_path)
+    stats = manifest.update(folder)
+    if not quiet:
+        print(f"Manifest {db_path}: {stats['files']} files under {folder}, {stats['read']} re-read, "
+              f"{stats['removed']} removed ({stats['seconds'] * 1000:.0f} ms)")
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("folder")
+    parser.add_argument("--db", default=DEFAULT_DB)
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+    if not os.path.isdir(args.folder):
+        print(f"ERROR: Folder '{args.folder}' not found.")
+        return 1
+    manifest = Manifest(args.db)
+    stats = manifest.update(args.folder, args.workers)
+    print(f"{stats['files']} files, {stats['read']} read, {stats['parsed']} new contents parsed, "
+          f"{stats['removed']} removed in {stats['seconds']:.3f}s")
+    print(f"images {manifest.count('image', args.folder)}, labels {manifest.count('label', args.folder)}, "
+          f"empty labels {len(manifest.empty_labels(args.folder))}, "
+          f"instances {sum(manifest.class_counts(args.folder).values())}")
+    manifest.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,59 +1,136 @@
-import cv2
+# Video clips -> JPEG frames for labelling: every FRAME_INTERVAL-th frame, near-duplicates dropped.
+# Usage: python ai/scripts/prepare_data/extract_frames.py [--input DIR] [--output DIR] [--step 4] [--workers N]
+# One video per worker process, decoding is CPU-bound. Frames that are not kept are only grab()bed: the
+# codec still decodes them (the next frame may need them) but retrieve()'s BGR conversion and copy are
+# skipped. A kept frame is dropped when its dHash is within DEDUP_DISTANCE bits of the last frame saved
+# from the same video, the 0.5 s clips of data_recorder.py are mostly the same picture. JPEGs are
+# encoded by a few threads per process (cv2.imwrite releases the GIL) while the next frame decodes.
+import argparse
 import os
-import glob
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+import cv2
+
+import image_hash
+
+INPUT_FOLDER = "ai/data/cam1/plastic"
+OUTPUT_FOLDER = "ai/data/cam1/pic1/plastic"
+FRAME_INTERVAL = 4
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv")
+# OpenCV's default is 95; 90 looks the same on camera frames and the files are about a third smaller
+JPEG_QUALITY = 90
+# dHash of 16x16 bits (see image_hash.py); max Hamming distance to the last saved frame for a
+# duplicate, -1 keeps every frame
+FRAME_HASH_SIZE = 16
+DEDUP_DISTANCE = 4
+WRITER_THREADS = 2
+
+
+def _init_worker():
+    # One video per process already fills the cores
+    cv2.setNumThreads(1)
+
+
+def extract_video(video_path, output_dir, frame_interval=FRAME_INTERVAL, jpeg_quality=JPEG_QUALITY,
+                  dedup_distance=DEDUP_DISTANCE, writer_threads=WRITER_THREADS):
+    """Frames of one video into output_dir as <video>_f<frame>.jpg. Returns its stats."""
+    t0 = time.perf_counter()
+    name = os.path.splitext(os.path.basename(video_path))[0]
+    stats = {"video": name, "frames": 0, "kept": 0, "saved": 0, "duplicates": 0, "seconds": 0.0, "error": None}
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        stats["error"] = f"Can not open video: {name}"
+        return stats
 
-def extract_frames(video_dir, output_dir, frame_interval=3):
+    params = [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality]
+    last_hash = None
+    index = 0
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=writer_threads) as pool:
+        while True:
+            if index % frame_interval:
+                if not cap.grab():
+                    break
+                index += 1
+                continue
+            ok, frame = cap.read()
+            if not ok:
+                break
+            stats["kept"] += 1
+            if dedup_distance >= 0:
+                h = image_hash.dhash(frame, FRAME_HASH_SIZE)
+                if last_hash is not None and image_hash.hamming(h, last_hash) <= dedup_distance:
+                    stats["duplicates"] += 1
+                    index += 1
+                    continue
+                last_hash = h
+            path = os.path.join(output_dir, f"{name}_f{index}.jpg")
+            pending.append(pool.submit(cv2.imwrite, path, frame, params))
+            # Bounded, so a long video does not queue all its frames in memory
+            while len(pending) > 2 * writer_threads:
+                stats["saved"] += bool(pending.popleft().result())
+            index += 1
+        stats["saved"] += sum(bool(f.result()) for f in pending)
+    cap.release()
+    stats["frames"] = index
+    stats["seconds"] = time.perf_counter() - t0
+    return stats
+
+
+def extract_frames(video_dir, output_dir, frame_interval=FRAME_INTERVAL, workers=None, jpeg_quality=JPEG_QUALITY,
+                   dedup_distance=DEDUP_DISTANCE, writer_threads=WRITER_THREADS):
+    """Every video in video_dir, one per worker process. Returns the per-video stats."""
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
         print(f"Đã tạo thư mục: {output_dir}")
 
-    video_extensions = ['*.mp4', '*.avi', '*.mov', '*.mkv']
-    video_files = []
-    for ext in video_extensions:
-        video_files.extend(glob.glob(os.path.join(video_dir, ext)))
-
+    video_files = sorted(e.path for e in os.scandir(video_dir)
+                         if e.is_file() and e.name.lower().endswith(VIDEO_EXTENSIONS))
     if not video_files:
         print("Can not find any video")
-        return
-
+        return []
     print(f"Found {len(video_files)} video")
 
-    total_images_saved = 0
+    t0 = time.perf_counter()
+    results = []
+    workers = max(1, min(workers or os.cpu_count() or 1, len(video_files)))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = [pool.submit(extract_video, path, output_dir, frame_interval, jpeg_quality, dedup_distance,
+                               writer_threads) for path in video_files]
+        for future in as_completed(futures):
+            stats = future.result()
+            results.append(stats)
+            if stats["error"]:
+                print(stats["error"])
+            else:
+                print(f"Done: {stats['video']} -> Saved {stats['saved']} images "
+                      f"({stats['duplicates']} duplicates dropped).")
+    seconds = time.perf_counter() - t0
 
-    for video_path in video_files:
-        filename = os.path.basename(video_path).split('.')[0]
-        cap = cv2.VideoCapture(video_path)
-        
-        if not cap.isOpened():
-            print(f"Can not open video: {filename}")
-            continue
+    frames = sum(s["frames"] for s in results)
+    kept = sum(s["kept"] for s in results)
+    saved = sum(s["saved"] for s in results)
+    duplicates = sum(s["duplicates"] for s in results)
+    print(f"Done, Total saved {saved} images to folder '{output_dir}'.")
+    print(f"{frames} frames in {seconds:.1f}s with {workers} workers: {frames / max(seconds, 1e-9):.0f} frames/s "
+          f"read, {saved / max(seconds, 1e-9):.0f} images/s saved; dedup dropped {duplicates} of {kept} "
+          f"sampled frames ({duplicates / max(kept, 1):.0%})")
+    return results
 
-        frame_count = 0
-        saved_count = 0
-        
-        while True:
-            success, frame = cap.read()
-            
-            if not success:
-                break
-            
-            if frame_count % frame_interval == 0:
-                output_filename = f"{filename}_f{frame_count}.jpg"
-                output_path = os.path.join(output_dir, output_filename)
-                
-                cv2.imwrite(output_path, frame)
-                saved_count += 1
-                total_images_saved += 1
-            
-            frame_count += 1
-
-        cap.release()
-        print(f"Done: {filename} -> Saved {saved_count} images.")
-
-    print(f"Done, Total saved {total_images_saved} images to folder '{output_dir}'.")
-
-input_folder = "ai/data/cam1/plastic"
-output_folder = "ai/data/cam1/pic1/plastic"
-frames_step = 4
-
-extract_frames(input_folder, output_folder, frames_step)
\ No newline at end of file
+
+if __name__ == "__main__":
+    # Under the guard: worker processes import this module (spawn on Windows)
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--input", default=INPUT_FOLDER, help="folder with the clips")
+    parser.add_argument("--output", default=OUTPUT_FOLDER)
+    parser.add_argument("--step", type=int, default=FRAME_INTERVAL, help="keep every step-th frame")
+    parser.add_argument("--workers", type=int, help="processes (default: one per CPU)")
+    parser.add_argument("--quality", type=int, default=JPEG_QUALITY, help="JPEG quality")
+    parser.add_argument("--dedup-distance", type=int, default=DEDUP_DISTANCE,
+                        help="max dHash distance to the last saved frame to drop a frame, -1 to keep all")
+    args = parser.parse_args()
+
+    extract_frames(args.input, args.output, args.step, args.workers, args.quality, args.dedup_distance)
@@ -0,0 +1,231 @@
+# Near-duplicates and train/val/test leakage in a YOLO dataset (<DATASET>/images/<split>/*).
+# Usage: python ai/scripts/prepare_data/find_leaks.py [--dataset DIR] [--distance 4] [--workers 8]
+#                                                    [--report leaks.json] [--regroup]
+# Every image gets a 64-bit dHash (image_hash.py) from a quarter-size grayscale decode, in a thread
+# pool (cv2 decodes without the GIL). Near pairs come from image_hash.near_pairs (multi-index hashing,
+# no all-pairs comparison) over the distinct hashes; duplicate clusters are the connected components.
+# A cluster spanning two splits is a leak: a val image with a near-copy in train measures memory, not
+# detection. Frames of one clip (extract_frames.py names them <clip>_f<frame>) are checked as well.
+# --regroup writes <DATASET>/.split_groups.json (clip + duplicate cluster per file stem) and rebuilds
+# the dataset with build_dataset.py, which from then on keeps every group inside one split.
+import argparse
+import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+import build_dataset
+import image_hash
+
+DATASET = build_dataset.OUTPUT_DIR
+MAX_DISTANCE = 4   # bits of 64; 0 finds exact (re-encoded) copies only
+IMAGE_EXTS = build_dataset.IMAGE_EXTS
+CLIP_FRAME = re.compile(r"^(.*)_f\d+$")
+
+
+def list_images(dataset):
+    """[(split, path)] for <dataset>/images/<split>/*, splits and files sorted."""
+    root = os.path.join(dataset, "images")
+    images = []
+    for split in sorted(e.name for e in os.scandir(root) if e.is_dir()):
+        with os.scandir(os.path.join(root, split)) as it:
+            images.extend((split, e.path) for e in sorted(it, key=lambda e: e.name)
+                          if e.name.lower().endswith(IMAGE_EXTS) and e.is_file())
+    return images
+
+
+def source_clip(stem):
+    """The clip a frame came from (its stem without _f<frame>), or the stem itself."""
+    m = CLIP_FRAME.match(stem)
+    return m.group(1) if m else stem
+
+
+def _hash_files(paths):
+    out = []
+    for path in paths:
+        # JPEG is decoded at 1/4 scale directly (libjpeg DCT scaling), the hash only needs 9x8 pixels
+        image = cv2.imread(path, cv2.IMREAD_REDUCED_GRAYSCALE_4)
+        out.append(None if image is None else image_hash.dhash(image))
+    return out
+
+
+def hash_images(paths, workers=8):
+    """(uint64 hashes, readable mask), one per path."""
+    chunks = [paths[i:i + 256] for i in range(0, len(paths), 256)]
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        values = [h for chunk in pool.map(_hash_files, chunks) for h in chunk]
+    ok = np.array([h is not None for h in values], bool)
+    return np.array([h or 0 for h in values], np.uint64), ok
+
+
+def components(n, a, b):
+    """Connected component per node of the graph with edges (a, b): the smallest node index in it."""
+    label = np.arange(n)
+    while True:
+        la, lb = label[a], label[b]
+        if (la == lb).all():
+            return label
+        # Hook every root onto the smallest root it touches, then point every node at its root
+        low = np.minimum(la, lb)
+        np.minimum.at(label, la, low)
+        np.minimum.at(label, lb, low)
+        while True:
+            up = label[label]
+            if (up == label).all():
+                break
+            label = up
+
+
+def analyze(dataset, max_distance=MAX_DISTANCE, workers=8, known=None):
+    """Duplicate clusters and leaks of dataset. known: {stem: hash} to skip hashing files seen before."""
+    t0 = time.perf_counter()
+    images = list_images(dataset)
+    splits = np.array([s for s, _ in images])
+    paths = [p for _, p in images]
+    stems = [os.path.splitext(os.path.basename(p))[0] for p in paths]
+    known = known or {}
+    todo = [i for i, stem in enumerate(stems) if stem not in known]
+    hashes = np.array([known.get(stem, 0) for stem in stems], np.uint64)
+    ok = np.ones(len(paths), bool)
+    if todo:
+        hashes[todo], ok[todo] = hash_images([paths[i] for i in todo], workers)
+    t_hash = time.perf_counter() - t0
+
+    # Equal hashes are joined directly, near_pairs only sees each distinct hash once
+    readable = np.flatnonzero(ok)
+    distinct, first, inverse = np.unique(hashes[readable], return_index=True, return_inverse=True)
+    near_i, near_j = image_hash.near_pairs(distinct, max_distance)
+    rep = readable[first]   # one image per distinct hash
+    cluster = components(len(paths), np.concatenate([readable, rep[near_i]]),
+                         np.concatenate([rep[inverse.ravel()], rep[near_j]]))
+    t_index = time.perf_counter() - t0 - t_hash
+
+    roots, size = np.unique(cluster, return_counts=True)
+    cluster_size = np.zeros(len(paths), np.int64)
+    cluster_size[roots] = size
+    in_cluster = cluster_size[cluster] > 1
+
+    # An image leaks when its cluster has a member in another split
+    leaked = np.zeros(len(paths), bool)
+    order = np.argsort(cluster, kind="stable")
+    c_sorted, s_sorted = cluster[order], splits[order]
+    starts = np.flatnonzero(np.r_[True, c_sorted[1:] != c_sorted[:-1]])
+    ends = np.r_[starts[1:], len(order)]
+    mixed = np.zeros(len(starts), bool)
+    for k in np.flatnonzero(ends - starts > 1).tolist():
+        mixed[k] = len(set(s_sorted[starts[k]:ends[k]].tolist())) > 1
+    leaked[order[np.repeat(mixed, ends - starts)]] = True
+
+    clips = {}
+    for split, stem in zip(splits.tolist(), stems):
+        clips.setdefault(source_clip(stem), set()).add(split)
+    clip_leaks = sorted(c for c, s in clips.items() if len(s) > 1)
+
+    clusters = []
+    for k in np.flatnonzero(ends - starts > 1).tolist():
+        members = order[starts[k]:ends[k]].tolist()
+        clusters.append({"size": len(members), "splits": sorted(set(splits[members].tolist())),
+                         "images": [paths[i] for i in members]})
+    clusters.sort(key=lambda c: -c["size"])
+
+    return {
+        "dataset": dataset,
+        "images": len(paths),
+        "unreadable": [paths[i] for i in np.flatnonzero(~ok).tolist()],
+        "max_distance": max_distance,
+        "splits": {s: int((splits == s).sum()) for s in sorted(set(splits.tolist()))},
+        "leaked": {s: int((leaked & (splits == s)).sum()) for s in sorted(set(splits.tolist()))},
+        "duplicates": int(in_cluster.sum()),
+        "redundant": int(in_cluster.sum() - len(clusters)),
+        "clusters": clusters,
+        "clips": len(clips),
+        "clip_leaks": clip_leaks,
+        "seconds": {"hash": round(t_hash, 2), "index": round(t_index, 2)},
+        "hashes": {stems[i]: h for i, h in zip(readable.tolist(), hashes[readable].tolist())},
+        "cluster_of": dict(zip(stems, (stems[c] for c in cluster.tolist()))),
+    }
+
+
+def print_report(report, top=10):
+    n = report["images"]
+    t = report["seconds"]
+    print(f"{n} images, hashed in {t['hash']:.1f}s ({n / max(t['hash'], 0.01):.0f} img/s), "
+          f"near pairs + clusters in {t['index']:.2f}s")
+    if report["unreadable"]:
+        print(f"Unreadable: {len(report['unreadable'])} (first: {report['unreadable'][0]})")
+    print(f"Duplicate clusters (<= {report['max_distance']} bits): {len(report['clusters'])} clusters, "
+          f"{report['duplicates']} images, {report['redundant']} redundant")
+    for split, count in report["splits"].items():
+        leaked = report["leaked"][split]
+        print(f"  {split:6} {count:7} images, {leaked:6} with a near-duplicate in another split "
+              f"({leaked / max(count, 1):.1%})")
+    print(f"Clips in more than one split: {len(report['clip_leaks'])} of {report['clips']}")
+    for c in report["clusters"][:top]:
+        print(f"  {c['size']:5} x {', '.join(c['splits']):16} {os.path.basename(c['images'][0])}")
+
+
+def split_groups(report):
+    """{stem: group}: a group is a clip plus every duplicate cluster touching it, transitively."""
+    stems = list(report["cluster_of"])
+    index = {s: i for i, s in enumerate(stems)}
+    clip_first = {}
+    a, b = [], []
+    for i, stem in enumerate(stems):
+        j = clip_first.setdefault(source_clip(stem), i)
+        a.append(i)
+        b.append(j)
+        a.append(i)
+        b.append(index[report["cluster_of"][stem]])
+    group = components(len(stems), np.array(a, np.int64), np.array(b, np.int64))
+    return {stem: source_clip(stems[g]) for stem, g in zip(stems, group.tolist())}
+
+
+def regroup(report, seed=build_dataset.SEED, workers=8, images_root=None, labels_root=None, classes=None):
+    """Write the groups file and rebuild the dataset's splits with build_dataset.py (its sources and
+    classes unless given). Returns build()'s counts."""
+    dataset = report["dataset"]
+    if not os.path.exists(os.path.join(dataset, build_dataset.MANIFEST)):
+        print(f"{dataset} was not made by build_dataset.py, nothing to rebuild")
+        return None
+    groups = split_groups(report)
+    with open(os.path.join(dataset, build_dataset.GROUPS), "w") as f:
+        f.write(json.dumps(groups))
+    sizes = {}
+    for g in groups.values():
+        sizes[g] = sizes.get(g, 0) + 1
+    print(f"\nRegroup: {len(sizes)} groups (largest {max(sizes.values(), default=0)} images) -> "
+          f"{build_dataset.GROUPS}, rebuilding {dataset}")
+    return build_dataset.build("split", seed, workers=workers, images_root=images_root, labels_root=labels_root,
+                               out_dir=dataset, classes=classes)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dataset", default=DATASET, help="YOLO dataset with images/<split>/")
+    parser.add_argument("--distance", type=int, default=MAX_DISTANCE, help="max dHash bit distance")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--report", help="write clusters and leaks to this JSON file")
+    parser.add_argument("--regroup", action="store_true",
+                        help="rebuild the splits (build_dataset.py) so clips and clusters are not split")
+    parser.add_argument("--seed", type=int, default=build_dataset.SEED, help="split seed for --regroup")
+    parser.add_argument("--images", help="source image root for --regroup (default: build_dataset.py's)")
+    parser.add_argument("--labels", help="source label root for --regroup")
+    args = parser.parse_args()
+
+    report = analyze(args.dataset, args.distance, args.workers)
+    print_report(report)
+    if args.report:
+        with open(args.report, "w") as f:
+            f.write(json.dumps({k: v for k, v in report.items() if k not in ("hashes", "cluster_of")}, indent=1))
+    if args.regroup and regroup(report, args.seed, args.workers, args.images, args.labels) is not None:
+        print()
+        # Files only moved between splits: their hashes are reused
+        print_report(analyze(args.dataset, args.distance, args.workers, known=report["hashes"]))
+
+
+if __name__ == "__main__":
+    main()
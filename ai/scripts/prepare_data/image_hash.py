@@ -0,0 +1,80 @@
+# Perceptual hashes for near-duplicate images (extract_frames.py, find_leaks.py).
+#   h = dhash(cv2.imread(path))     64-bit int
+#   hamming(h1, h2) <= 4            the same picture up to noise, recompression or a small shift
+#   near_pairs(hashes, 4)           every such pair among many uint64 hashes, without comparing all pairs
+# dHash: the image shrunk to (size+1)xsize gray, one bit per pair of horizontal neighbours (is the right
+# one brighter). Shrinking averages out sensor noise and JPEG artefacts, the gradients keep the layout.
+# 8 (64 bits) matches pictures of the same scene; an object a fifth of the frame wide moving by half its
+# width can leave it unchanged, so frames of one clip are compared with size 16 (256 bits).
+import cv2
+import numpy as np
+
+HASH_SIZE = 8
+
+
+def dhash(image, size=HASH_SIZE):
+    """size*size-bit difference hash of a BGR or gray image."""
+    # Resize first: converting a few pixels to gray is cheaper than converting the frame
+    small = cv2.resize(image, (size + 1, size), interpolation=cv2.INTER_AREA)
+    if small.ndim == 3:
+        small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+    bits = small[:, 1:] > small[:, :-1]
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def hamming(a, b):
+    """Number of differing bits between two hashes."""
+    return bin(a ^ b).count("1")
+
+
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], np.uint8)
+
+
+def hamming_many(a, b):
+    """Bit distance between two uint64 arrays, element-wise."""
+    x = np.bitwise_xor(np.asarray(a, np.uint64), np.asarray(b, np.uint64))
+    return _POPCOUNT[x.view(np.uint8)].reshape(-1, 8).sum(axis=1)
+
+
+def _bucket_pairs(order, starts, sizes):
+    """(i, j) for every pair of members inside each bucket order[start:start + size]."""
+    for size in np.unique(sizes).tolist():
+        first = starts[sizes == size]
+        if len(first) * size * (size - 1) // 2 <= 4_000_000:
+            members = order[first[:, None] + np.arange(size)]   # all buckets of this size at once
+            i, j = np.triu_indices(size, 1)
+            yield members[:, i].ravel(), members[:, j].ravel()
+        else:
+            # Few, large buckets: one member against the rest at a time keeps memory flat
+            for s in first.tolist():
+                members = order[s:s + size]
+                for k in range(size - 1):
+                    yield np.full(size - k - 1, members[k]), members[k + 1:]
+
+
+def near_pairs(hashes, max_distance=4, bits=64):
+    """(i, j) index arrays, i < j, of the hashes at most max_distance bits apart.
+    Multi-index hashing: the bits are cut into max_distance + 1 pieces, and two hashes that close agree
+    exactly on at least one piece (pigeonhole). Only hashes sharing a piece are compared, which is a
+    few per hash instead of all n. Equal hashes are best collapsed first (np.unique), they all share
+    every piece."""
+    hashes = np.asarray(hashes, np.uint64)
+    n = len(hashes)
+    edges = np.linspace(0, bits, max_distance + 2).astype(int)
+    found_i, found_j = [], []
+    for lo, hi in zip(edges[:-1].tolist(), edges[1:].tolist()):
+        piece = (hashes >> np.uint64(lo)) & np.uint64((1 << (hi - lo)) - 1)
+        order = np.argsort(piece, kind="stable")
+        sorted_piece = piece[order]
+        starts = np.flatnonzero(np.r_[True, sorted_piece[1:] != sorted_piece[:-1]])
+        sizes = np.diff(np.r_[starts, n])
+        shared = sizes > 1
+        for i, j in _bucket_pairs(order, starts[shared], sizes[shared]):
+            close = hamming_many(hashes[i], hashes[j]) <= max_distance
+            found_i.append(np.minimum(i[close], j[close]))
+            found_j.append(np.maximum(i[close], j[close]))
+    if not found_i:
+        return np.zeros(0, np.int64), np.zeros(0, np.int64)
+    # A pair that shares several pieces was found once per piece
+    pairs = np.unique(np.concatenate(found_i).astype(np.int64) * n + np.concatenate(found_j))
+    return pairs // n, pairs % n
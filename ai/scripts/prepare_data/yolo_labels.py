@@ -0,0 +1,197 @@
+# Bulk YOLO label I/O: a whole label folder in one NumPy array, vectorized checks, bulk write-back.
+#   labels = read_labels("ai/data/label_v3/glass_txt")
+#   labels.boxes              (N, 6) float64: file_index, cls, xc, yc, w, h (one row per well-formed line)
+#   validate(labels, 6)       {check: boolean mask over the rows}
+#   remap(labels, {3: 2})     class ids changed in place (an int sets every box to that class)
+#   write_labels(labels)      every file back, or into out_dir
+# All files are read into one buffer and tokenized at once: newlines and token starts are found with
+# array ops, the numbers are converted by NumPy in one call. No per-line Python.
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+FIELDS = 5
+CHECKS = {
+    "non_numeric": "coordinates must be float",
+    "class_not_int": "class_id is not integer",
+    "class_range": "class_id out of range",
+    "coord_range": "coordinate out of range [0,1]",
+}
+
+
+class LabelSet:
+    def __init__(self, paths, boxes, line, bad):
+        self.paths = paths    # label file per file_index
+        self.boxes = boxes    # (N, 6) float64 file_index, cls, xc, yc, w, h; NaN where a token is not a number
+        self.line = line      # (N,) line number of each row in its file, 1-based
+        self.bad = bad        # (M, 3) int64 file_index, line, fields: non-blank lines without 5 fields
+
+    def __len__(self):
+        return len(self.boxes)
+
+    def per_file(self):
+        """Boxes per file_index."""
+        return np.bincount(self.boxes[:, 0].astype(np.int64), minlength=len(self.paths))
+
+    def class_counts(self):
+        cls = self.boxes[:, 1]
+        cls = cls[np.isfinite(cls)].astype(np.int64)
+        ids, counts = np.unique(cls, return_counts=True)
+        return dict(zip(ids.tolist(), counts.tolist()))
+
+
+def _to_float(token):
+    try:
+        return float(token)
+    except ValueError:
+        return np.nan
+
+
+def parse_buffers(contents):
+    """Label file contents (bytes, one per file) -> (boxes, line, bad) as in LabelSet."""
+    contents = [c if not c or c.endswith(b"\n") else c + b"\n" for c in contents]
+    lines_per_file = np.fromiter((c.count(b"\n") for c in contents), np.int64, len(contents))
+    buf = b"".join(contents)
+    a = np.frombuffer(buf, np.uint8)
+
+    newline = a == 10
+    space = newline | (a == 32) | (a == 9) | (a == 13) | (a == 11) | (a == 12)
+    start = ~space
+    start[1:] &= space[:-1]
+    line_of_byte = np.cumsum(newline) - newline   # the newline itself belongs to its line
+    token_line = line_of_byte[start]
+    n_lines = int(lines_per_file.sum())
+    fields = np.bincount(token_line, minlength=n_lines)
+
+    file_of_line = np.repeat(np.arange(len(contents)), lines_per_file)
+    first_line = np.repeat(np.cumsum(lines_per_file) - lines_per_file, lines_per_file)
+    line_no = np.arange(n_lines) - first_line + 1
+
+    good = fields == FIELDS
+    wrong = ~good & (fields > 0)
+    bad = np.stack([file_of_line[wrong], line_no[wrong], fields[wrong]], axis=1).astype(np.int64)
+
+    values = np.zeros((0, FIELDS))
+    if good.any():
+        # The well-formed lines (blank ones are skipped by loadtxt) go through NumPy's C reader in one call
+        keep = (good | (fields == 0))[line_of_byte]
+        try:
+            values = np.loadtxt(io.BytesIO(a[keep].tobytes()), np.float64, comments=None, ndmin=2)
+        except ValueError:
+            # A token that is not a number: bytes.split() splits on the same ASCII whitespace, so the
+            # tokens line up with token_line, and only the bad token becomes NaN
+            tokens = np.array(buf.split())[good[token_line]]
+            values = np.fromiter((_to_float(t) for t in tokens), np.float64, len(tokens))
+    boxes = np.empty((int(good.sum()), 6), np.float64)
+    boxes[:, 0] = file_of_line[good]
+    boxes[:, 1:] = values.reshape(-1, FIELDS)
+    return boxes, line_no[good].astype(np.int32), bad
+
+
+def _read_all(paths):
+    out = []
+    for path in paths:
+        with open(path, "rb") as f:
+            out.append(f.read())
+    return out
+
+
+def _chunks(items, size=256):
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def list_labels(folder):
+    """Sorted .txt files directly in folder (classes.txt excluded)."""
+    with os.scandir(folder) as it:
+        return sorted(e.path for e in it if e.name.endswith(".txt") and e.name != "classes.txt" and e.is_file())
+
+
+def read_labels(folder_or_paths, workers=8):
+    """LabelSet for a folder of label files or a list of label paths."""
+    paths = list_labels(folder_or_paths) if isinstance(folder_or_paths, str) else list(folder_or_paths)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        contents = [c for chunk in pool.map(_read_all, _chunks(paths)) for c in chunk]
+    return LabelSet(paths, *parse_buffers(contents))
+
+
+def validate(labels, num_classes=None):
+    """{check name: boolean mask over labels.boxes} for the CHECKS that apply; field counts are labels.bad."""
+    cls, coords = labels.boxes[:, 1], labels.boxes[:, 2:]
+    finite = np.isfinite(labels.boxes[:, 1:]).all(axis=1)
+    checks = {
+        "non_numeric": ~np.isfinite(coords).all(axis=1),
+        "class_not_int": ~np.isfinite(cls) | (cls < 0) | (cls != np.floor(cls)),
+        "coord_range": finite & ((coords < 0) | (coords > 1)).any(axis=1),
+    }
+    if num_classes is not None:
+        checks["class_range"] = np.isfinite(cls) & (cls >= num_classes)
+    return checks
+
+
+def errors(labels, num_classes=None):
+    """[(path, line, message)] sorted by file and line, the way check_yolo.py prints them."""
+    out = [(int(f), int(ln), f"Wrong number of fields ({int(n)})") for f, ln, n in labels.bad.tolist()]
+    checks = validate(labels, num_classes)
+    flagged = np.flatnonzero(np.logical_or.reduce(list(checks.values())))
+    # Only the flagged rows get a message, so this loop is as long as the error list
+    for i in flagged.tolist():
+        f, cls, *coords = labels.boxes[i].tolist()
+        f, ln = int(f), int(labels.line[i])
+        if checks["class_not_int"][i]:
+            out.append((f, ln, CHECKS["class_not_int"]))
+        elif num_classes is not None and checks["class_range"][i]:
+            out.append((f, ln, f"class_id {int(cls)} >= {num_classes}"))
+        if checks["non_numeric"][i]:
+            out.append((f, ln, CHECKS["non_numeric"]))
+            continue
+        for v, name in zip(coords, ["xc", "yc", "w", "h"]):
+            if not (0 <= v <= 1):
+                out.append((f, ln, f"{name}={v} out of range [0,1]"))
+    out.sort(key=lambda e: e[:2])
+    return [(labels.paths[f], ln, msg) for f, ln, msg in out]
+
+
+def remap(labels, mapping):
+    """Change class ids in place: mapping is a {old: new} dict, or an int for every box."""
+    cls = labels.boxes[:, 1]
+    if isinstance(mapping, (int, np.integer)):
+        cls[np.isfinite(cls)] = mapping
+        return labels
+    ok = np.isfinite(cls) & (cls >= 0) & (cls == np.floor(cls))
+    ids = cls[ok].astype(np.int64)
+    lut = np.arange(max(int(ids.max(initial=-1)), *mapping.keys()) + 1, dtype=np.float64)
+    lut[list(mapping.keys())] = list(mapping.values())
+    cls[ok] = lut[ids]
+    return labels
+
+
+def write_labels(labels, out_dir=None, workers=8):
+    """Write every file back (or as out_dir/<name>), coordinates with 6 decimals as YOLO exports them.
+    Files with a malformed line (labels.bad, a non-numeric value or class id) are left alone, their rows
+    could not be written back faithfully. Returns (written, skipped paths)."""
+    checks = validate(labels)
+    skip = np.zeros(len(labels.paths), bool)
+    skip[labels.bad[:, 0]] = True
+    skip[labels.boxes[checks["non_numeric"] | checks["class_not_int"], 0].astype(np.int64)] = True
+
+    order = np.argsort(labels.boxes[:, 0], kind="stable")
+    rows = labels.boxes[order]
+    # Only the rows of written files are formatted: a skipped file may hold NaN or inf class ids
+    rows = rows[~skip[rows[:, 0].astype(np.int64)]]
+    text = [f"{int(c)} {x:.6f} {y:.6f} {w:.6f} {h:.6f}\n" for c, x, y, w, h in rows[:, 1:].tolist()]
+    bounds = np.searchsorted(rows[:, 0], np.arange(len(labels.paths) + 1))
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+
+    def write(files):
+        for i in files:
+            path = labels.paths[i] if not out_dir else os.path.join(out_dir, os.path.basename(labels.paths[i]))
+            with open(path, "w") as f:
+                f.write("".join(text[bounds[i]:bounds[i + 1]]))
+
+    todo = np.flatnonzero(~skip).tolist()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        list(pool.map(write, _chunks(todo)))
+    return len(todo), [labels.paths[i] for i in np.flatnonzero(skip)]
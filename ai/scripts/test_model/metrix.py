@@ -1,12 +1,15 @@
 import os
-import glob
+import sys
 import matplotlib.pyplot as plt
 import seaborn as sns
 from collections import Counter
 import yaml
 from pathlib import Path
 
-def analyze_yolo_dataset(dataset_path, data_yaml_path=None, img_formats=None):
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "prepare_data"))
+from dataset_manifest import open_manifest
+
+def analyze_yolo_dataset(dataset_path, data_yaml_path=None):
     """
     Hàm thống kê và vẽ biểu đồ cho dataset YOLO.
     
@@ -14,9 +17,6 @@ def analyze_yolo_dataset(dataset_path, data_yaml_path=None, img_formats=None):
         dataset_path (str): Đường dẫn đến thư mục chứa data (bao gồm images và labels).
         data_yaml_path (str): Đường dẫn file data.yaml để lấy tên class (tùy chọn).
     """
-    if img_formats is None:
-        img_formats = ['.jpg', '.jpeg', '.png', '.bmp', '.tif', '.tiff']
-
     # 1. Lấy danh sách tên class (nếu có file yaml)
     class_names = {}
     if data_yaml_path and os.path.exists(data_yaml_path):
@@ -29,23 +29,12 @@ def analyze_yolo_dataset(dataset_path, data_yaml_path=None, img_formats=None):
         except Exception as e:
             print(f"⚠️ Không đọc được file yaml: {e}")
 
-    # 2. Quét file ảnh và nhãn
+    # 2. Quét file ảnh và nhãn (manifest: chỉ đọc lại file đã thay đổi)
     print(f"\n🔄 Đang quét thư mục: {dataset_path} ...")
-    
-    image_files = []
-    label_files = []
-    
-    # Đệ quy tìm tất cả file
-    for root, dirs, files in os.walk(dataset_path):
-        for file in files:
-            ext = os.path.splitext(file)[1].lower()
-            if ext in img_formats:
-                image_files.append(os.path.join(root, file))
-            elif ext == '.txt' and file != 'classes.txt': # Bỏ qua classes.txt nếu có
-                label_files.append(os.path.join(root, file))
+    manifest = open_manifest(dataset_path)
 
-    num_images = len(image_files)
-    num_labels = len(label_files)
+    num_images = manifest.count("image", dataset_path)
+    num_labels = manifest.count("label", dataset_path)
 
     print(f"📊 TỔNG QUAN:")
     print(f"   - Số lượng ảnh tìm thấy: {num_images}")
@@ -53,29 +42,14 @@ def analyze_yolo_dataset(dataset_path, data_yaml_path=None, img_formats=None):
 
     if num_labels == 0:
         print("❌ Không tìm thấy file nhãn nào. Vui lòng kiểm tra đường dẫn.")
+        manifest.close()
         return
 
-    # 3. Đọc nội dung nhãn để thống kê
-    class_counts = Counter()
-    total_objects = 0
-    empty_labels = 0
-
-    for label_file in label_files:
-        try:
-            with open(label_file, 'r') as f:
-                lines = f.readlines()
-                if not lines:
-                    empty_labels += 1
-                    continue
-                
-                for line in lines:
-                    parts = line.strip().split()
-                    if len(parts) >= 1:
-                        class_id = int(parts[0]) # YOLO format: class_id x y w h
-                        class_counts[class_id] += 1
-                        total_objects += 1
-        except Exception as e:
-            print(f"⚠️ Lỗi đọc file {label_file}: {e}")
+    # 3. Thống kê nhãn
+    class_counts = Counter({cls: n for cls, n in manifest.class_counts(dataset_path).items() if cls is not None})
+    total_objects = sum(class_counts.values())
+    empty_labels = manifest.labels_without_boxes(dataset_path)
+    manifest.close()
 
     print(f"   - Tổng số vật thể (Objects): {total_objects}")
     print(f"   - Số ảnh không có vật thể (Empty): {empty_labels}")
@@ -0,0 +1,161 @@
+import os
+import sys
+import json
+import random
+import shutil
+import tempfile
+
+import cv2
+
+# Shared export / preprocessing code lives in the app
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "app", "src"))
+from inference import export_onnx, preprocess
+
+MODEL_PATH = r"app/models/best.pt"
+OUTPUT_PATH = r"app/models/best_int8.onnx"
+
+# Dataset produced by build_dataset.py: <DATASET_DIR>/images/{train,val,test}
+DATASET_DIR = r"ai/data/final_yolo_trash-dataset"
+DATA_YAML = r"ai/scripts/test_model/final_data copy.yaml"
+
+IMAGE_SIZE = 640
+CALIB_SPLIT = "train"
+CALIB_IMAGES = 200
+SEED = 0
+
+# Refuse to write the INT8 model if mAP50-95 drops more than this (absolute)
+MAX_MAP_DROP = 0.02
+
+# Keep the Detect head (box decode / DFL) in FP32, it is small and very sensitive
+EXCLUDE_HEAD = True
+
+IMAGE_EXT = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+def build_calibration_set(dataset_dir, split, count, seed):
+    img_dir = os.path.join(dataset_dir, "images", split)
+    if not os.path.isdir(img_dir):
+        raise FileNotFoundError(f"Can not find calibration folder: {img_dir}")
+
+    files = sorted(e.path for e in os.scandir(img_dir) if e.name.lower().endswith(IMAGE_EXT))
+    random.Random(seed).shuffle(files)
+    files = files[:count]
+    print(f"Calibration set: {len(files)} images from {img_dir}")
+    return files
+
+
+class YoloCalibrationReader:
+    """onnxruntime CalibrationDataReader feeding letterboxed images one at a time."""
+
+    def __init__(self, files, input_name, imgsz):
+        self.files = iter(files)
+        self.input_name = input_name
+        self.imgsz = imgsz
+
+    def get_next(self):
+        for path in self.files:
+            frame = cv2.imread(path)
+            if frame is None:
+                continue
+            blob, _ = preprocess([frame], self.imgsz)
+            return {self.input_name: blob}
+        return None
+
+    def rewind(self):
+        pass
+
+
+def find_head_nodes(onnx_path):
+    """Names of all nodes that belong to the last /model.N/ block (the Detect head)."""
+    import onnx
+    import re
+
+    graph = onnx.load(onnx_path).graph
+    pattern = re.compile(r"/model\.(\d+)/")
+    indices = [int(m.group(1)) for m in (pattern.search(n.name) for n in graph.node) if m]
+    if not indices:
+        return []
+    head = f"/model.{max(indices)}/"
+    return [n.name for n in graph.node if head in n.name]
+
+
+def quantize(fp32_path, int8_path, calib_files, imgsz):
+    import onnxruntime as ort
+    from onnxruntime.quantization import quantize_static, QuantFormat, QuantType, CalibrationMethod
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    prepped = fp32_path.replace(".onnx", "_prep.onnx")
+    quant_pre_process(fp32_path, prepped, skip_symbolic_shape=True)
+
+    input_name = ort.InferenceSession(prepped, providers=["CPUExecutionProvider"]).get_inputs()[0].name
+    exclude = find_head_nodes(prepped) if EXCLUDE_HEAD else []
+    print(f"Quantizing to INT8 ({len(exclude)} head nodes kept in FP32)...")
+
+    quantize_static(
+        prepped,
+        int8_path,
+        YoloCalibrationReader(calib_files, input_name, imgsz),
+        quant_format=QuantFormat.QDQ,
+        per_channel=True,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+        calibrate_method=CalibrationMethod.MinMax,
+        nodes_to_exclude=exclude,
+    )
+
+
+def evaluate(model_path, data_yaml, imgsz):
+    from ultralytics import YOLO
+
+    model = YOLO(model_path, task="detect")
+    metrics = model.val(data=data_yaml, imgsz=imgsz, batch=1, device="cpu", plots=False, verbose=False)
+    return {"map50": float(metrics.box.map50), "map50_95": float(metrics.box.map)}
+
+
+def main():
+    if not os.path.exists(MODEL_PATH):
+        raise FileNotFoundError(f"Can not find model at: {MODEL_PATH}")
+
+    calib_files = build_calibration_set(DATASET_DIR, CALIB_SPLIT, CALIB_IMAGES, SEED)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fp32_path = os.path.join(tmp, "model_fp32.onnx")
+        int8_path = os.path.join(tmp, "model_int8.onnx")
+
+        # Static shape (1, 3, 640, 640), AAttn fix baked in by export_onnx
+        export_onnx(MODEL_PATH, fp32_path, imgsz=IMAGE_SIZE)
+        quantize(fp32_path, int8_path, calib_files, IMAGE_SIZE)
+
+        print("Evaluating FP32 best.pt ...")
+        fp32 = evaluate(MODEL_PATH, DATA_YAML, IMAGE_SIZE)
+        print("Evaluating INT8 ONNX ...")
+        int8 = evaluate(int8_path, DATA_YAML, IMAGE_SIZE)
+
+        drop = fp32["map50_95"] - int8["map50_95"]
+        print(f"FP32  mAP50={fp32['map50']:.4f}  mAP50-95={fp32['map50_95']:.4f}")
+        print(f"INT8  mAP50={int8['map50']:.4f}  mAP50-95={int8['map50_95']:.4f}")
+        print(f"mAP50-95 drop: {drop:.4f} (limit {MAX_MAP_DROP})")
+
+        if drop > MAX_MAP_DROP:
+            print("REJECTED: accuracy drop over limit, INT8 model not written.")
+            sys.exit(1)
+
+        os.makedirs(os.path.dirname(os.path.abspath(OUTPUT_PATH)), exist_ok=True)
+        shutil.move(int8_path, OUTPUT_PATH)
+
+    report = {
+        "source": MODEL_PATH,
+        "calibration_images": len(calib_files),
+        "fp32": fp32,
+        "int8": int8,
+        "map50_95_drop": drop,
+        "max_map_drop": MAX_MAP_DROP,
+    }
+    with open(os.path.splitext(OUTPUT_PATH)[0] + ".json", "w") as f:
+        json.dump(report, f, indent=2)
+
+    print(f"Saved INT8 model: {OUTPUT_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,23 @@
 import os
-import torch
-import types
-from ultralytics import YOLO
+import sys
+
+import cv2
+
+# Same model loading, pre/post-processing and box drawing as the app
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "app", "src"))
+from inference import draw_detections, get_model
+from inference import detections as det
 
 
 MODEL_PATH = r"ai/runs/yolov12_trash_detection/weights/best.pt"
 
+# "auto", "torch", "onnx" or "openvino" (see inference.load_backend)
+BACKEND = "auto"
+
 MODE = "webcam"
 
 
-SOURCE = r"D:/ploc/test_images" 
+SOURCE = r"D:/ploc/test_images"
 
 IMAGE_SIZE = 640
 
@@ -18,91 +26,108 @@ CONF_THRES = 0.3
 SAVE_DIR = r"D:/ploc/test_results"
 RUN_NAME = "trash_yolov12_test"
 
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".bmp", ".webp")
 
-def load_model():
-    if not os.path.exists(MODEL_PATH):
-        raise FileNotFoundError(f"Can not find model at: {MODEL_PATH}")
 
+def pick_device():
+    """First GPU when torch sees one (torch backend only, the app itself stays on CPU)."""
+    try:
+        import torch
+    except ImportError:
+        return "cpu"
     if torch.cuda.is_available():
         print(f"GPU: {torch.cuda.get_device_name(0)}")
-        device = 0
-    else:
-        device = "cpu"
+        return 0
+    return "cpu"
+
 
+def load_model():
+    if not os.path.exists(MODEL_PATH):
+        raise FileNotFoundError(f"Can not find model at: {MODEL_PATH}")
+
+    device = pick_device()
     print("Load model from:", MODEL_PATH)
-    model = YOLO(MODEL_PATH)
-
-    def fix_aattn_compat(m):
-        for mod in m.model.modules():
-            if mod.__class__.__name__ == 'AAttn':
-                if not hasattr(mod, 'qkv') and hasattr(mod, 'qk') and hasattr(mod, 'v'):
-                    def _qkv(self, x):
-                        qk_out = self.qk(x)
-                        v_out = self.v(x)
-                        return torch.cat([qk_out, v_out], dim=1)
-                    mod.qkv = types.MethodType(_qkv, mod)
+    model = get_model(MODEL_PATH, BACKEND, device)
+    print(f"Load model successfully ({model.name} backend).\n")
 
-    try:
-        fix_aattn_compat(model)
-    except Exception:
-        pass
+    return model
 
-    print("Load model successfully.\n")
 
-    return model, device
+def detect(model, frame):
+    detections = det.from_boxes(model.predict(frame, conf=CONF_THRES, imgsz=IMAGE_SIZE))
+    return draw_detections(frame, detections, model.names), detections
 
 
 def run_webcam(model):
     print("'q' to quit.\n")
 
-    results = model.predict(
-        source=0,
-        show=True,
-        stream=True,
-        conf=CONF_THRES,
-        imgsz=IMAGE_SIZE
-    )
-
+    cap = cv2.VideoCapture(0)
     try:
-        for r in results:
-            pass
+        while True:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            annotated, _ = detect(model, frame)
+            cv2.imshow("webcam", annotated)
+            if cv2.waitKey(1) & 0xFF == ord("q"):
+                break
     except KeyboardInterrupt:
         pass
     finally:
-        import cv2
+        cap.release()
         cv2.destroyAllWindows()
         print("Quit.")
 
 
+def iter_source():
+    """(name, BGR frame) for an image, every image of a folder, or every frame of a video."""
+    if os.path.isdir(SOURCE):
+        for name in sorted(os.listdir(SOURCE)):
+            if name.lower().endswith(IMAGE_EXTS):
+                frame = cv2.imread(os.path.join(SOURCE, name))
+                if frame is not None:
+                    yield name, frame
+    elif SOURCE.lower().endswith(IMAGE_EXTS):
+        yield os.path.basename(SOURCE), cv2.imread(SOURCE)
+    else:
+        cap = cv2.VideoCapture(SOURCE)
+        stem = os.path.splitext(os.path.basename(SOURCE))[0]
+        index = 0
+        while True:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            yield f"{stem}_{index:06d}.jpg", frame
+            index += 1
+        cap.release()
+
+
 def run_image_folder_video(model):
     if not os.path.exists(SOURCE):
         raise FileNotFoundError(f"Can not find SOURCE: {SOURCE}")
 
+    out_dir = os.path.join(SAVE_DIR, RUN_NAME)
+    os.makedirs(out_dir, exist_ok=True)
     print(f"Start predict with SOURCE: {SOURCE}")
-    print(f"Results will be saved in: {SAVE_DIR}/{RUN_NAME}")
-
-    results = model.predict(
-        source=SOURCE,
-        imgsz=IMAGE_SIZE,
-        conf=CONF_THRES,
-        save=True,
-        project=SAVE_DIR,
-        name=RUN_NAME,
-        exist_ok=True, 
-        show=True
-    )
-
-    for r in results:
+    print(f"Results will be saved in: {out_dir}")
+
+    for name, frame in iter_source():
+        annotated, detections = detect(model, frame)
+        cv2.imwrite(os.path.join(out_dir, name), annotated)
+        cv2.imshow("result", annotated)
+        cv2.waitKey(1)
+
         print("-" * 50)
-        print("File:", r.path)
-        print("Số bbox:", len(r.boxes))
-        if len(r.boxes):
-            print("Classes:", r.boxes.cls.tolist())
-            print("Conf   :", r.boxes.conf.tolist())
+        print("File:", name)
+        print("Số bbox:", len(detections))
+        if len(detections):
+            print("Classes:", detections['cls'].tolist())
+            print("Conf   :", [round(c, 4) for c in detections['conf'].tolist()])
+    cv2.destroyAllWindows()
 
 
 def main():
-    model, device = load_model()
+    model = load_model()
 
     try:
         if MODE.lower() == "webcam":
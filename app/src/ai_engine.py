@@ -1,38 +1,19 @@
 import os
 import cv2
-import torch   
-import types
-from ultralytics import YOLO
-
-def fix_aattn_compat(m):
-    try:
-        model_to_scan = m.model if hasattr(m, 'model') else m
-        for mod in model_to_scan.modules():
-            if mod.__class__.__name__ == 'AAttn':
-                if not hasattr(mod, 'qkv') and hasattr(mod, 'qk') and hasattr(mod, 'v'):
-                    def _qkv(self, x):
-                        qk_out = self.qk(x)
-                        v_out = self.v(x)
-                        return torch.cat([qk_out, v_out], dim=1)
-                    # Gán hàm mới vào module (Monkey patching)
-                    mod.qkv = types.MethodType(_qkv, mod)
-        print("Applied AAttn compatibility fix.")
-    except Exception as e:
-        print(f"Could not apply AAttn fix: {e}")
+from inference import draw_detections, get_model
+from inference import detections as det
 
 class TrashDetector:
-    def __init__(self, model_path, conf_thres=0.25):
+    def __init__(self, model_path, conf_thres=0.25, backend="auto"):
         if not os.path.exists(model_path):
             print(f"Error: Model file not found at {model_path}")
             self.model = None
         else:
             print(f"Loading AI Model: {model_path}...")
             try:
-                self.model = YOLO(model_path)
-                
-                fix_aattn_compat(self.model) 
+                self.model = get_model(model_path, backend)
                 
-                print("Model loaded")
+                print(f"Model loaded ({self.model.name} backend)")
             except Exception as e:
                 print(f"Error loading model: {e}")
                 self.model = None
@@ -45,43 +26,32 @@ class TrashDetector:
 
     def detect(self, frame):
         if self.model is None:
-            return frame, []
+            return frame, det.empty()
 
         # convert BGR -> RGB before drawing boxes
         frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
 
         try:
-            results = self.model.predict(frame, conf=self.conf_thres, imgsz=640, verbose=False, stream=False)
-            
-            annotated_frame = results[0].plot() 
-            annotated_frame_rgb = cv2.cvtColor(annotated_frame, cv2.COLOR_BGR2RGB)
+            detections = det.from_boxes(self.model.predict(frame, conf=self.conf_thres, imgsz=640))
 
-            detections = []
-            for r in results[0].boxes:
-                cls_id = int(r.cls[0])
-                label = self.classes[cls_id] if cls_id in self.classes else str(cls_id)
-                conf = float(r.conf[0])
-                x1, y1, x2, y2 = r.xyxy[0]
-                center_x = int((x1 + x2) / 2)
-                
-                print(f"--> Detect: {label} ({conf:.2f})")
+            for d in detections:
+                print(f"--> Detect: {det.label_of(d, self.classes)} ({d['conf']:.2f})")
+            draw_detections(frame_rgb, detections, self.classes)
 
-                detections.append({
-                    "label": label,
-                    "conf": conf,
-                    "center_x": center_x,
-                    "box": (int(x1), int(y1), int(x2), int(y2))
-                })
-
-            return annotated_frame_rgb, detections
+            return frame_rgb, detections
             
-        except AttributeError as e:
-            print(f"Prediction Error: {e}")
-            return frame_rgb, []
         except Exception as e:
             print(f"Unexpected Error: {e}")
-            return frame_rgb, []
+            return frame_rgb, det.empty()
+
+    def detect_batch(self, frames, max_det=5):
+        """Run one predict call over a list of BGR frames, returns one detection array per frame."""
+        if self.model is None or not frames:
+            return [det.empty() for _ in frames]
+
+        results = self.model.predict_batch(list(frames), conf=self.conf_thres, imgsz=640, max_det=max_det)
+        return [det.from_boxes(boxes) for boxes in results]
     
     def update_conf(self, val):
         self.conf_thres = val
-        print(f"AI Config Updated: Conf={self.conf_thres}")
\ No newline at end of file
+        print(f"AI Config Updated: Conf={self.conf_thres}")
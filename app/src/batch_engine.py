@@ -0,0 +1,131 @@
+import threading
+import time
+
+from inference import detections as det
+
+
+class BatchInferenceService:
+    """Collects frames from several video sources and runs them through one batched predict call.
+
+    Each source has a single pending slot (a newer frame replaces an older one that has not
+    been picked up yet), and sources are served round-robin, so a fast camera cannot starve
+    a slow one when there are more sources than max_batch.
+    """
+
+    def __init__(self, detector, window_ms=10, max_batch=8):
+        self.detector = detector
+        self.window = window_ms / 1000.0
+        self.max_batch = max(1, max_batch)
+
+        self._cond = threading.Condition()
+        self._pending = {}  # source_id -> (frame, stamp, callback)
+        self._order = []    # round-robin order of registered sources
+        self._next = 0
+        self._running = False
+        self._thread = None
+
+        self.batches = 0
+        self.frames = 0
+        self.replaced = 0
+        self.last_batch_size = 0
+        self.last_batch_ms = 0.0
+
+    def register(self, source_id):
+        with self._cond:
+            if source_id not in self._order:
+                self._order.append(source_id)
+
+    def unregister(self, source_id):
+        with self._cond:
+            if source_id in self._order:
+                self._order.remove(source_id)
+            self._pending.pop(source_id, None)
+
+    def submit(self, source_id, frame, callback, stamp=None):
+        """Queue the newest frame of a source. callback(source_id, detections, stamp) runs on the service thread."""
+        with self._cond:
+            if source_id not in self._order:
+                self._order.append(source_id)
+            if source_id in self._pending:
+                self.replaced += 1
+            self._pending[source_id] = (frame, stamp if stamp is not None else time.time(), callback)
+            self._cond.notify()
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._loop, name="batch-inference", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join(timeout=2.0)
+
+    def _take_batch(self):
+        """Pick up to max_batch pending sources, starting after the last one served."""
+        batch = []
+        n = len(self._order)
+        for i in range(n):
+            if len(batch) >= self.max_batch:
+                break
+            source_id = self._order[(self._next + i) % n]
+            item = self._pending.pop(source_id, None)
+            if item is not None:
+                batch.append((source_id, item))
+        if batch and n:
+            last = self._order.index(batch[-1][0])
+            self._next = (last + 1) % n
+        return batch
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or not self._running, 0.1)
+                if not self._running:
+                    break
+                if not self._pending:
+                    continue
+
+                # Give the other sources a short window to join the batch
+                deadline = time.time() + self.window
+                while len(self._pending) < min(self.max_batch, len(self._order)):
+                    remaining = deadline - time.time()
+                    if remaining <= 0 or not self._running:
+                        break
+                    self._cond.wait(remaining)
+
+                batch = self._take_batch()
+
+            if not batch:
+                continue
+
+            t0 = time.time()
+            try:
+                results = self.detector.detect_batch([item[0] for _, item in batch])
+            except Exception as e:
+                print(f"Batch Inference Error: {e}")
+                results = [det.empty() for _ in batch]
+            self.last_batch_ms = (time.time() - t0) * 1000
+            self.last_batch_size = len(batch)
+            self.batches += 1
+            self.frames += len(batch)
+
+            for (source_id, (_, stamp, callback)), detections in zip(batch, results):
+                try:
+                    callback(source_id, detections, stamp)
+                except Exception as e:
+                    print(f"Batch Callback Error ({source_id}): {e}")
+
+    def get_stats(self):
+        return {
+            'batches': self.batches,
+            'frames': self.frames,
+            'replaced': self.replaced,
+            'avg_batch': round(self.frames / self.batches, 2) if self.batches else 0,
+            'last_batch_size': self.last_batch_size,
+            'last_batch_ms': round(self.last_batch_ms, 1),
+        }
@@ -0,0 +1,23 @@
+import time
+
+# A clock is any callable returning seconds. Live code uses time.time; replays and
+# simulations pass a VirtualClock so they can run faster than real time.
+system = time.time
+
+
+class VirtualClock:
+    """Time only moves when advance() or set() is called."""
+
+    def __init__(self, t=0.0):
+        self.t = t
+
+    def __call__(self):
+        return self.t
+
+    def advance(self, dt):
+        self.t += dt
+        return self.t
+
+    def set(self, t):
+        self.t = t
+        return self.t
@@ -0,0 +1,7 @@
+# Detector stack shared by the app, the tools and ai/scripts: one detection schema (detections),
+# one pre/post-processing implementation (processing), the runtime backends and the model registry.
+from . import detections
+from .processing import DEFAULT_IMGSZ, DEFAULT_IOU, letterbox, preprocess, postprocess, nms, draw_detections
+from .backends import (CACHE_DIR, TorchBackend, OnnxBackend, fix_aattn_compat, export_onnx, load_backend,
+                       warmup, cache_path)
+from .registry import get_model, loaded_models, model_key
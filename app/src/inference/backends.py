@@ -0,0 +1,246 @@
+import ast
+import hashlib
+import os
+import threading
+import time
+import types
+
+import numpy as np
+
+from .processing import DEFAULT_IMGSZ, DEFAULT_IOU, preprocess, postprocess
+
+# Heavy runtimes (torch/ultralytics, onnxruntime) are imported only by the backend that needs them.
+
+# Fused torch models and optimized ONNX graphs are cached per machine, keyed by the source file
+CACHE_DIR = os.environ.get("TRASH_DETECTOR_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "trash_detector"))
+
+
+def fix_aattn_compat(m):
+    import torch
+    try:
+        model_to_scan = m.model if hasattr(m, 'model') else m
+
+        for mod in model_to_scan.modules():
+            if mod.__class__.__name__ == 'AAttn':
+                if not hasattr(mod, 'qkv') and hasattr(mod, 'qk') and hasattr(mod, 'v'):
+                    def _qkv(self, x):
+                        qk_out = self.qk(x)
+                        v_out = self.v(x)
+                        return torch.cat([qk_out, v_out], dim=1)
+
+                    mod.qkv = types.MethodType(_qkv, mod)
+
+        print("Applied YOLOv12 AAttn compatibility fix.")
+    except Exception as e:
+        print(f"Warning: Could not apply AAttn fix: {e}")
+
+
+# ---------------- Model cache ----------------
+
+def cache_path(model_path, tag, ext, cache_dir=CACHE_DIR):
+    """Cache file for model_path: a new one whenever the file, or the runtime in tag, changes."""
+    st = os.stat(model_path)
+    key = f"{os.path.abspath(model_path)}|{st.st_size}|{st.st_mtime_ns}|{tag}"
+    stem = os.path.splitext(os.path.basename(model_path))[0]
+    return os.path.join(cache_dir, f"{stem}-{hashlib.sha1(key.encode()).hexdigest()[:16]}{ext}")
+
+
+def _save_fused(model, path):
+    """Checkpoint in the layout ultralytics loads back (model + train_args), written atomically."""
+    import torch
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        args = getattr(model.model, "args", {})
+        tmp = path + ".tmp"
+        torch.save({"model": model.model, "train_args": args if isinstance(args, dict) else vars(args)}, tmp)
+        os.replace(tmp, path)
+        print(f"Cached fused model: {path}")
+    except Exception as e:
+        print(f"Warning: Could not cache fused model: {e}")
+
+
+def _save_optimized(model_path, path):
+    """Portable (ORT_ENABLE_EXTENDED) optimized copy of an ONNX model, written atomically."""
+    import onnxruntime as ort
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED
+        tmp = path + ".tmp"
+        opts.optimized_model_filepath = tmp
+        ort.InferenceSession(model_path, sess_options=opts, providers=["CPUExecutionProvider"])
+        os.replace(tmp, path)
+    except Exception as e:
+        print(f"Warning: Could not cache optimized ONNX model: {e}")
+
+
+def warmup(model, sizes=(DEFAULT_IMGSZ,), runs=2, shape=(480, 640, 3), progress=None):
+    """Dummy inferences at every input size the app uses, so the first real frame does not pay for
+    allocations and kernel selection. progress(done, total) after each run. Returns ms per run."""
+    if getattr(model, "fixed_batch", None) is not None:
+        sizes = [model.imgsz]  # static ONNX export, imgsz is ignored
+    frame = np.full(shape, 114, dtype=np.uint8)
+    total = len(sizes) * runs
+    times = []
+    for imgsz in sizes:
+        for _ in range(runs):
+            t0 = time.perf_counter()
+            model.predict(frame, conf=0.25, imgsz=imgsz, max_det=5)
+            times.append((time.perf_counter() - t0) * 1000)
+            if progress:
+                progress(len(times), total)
+    return times
+
+
+# ---------------- Backends ----------------
+
+class TorchBackend:
+    """ultralytics YOLO on torch, the reference path.
+
+    Conv+BN fusion would otherwise run on the first predict of every launch: the fused model
+    is kept in cache_dir and loaded ready-made next time (cache_dir=None: no cache).
+    The ultralytics predictor keeps per-call state, so calls are serialized for callers sharing
+    one instance through the model registry.
+    device: torch device passed to every predict, 'cpu' (the app) or a CUDA index like 0.
+    """
+    name = "torch"
+
+    def __init__(self, model_path, cache_dir=CACHE_DIR, device="cpu"):
+        import torch
+        from ultralytics import YOLO, __version__ as ultralytics_version
+        self.model_path = model_path
+        self.device = device
+        self.cached = False
+        self.model = None
+        cached = None
+        if cache_dir:
+            cached = cache_path(model_path, f"fused|{ultralytics_version}|{torch.__version__}", ".fused.pt", cache_dir)
+        if cached and os.path.exists(cached):
+            try:
+                self.model = YOLO(cached)
+                self.cached = True
+            except Exception as e:
+                print(f"Warning: Ignoring fused model cache {cached}: {e}")
+        if self.model is None:
+            self.model = YOLO(model_path)
+            self.model.fuse()
+            if cached:
+                _save_fused(self.model, cached)
+        # The AAttn shim is a bound method and does not pickle: attached after caching, on every load
+        fix_aattn_compat(self.model)
+        self.names = dict(self.model.names)
+        self._lock = threading.Lock()
+
+    def predict_batch(self, frames, conf=0.25, imgsz=DEFAULT_IMGSZ, max_det=300, iou=DEFAULT_IOU):
+        with self._lock:
+            results = self.model.predict(list(frames), conf=conf, iou=iou, imgsz=imgsz,
+                                         verbose=False, device=self.device, max_det=max_det)
+        # boxes.data is (N, 6) xyxy/conf/cls: a single host transfer per frame
+        return [r.boxes.data.cpu().numpy().astype(np.float32) for r in results]
+
+    def predict(self, frame, conf=0.25, imgsz=DEFAULT_IMGSZ, max_det=300, iou=DEFAULT_IOU):
+        return self.predict_batch([frame], conf, imgsz, max_det, iou)[0]
+
+
+class OnnxBackend:
+    """ONNX model on onnxruntime (CPU or OpenVINO execution provider), NumPy pre/post-processing."""
+    name = "onnx"
+
+    def __init__(self, model_path, provider="cpu", threads=0, cache_dir=CACHE_DIR):
+        import onnxruntime as ort
+        self.model_path = model_path
+
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            opts.intra_op_num_threads = threads
+
+        available = ort.get_available_providers()
+        providers = ["CPUExecutionProvider"]
+        if provider == "openvino":
+            if "OpenVINOExecutionProvider" in available:
+                providers.insert(0, "OpenVINOExecutionProvider")
+                self.name = "openvino"
+            else:
+                print("OpenVINO provider not available, using onnxruntime CPU")
+
+        self.cached = False
+        if cache_dir and providers == ["CPUExecutionProvider"]:
+            cached = cache_path(model_path, f"ort|{ort.__version__}", ".opt.onnx", cache_dir)
+            self.cached = os.path.exists(cached)
+            if not self.cached:
+                _save_optimized(model_path, cached)
+            if os.path.exists(cached):
+                # Graph fusions are done once; only the hardware-specific layout passes run here
+                model_path = cached
+        self.session = ort.InferenceSession(model_path, sess_options=opts, providers=providers)
+        inp = self.session.get_inputs()[0]
+        self.input_name = inp.name
+        # Static exports have fixed (1, 3, H, W); dynamic ones have symbolic dims
+        self.fixed_batch = inp.shape[0] if isinstance(inp.shape[0], int) else None
+        self.imgsz = inp.shape[2] if isinstance(inp.shape[2], int) else DEFAULT_IMGSZ
+
+        meta = self.session.get_modelmeta().custom_metadata_map
+        try:
+            self.names = {int(k): v for k, v in ast.literal_eval(meta.get("names", "{}")).items()}
+        except (ValueError, SyntaxError):
+            self.names = {}
+
+    def predict_batch(self, frames, conf=0.25, imgsz=None, max_det=300, iou=DEFAULT_IOU):
+        # Input size is baked into static exports
+        imgsz = self.imgsz if self.fixed_batch is not None or imgsz is None else imgsz
+        step = self.fixed_batch or len(frames)
+        out = []
+        for i in range(0, len(frames), step):
+            chunk = frames[i:i + step]
+            blob, meta = preprocess(chunk, imgsz)
+            pred = self.session.run(None, {self.input_name: blob})[0]
+            out.extend(postprocess(p, m, conf, iou, max_det) for p, m in zip(pred, meta))
+        return out
+
+    def predict(self, frame, conf=0.25, imgsz=None, max_det=300, iou=DEFAULT_IOU):
+        return self.predict_batch([frame], conf, imgsz, max_det, iou)[0]
+
+
+def export_onnx(pt_path, onnx_path=None, imgsz=DEFAULT_IMGSZ, dynamic=False):
+    """Export best.pt to ONNX once. The AAttn fix is applied before tracing, so it is baked into the graph."""
+    from ultralytics import YOLO
+    model = YOLO(pt_path)
+    fix_aattn_compat(model)
+    exported = model.export(format="onnx", imgsz=imgsz, dynamic=dynamic, simplify=True, device="cpu")
+    if onnx_path and os.path.abspath(exported) != os.path.abspath(onnx_path):
+        os.replace(exported, onnx_path)
+        exported = onnx_path
+    print(f"Exported ONNX model: {exported}")
+    return exported
+
+
+def _onnx_sibling(pt_path):
+    onnx_path = os.path.splitext(pt_path)[0] + ".onnx"
+    if os.path.exists(onnx_path) and os.path.getmtime(onnx_path) >= os.path.getmtime(pt_path):
+        return onnx_path
+    return None
+
+
+def load_backend(model_path, backend="auto", device="cpu"):
+    """backend: 'auto', 'torch', 'onnx' or 'openvino'.
+
+    'auto' uses onnxruntime when the model is an .onnx file or best.pt has an up-to-date
+    best.onnx next to it, and falls back to torch otherwise.
+    device only applies to the torch backend ('cpu', or 0 for the first GPU).
+    """
+    is_onnx = model_path.endswith(".onnx")
+
+    if backend in ("onnx", "openvino") or (backend == "auto" and is_onnx):
+        onnx_path = model_path if is_onnx else (_onnx_sibling(model_path) or export_onnx(model_path))
+        return OnnxBackend(onnx_path, provider="openvino" if backend == "openvino" else "cpu")
+
+    if backend == "auto":
+        onnx_path = _onnx_sibling(model_path)
+        if onnx_path:
+            try:
+                return OnnxBackend(onnx_path)
+            except ImportError:
+                print("onnxruntime not installed, using torch backend")
+
+    return TorchBackend(model_path, device=device)
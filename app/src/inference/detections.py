@@ -0,0 +1,48 @@
+import numpy as np
+
+# One row per detected box. Built from the (N, 6) xyxy/conf/cls array a backend returns,
+# so the whole frame costs a single device-to-host transfer and no per-box Python objects.
+DETECTION_DTYPE = np.dtype([
+    ('x1', np.float32),
+    ('y1', np.float32),
+    ('x2', np.float32),
+    ('y2', np.float32),
+    ('conf', np.float32),
+    ('cls', np.int32),
+    ('center_x', np.float32),
+])
+
+
+def empty():
+    return np.zeros(0, dtype=DETECTION_DTYPE)
+
+
+def from_boxes(boxes):
+    """(N, 6) [x1, y1, x2, y2, conf, cls] array -> structured DETECTION_DTYPE array."""
+    boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 6)
+    dets = np.empty(len(boxes), dtype=DETECTION_DTYPE)
+    dets['x1'] = boxes[:, 0]
+    dets['y1'] = boxes[:, 1]
+    dets['x2'] = boxes[:, 2]
+    dets['y2'] = boxes[:, 3]
+    dets['conf'] = boxes[:, 4]
+    dets['cls'] = boxes[:, 5]
+    dets['center_x'] = (boxes[:, 0] + boxes[:, 2]) * 0.5
+    return dets
+
+
+def xyxy(dets):
+    """(N, 4) float32 view-like copy of the box corners."""
+    return np.stack([dets['x1'], dets['y1'], dets['x2'], dets['y2']], axis=1)
+
+
+def best(dets):
+    """Row with the highest confidence, or None when there are no detections."""
+    if len(dets) == 0:
+        return None
+    return dets[int(dets['conf'].argmax())]
+
+
+def label_of(det, names):
+    cls_id = int(det['cls'])
+    return names.get(cls_id, str(cls_id)) if names else str(cls_id)
@@ -0,0 +1,104 @@
+import cv2
+import numpy as np
+
+from . import detections as det
+
+# The one letterbox / decode / NMS implementation: OnnxBackend runs it around the raw graph, the
+# INT8 calibration feeds the same preprocess(), and every consumer draws boxes with draw_detections().
+
+DEFAULT_IMGSZ = 640
+DEFAULT_IOU = 0.7  # same as ultralytics predict default
+MAX_NMS = 30000
+MAX_WH = 7680      # class offset for batched per-class NMS
+
+
+def letterbox(frame, imgsz=DEFAULT_IMGSZ, color=(114, 114, 114)):
+    """Resize keeping aspect ratio and pad to imgsz x imgsz. Returns (image, ratio, (pad_w, pad_h))."""
+    h, w = frame.shape[:2]
+    r = min(imgsz / h, imgsz / w)
+    new_w, new_h = int(round(w * r)), int(round(h * r))
+    dw, dh = (imgsz - new_w) / 2, (imgsz - new_h) / 2
+
+    if (w, h) != (new_w, new_h):
+        frame = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    top, bottom = int(round(dh - 0.1)), int(round(dh + 0.1))
+    left, right = int(round(dw - 0.1)), int(round(dw + 0.1))
+    frame = cv2.copyMakeBorder(frame, top, bottom, left, right, cv2.BORDER_CONSTANT, value=color)
+    return frame, r, (left, top)
+
+
+def preprocess(frames, imgsz=DEFAULT_IMGSZ):
+    """BGR HWC uint8 frames -> NCHW float32 RGB blob in [0, 1], plus per-frame (ratio, pad)."""
+    blob = np.empty((len(frames), 3, imgsz, imgsz), dtype=np.float32)
+    meta = []
+    for i, frame in enumerate(frames):
+        img, r, pad = letterbox(frame, imgsz)
+        # BGR -> RGB and HWC -> CHW in one strided copy
+        blob[i] = img[:, :, ::-1].transpose(2, 0, 1)
+        meta.append((r, pad, frame.shape[:2]))
+    blob *= 1.0 / 255.0
+    return blob, meta
+
+
+def nms(boxes, scores, iou_thres):
+    """Greedy NMS over xyxy boxes. Returns kept indices, highest score first."""
+    x1, y1, x2, y2 = boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
+    areas = (x2 - x1).clip(0) * (y2 - y1).clip(0)
+    order = scores.argsort()[::-1]
+    keep = []
+    while order.size:
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+        xx1 = np.maximum(x1[i], x1[rest])
+        yy1 = np.maximum(y1[i], y1[rest])
+        xx2 = np.minimum(x2[i], x2[rest])
+        yy2 = np.minimum(y2[i], y2[rest])
+        inter = (xx2 - xx1).clip(0) * (yy2 - yy1).clip(0)
+        iou = inter / (areas[i] + areas[rest] - inter + 1e-9)
+        order = rest[iou <= iou_thres]
+    return np.asarray(keep, dtype=np.int64)
+
+
+def postprocess(pred, meta, conf=0.25, iou=DEFAULT_IOU, max_det=300):
+    """Raw YOLOv8/v12 head output (4 + nc, N) for one image -> (M, 6) x1, y1, x2, y2, conf, cls."""
+    pred = pred.T  # (N, 4 + nc)
+    cls_scores = pred[:, 4:]
+    cls_ids = cls_scores.argmax(1)
+    scores = cls_scores[np.arange(len(cls_scores)), cls_ids]
+
+    mask = scores > conf
+    if not mask.any():
+        return np.zeros((0, 6), dtype=np.float32)
+    xywh, scores, cls_ids = pred[mask, :4], scores[mask], cls_ids[mask]
+    if len(scores) > MAX_NMS:
+        top = scores.argsort()[::-1][:MAX_NMS]
+        xywh, scores, cls_ids = xywh[top], scores[top], cls_ids[top]
+
+    boxes = np.empty_like(xywh)
+    boxes[:, :2] = xywh[:, :2] - xywh[:, 2:] / 2
+    boxes[:, 2:] = xywh[:, :2] + xywh[:, 2:] / 2
+
+    keep = nms(boxes + (cls_ids * MAX_WH)[:, None], scores, iou)[:max_det]
+    boxes, scores, cls_ids = boxes[keep], scores[keep], cls_ids[keep]
+
+    # Undo letterbox
+    r, (pad_w, pad_h), (h, w) = meta
+    boxes[:, [0, 2]] = ((boxes[:, [0, 2]] - pad_w) / r).clip(0, w)
+    boxes[:, [1, 3]] = ((boxes[:, [1, 3]] - pad_h) / r).clip(0, h)
+
+    out = np.empty((len(keep), 6), dtype=np.float32)
+    out[:, :4] = boxes
+    out[:, 4] = scores
+    out[:, 5] = cls_ids
+    return out
+
+
+def draw_detections(image, detections, names, scale=1.0, color=(0, 255, 0)):
+    """Boxes and "label conf" captions in place, detections scaled by scale to image coordinates."""
+    corners = (det.xyxy(detections) * scale).astype(np.int32)
+    for (x1, y1, x2, y2), d in zip(corners.tolist(), detections):
+        cv2.rectangle(image, (x1, y1), (x2, y2), color, 2)
+        cv2.putText(image, f"{det.label_of(d, names)} {d['conf']:.2f}", (x1, y1 - 10),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
+    return image
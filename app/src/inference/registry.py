@@ -0,0 +1,43 @@
+import os
+import threading
+import weakref
+
+from .backends import load_backend
+
+# Process-wide model registry: every consumer of the same weights (VideoThread, TrashDetector,
+# the scripts) gets the same backend instance instead of loading its own copy. Entries are weak,
+# a model is freed once the last consumer drops it, and a new mtime is a new entry.
+
+_models = weakref.WeakValueDictionary()
+_loading = {}  # key -> lock held while that model loads, concurrent requests wait for it
+_lock = threading.Lock()
+
+
+def model_key(model_path, backend="auto", device="cpu"):
+    st = os.stat(model_path)
+    return os.path.abspath(model_path), st.st_mtime_ns, backend, device
+
+
+def get_model(model_path, backend="auto", device="cpu"):
+    """Shared backend for model_path (see load_backend for backend and device), loaded on first use."""
+    key = model_key(model_path, backend, device)
+    with _lock:
+        model = _models.get(key)
+        if model is not None:
+            return model
+        loading = _loading.setdefault(key, threading.Lock())
+    try:
+        with loading:
+            model = _models.get(key)
+            if model is None:
+                model = load_backend(model_path, backend, device)
+                _models[key] = model
+            return model
+    finally:
+        with _lock:
+            _loading.pop(key, None)
+
+
+def loaded_models():
+    """{(path, mtime_ns, backend, device): backend instance} for the models currently alive."""
+    return dict(_models.items())
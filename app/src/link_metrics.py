@@ -0,0 +1,124 @@
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+# Auto mode slows down above these (p95 RTT / probe loss over the metrics window)
+MAX_RTT_MS = 150.0
+MAX_LOSS_PCT = 10.0
+
+
+def _seq_before(a, b):
+    """True if u16 sequence number a comes before b (handles wrap-around)."""
+    return a != b and ((b - a) & 0xFFFF) < 0x8000
+
+
+class LinkMetrics:
+    """Round-trip time and loss statistics from sequence-numbered echo probes.
+
+    probe_sent() / probe_answered() are called by the network thread, snapshot() and
+    speed_factor() from anywhere. Percentiles and loss are over the last `window` probes,
+    a probe without a reply after `timeout` seconds counts as lost.
+    """
+
+    def __init__(self, window=200, timeout=1.0):
+        self.window = window
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._rtts = deque(maxlen=window)       # ms
+        self._outcomes = deque(maxlen=window)   # 1 answered, 0 lost
+        self._pending = {}                      # seq -> send time
+        self._last_seq = None
+        self.sent = 0
+        self.received = 0
+        self.lost = 0
+        self.reordered = 0
+        self.late = 0                           # reply after the probe was already counted lost
+        self.last_reply = 0.0
+
+    def probe_sent(self, seq, now=None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._pending[seq] = now
+            self.sent += 1
+
+    def probe_answered(self, seq, now=None):
+        """Returns the RTT in ms, or None for an unknown / duplicate / too late reply."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            sent_at = self._pending.pop(seq, None)
+            if sent_at is None:
+                self.late += 1
+                return None
+            rtt = (now - sent_at) * 1000
+            self._rtts.append(rtt)
+            self._outcomes.append(1)
+            self.received += 1
+            self.last_reply = now
+            if self._last_seq is not None and _seq_before(seq, self._last_seq):
+                self.reordered += 1
+            else:
+                self._last_seq = seq
+            return rtt
+
+    def expire(self, now=None):
+        """Count probes older than the timeout as lost."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            expired = [s for s, t in self._pending.items() if now - t > self.timeout]
+            for s in expired:
+                del self._pending[s]
+                self._outcomes.append(0)
+                self.lost += 1
+
+    def percentiles(self):
+        with self._lock:
+            if not self._rtts:
+                return None
+            return np.percentile(np.fromiter(self._rtts, float, len(self._rtts)), (50, 95, 99))
+
+    def loss_pct(self):
+        with self._lock:
+            if not self._outcomes:
+                return 0.0
+            return 100.0 * (len(self._outcomes) - sum(self._outcomes)) / len(self._outcomes)
+
+    def snapshot(self):
+        pct = self.percentiles()
+        loss = self.loss_pct()
+        with self._lock:
+            return {
+                'rtt_p50': None if pct is None else round(float(pct[0]), 1),
+                'rtt_p95': None if pct is None else round(float(pct[1]), 1),
+                'rtt_p99': None if pct is None else round(float(pct[2]), 1),
+                'loss_pct': round(loss, 1),
+                'sent': self.sent,
+                'received': self.received,
+                'lost': self.lost,
+                'reordered': self.reordered,
+                'late': self.late,
+                'samples': len(self._rtts),
+            }
+
+    def speed_factor(self, max_rtt_ms=MAX_RTT_MS, max_loss_pct=MAX_LOSS_PCT, min_factor=0.4):
+        """1.0 on a healthy link, shrinking towards min_factor as p95 RTT or loss exceeds its limit."""
+        pct = self.percentiles()
+        if pct is None:
+            return 1.0  # No probes answered (JSON-only firmware): nothing to judge
+        factor = 1.0
+        if pct[1] > max_rtt_ms:
+            factor = min(factor, max_rtt_ms / pct[1])
+        loss = self.loss_pct()
+        if loss > max_loss_pct:
+            factor = min(factor, max_loss_pct / loss)
+        return max(min_factor, factor)
+
+    def reset(self):
+        with self._lock:
+            self._rtts.clear()
+            self._outcomes.clear()
+            self._pending.clear()
+            self._last_seq = None
+            self.sent = self.received = self.lost = self.reordered = self.late = 0
+            self.last_reply = 0.0
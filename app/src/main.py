@@ -1,23 +1,29 @@
 # main.py - FLEXIBLE UI VERSION
 import sys
+import startup_profile
+# --profile-startup [FILE]: time every import below and each init phase up to the first paint
+PROFILE = startup_profile.from_argv(sys.argv)
 import os
-import requests
 import datetime
+import time
 import traceback
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QHBoxLayout, 
                             QVBoxLayout, QStackedWidget, QTabWidget, QLabel, 
                             QGroupBox, QGridLayout, QPushButton, QSizePolicy,
                             QMessageBox, QDialog, QScrollArea)
 from PyQt6.QtCore import Qt, QTimer
-from PyQt6.QtGui import QPixmap, QFont, QIcon
+from PyQt6.QtGui import QFont, QIcon
 
 from network import NetworkThread
 from styles import MAIN_THEME, BTN_STOP_STYLE
-from ui.widgets import SensorBox, LoadingOverlay
+from ui.widgets import SensorBox, LoadingOverlay, VideoWidget
 from ui.panels import ManualPanel, AutoPanel, SettingsPanel
 from video import VideoThread
 from sound_manager import SoundManager
 from robot_controller import RobotController, RobotState
+from inference import detections as det
+from tracker import Tracker
+from recording import Recorder
 
 # --- CƠ CHẾ BẮT LỖI TOÀN CỤC (QUAN TRỌNG) ---
 def exception_hook(exctype, value, tb):
@@ -104,8 +110,9 @@ class DetectionCompleteDialog(QDialog):
         self.accept()
 
 class RobotApp(QMainWindow):
-    def __init__(self):
+    def __init__(self, record_path=None):
         super().__init__()
+        PROFILE.step("window")
         icon_path = "app/resources/icons/rover.ico"
         if os.path.exists(icon_path):
             self.setWindowIcon(QIcon(icon_path))
@@ -130,23 +137,42 @@ class RobotApp(QMainWindow):
              self.MODEL_PATH = "app/models/best.pt"
 
         # --- CONTROLLER ---
+        PROFILE.step("controller")
         self.robot = RobotController(base_speed=self.auto_speed, screen_width=640)
+        # Keeps one target locked across frames and predicts it between inference results
+        self.tracker = Tracker(max_age=self.robot.LOST_TARGET_TIMEOUT)
+        self.ai_names = {}
 
         # --- THREADS ---
+        PROFILE.step("network thread")
         self.net_thread = NetworkThread("10.230.248.1")
         self.net_thread.data_received.connect(self.update_sensors)
         self.net_thread.ping_signal.connect(self.update_ping)
+        self.net_thread.link_signal.connect(self.update_link_stats)
         self.net_thread.start()
         
+        PROFILE.step("sound")
         self.sound = SoundManager(self.net_thread)
         
+        PROFILE.step("video thread")
         self.video_thread = VideoThread("http://10.230.248.174:81/stream", self.MODEL_PATH)
-        self.video_thread.change_pixmap_signal.connect(self.update_image)
         self.video_thread.ai_results_signal.connect(self.handle_ai_detection)
         self.video_thread.fps_signal.connect(self.update_fps)
-        self.video_thread.start()
+        self.video_thread.stats_signal.connect(self.update_pipeline_stats)
+        self.video_thread.model_status_signal.connect(self.update_model_status)
+
+        # Session recording for tools/replay.py
+        self.recorder = None
+        self._recorded_factor = 1.0
+        self._recorded_state = None
+        if record_path:
+            self.recorder = Recorder(record_path)
+            self.net_thread.recorder = self.recorder
+            self.video_thread.recorder = self.recorder
+            self._record_config()
 
         # Timers
+        PROFILE.step("recorder + timers")
         self.auto_timer = QTimer()
         self.auto_timer.timeout.connect(self.auto_control_loop)
 
@@ -155,9 +181,25 @@ class RobotApp(QMainWindow):
         self.control_timer.start(100)
         
         # UI
+        PROFILE.step("setup_ui")
         self.setup_ui()
+        # Start after the video widget is connected, it has to hand every frame buffer back
+        PROFILE.step("video start")
+        self.video_thread.start()
         self.loader = LoadingOverlay(self)
+        # The model is loaded and warmed up right after the first paint (see paintEvent): early enough
+        # that switching to auto mode does not wait for it, late enough that importing torch on the
+        # loader thread does not hold the GIL while the window is still coming up
+        self._first_paint = False
         QTimer.singleShot(2000, self.sound.play_startup)
+        PROFILE.step("show")
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self._first_paint:
+            self._first_paint = True
+            PROFILE.first_paint()
+            QTimer.singleShot(0, self.video_thread.preload_model)
 
     def setup_ui(self):
         central = QWidget()
@@ -179,19 +221,23 @@ class RobotApp(QMainWindow):
         self.lbl_ping = QLabel("Ping: --")
         self.lbl_ping.setStyleSheet("color: #0078D4; font-weight: bold; margin-left: 15px;")
         
+        self.lbl_pipeline = QLabel("AI: --")
+        self.lbl_pipeline.setStyleSheet("color: #0078D4; font-weight: bold; margin-left: 15px;")
+        
         info_lay.addWidget(self.lbl_fps)
         info_lay.addWidget(self.lbl_ping)
+        info_lay.addWidget(self.lbl_pipeline)
         info_lay.addStretch()
         left_lay.addLayout(info_lay)
 
         # Video display - SizePolicy để co giãn
-        self.lbl_video = QLabel("NO SIGNAL")
-        self.lbl_video.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.lbl_video.setStyleSheet("background: #000; border: 2px solid #0078D4; color: #555;")
-        self.lbl_video.setMinimumSize(480, 360)  # Giảm minimum size
-        self.lbl_video.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
-        self.lbl_video.setScaledContents(False)
-        left_lay.addWidget(self.lbl_video, 1)  # stretch factor = 1
+        # Frames are scaled on the video thread to this widget's size and painted without copies
+        self.video_view = VideoWidget(self.video_thread.release_frame)
+        self.video_view.setMinimumSize(480, 360)  # Giảm minimum size
+        self.video_view.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
+        self.video_view.size_changed.connect(self.video_thread.set_display_size)
+        self.video_thread.change_pixmap_signal.connect(self.video_view.set_frame)
+        left_lay.addWidget(self.video_view, 1)  # stretch factor = 1
         
         # Info text
         self.lbl_info = QLabel("System Ready")
@@ -322,13 +368,15 @@ class RobotApp(QMainWindow):
         self.show_loading("MANUAL CONFIG SET", 800)
 
     def apply_auto_config(self, speed, conf, spin_enabled, scan_dur, wait_dur, verify_time,
-                      scan_speed, search_delay, align_tol, turn_sens, stop_dist, align_speed, timeout, motor_left_boost=1.0, ai_frame_interval=1):
+                      scan_speed, search_delay, align_tol, turn_sens, stop_dist, align_speed, timeout, motor_left_boost=1.0, ai_frame_interval=1,
+                      model_path=None):
         self.auto_speed = speed
         self.auto_conf = conf
         self.robot.base_speed = speed
         self.robot.confidence_threshold = conf
         self.robot.ALIGN_SPEED = align_speed
         self.robot.LOST_TARGET_TIMEOUT = timeout
+        self.tracker.max_age = timeout
         self.robot.SCAN_TURN_DURATION = scan_dur
         self.robot.SCAN_WAIT_DURATION = wait_dur
         self.robot.CONFIRM_TIME = verify_time
@@ -347,6 +395,8 @@ class RobotApp(QMainWindow):
         
         if self.video_thread:
             self.video_thread.process_every_n_frames = ai_frame_interval
+            if model_path and os.path.abspath(model_path) != os.path.abspath(self.video_thread.model_path):
+                self.video_thread.set_model(model_path)
         
         if spin_enabled:
             self.robot.enable_search(True)
@@ -367,10 +417,19 @@ class RobotApp(QMainWindow):
         print(f"   Scan Speed: {scan_speed}%, Delay: {search_delay}s")
         print(f"   Align Tol: {align_tol}px, Turn Sens: {turn_sens}, Stop: {stop_dist}cm")
         print(f"   Motor Balance: L={self.robot.MOTOR_LEFT_BOOST:.2f}, R={self.robot.MOTOR_RIGHT_BOOST:.2f}")
+        print(f"   Model: {os.path.basename(self.video_thread.model_path)}")
+        self._record_config()
         
         self.show_loading("AUTO CONFIG APPLIED", 1000)
 
+    def _record_config(self):
+        if self.recorder is not None:
+            self.recorder.event("config", params=self.robot.params(), search=self.robot.search_enabled,
+                                conf=self.auto_conf, frame_interval=self.video_thread.process_every_n_frames,
+                                model=os.path.basename(self.video_thread.model_path))
+
     def toggle_flash(self, stream_url):
+        import requests  # ~100 ms of imports, only needed for the flash
         try:
             base_url = stream_url.replace("/stream", "").split(":81")[0]
             self.flash_state = 1 - self.flash_state
@@ -391,6 +450,7 @@ class RobotApp(QMainWindow):
     def set_mode(self, auto):
         self.is_auto = auto
         self.video_thread.set_ai_mode(auto)
+        self.tracker.reset()
         
         if auto:
             self.control_timer.stop()
@@ -415,8 +475,14 @@ class RobotApp(QMainWindow):
         
             
             self.video_thread.update_conf(self.auto_conf)
+            self.video_thread.scheduler.set_state(self.robot.state)
+            if self.recorder is not None:
+                self._recorded_state = self.robot.state.value
+                self.recorder.event("mode", auto=True, search=spin_enabled, state=self._recorded_state)
             self.auto_timer.start(50)
         else:
+            if self.recorder is not None:
+                self.recorder.event("mode", auto=False)
             self.auto_timer.stop()
             self.control_timer.start(100)
             self.btn_mode.setText("SWITCH TO AUTO MODE")
@@ -425,14 +491,29 @@ class RobotApp(QMainWindow):
             self.sound.play_manual()
             self.net_thread.send_command({"cmd": "STOP", "L": 0, "R": 0})
             self.robot.emergency_stop()
+            self.video_thread.scheduler.set_state(self.robot.state, auto=False)
 
     # AUTO LOOP
     def auto_control_loop(self):
         if not self.is_auto: return
         
         self.robot.update_sensors(self.box_F.current_value, self.box_L.current_value, self.box_R.current_value)
+        # Predicted position of the locked track, inference may not have run since the last tick
+        now = time.time()
+        locked = self.tracker.locked(now)
+        self.robot.update_track(locked, self.ai_names)
+        # Chasing / aligning infer on a crop around where the locked target should be now; the crop
+        # ages from the track's last detection, not from this tick
+        self.video_thread.set_roi_target(
+            None if locked is None else (locked['x1'], locked['y1'], locked['x2'], locked['y2']),
+            None if locked is None else now - float(locked['stale']))
         old_state = self.robot.state
         L, R, info = self.robot.compute_control()
+        self.video_thread.scheduler.set_state(self.robot.state)
+        if self.recorder is not None and self.robot.state.value != self._recorded_state:
+            # Also catches changes made by handle_ai_detection between ticks
+            self._recorded_state = self.robot.state.value
+            self.recorder.event("state", state=self._recorded_state, info=info)
         
         if old_state != RobotState.ALIGNING and self.robot.state == RobotState.ALIGNING:
             label = self.robot.current_label
@@ -445,17 +526,33 @@ class RobotApp(QMainWindow):
         if self.robot.state == RobotState.REACHED:
             self.handle_trash_reached()
             return
-        
+
+        # Slow down while the link is laggy or lossy, commands arrive late or not at all
+        factor = self.net_thread.metrics.speed_factor()
+        if self.recorder is not None and factor != self._recorded_factor:
+            self.recorder.event("link", factor=factor)
+            self._recorded_factor = factor
+        if factor < 1.0:
+            L, R = L * factor, R * factor
+            self.lbl_info.setText(f"{info} | Slow link x{factor:.2f}")
+        
+        # Motion gating only while the wheels stand still
+        self.video_thread.motion_gate.set_motors(int(L), int(R))
         self.net_thread.send_command({"cmd": "MOVE", "L": int(L), "R": int(R)})
 
     def handle_ai_detection(self, result):
         if self.is_auto:
-            detections = result.get('detections', [])
-            if detections:
+            detections = result.get('detections')
+            names = result.get('names', {})
+            if detections is None:
+                return
+            if len(detections):
                 print(f"Auto Mode - Received {len(detections)} detections")
                 for d in detections:
-                    print(f"   - {d['label']} ({d['conf']:.2f}) at x={d['center_x']}")
-            self.robot.update_detection(detections)
+                    print(f"   - {det.label_of(d, names)} ({d['conf']:.2f}) at x={int(d['center_x'])}")
+            self.ai_names = names
+            self.tracker.update(detections, result.get('frame_time', time.time()))
+            self.robot.update_track(self.tracker.locked(), names)
 
     def handle_trash_reached(self):
         self.net_thread.send_command({"cmd": "STOP", "L": 0, "R": 0})
@@ -476,6 +573,10 @@ class RobotApp(QMainWindow):
         if dialog.result == "continue":
             # Scan Mode ON: Continue searching for next trash
             self.robot.reset_after_reach()
+            self.tracker.reset()
+            if self.recorder is not None:
+                self._recorded_state = self.robot.state.value
+                self.recorder.event("continue", state=self._recorded_state)
             self.auto_timer.start(50)
         else:
             # Return to manual mode
@@ -498,14 +599,74 @@ class RobotApp(QMainWindow):
     def update_ping(self, ping_str):
         self.lbl_ping.setText(f"Ping: {ping_str}")
 
-    def update_image(self, img):
-        if not self.lbl_video.isVisible(): return
-        scaled = img.scaled(self.lbl_video.size(), Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
-        self.lbl_video.setPixmap(QPixmap.fromImage(scaled))
+    def update_link_stats(self, stats):
+        rtt = "--" if stats['rtt_p50'] is None else f"p50 {stats['rtt_p50']}ms / p95 {stats['rtt_p95']}ms / p99 {stats['rtt_p99']}ms"
+        self.lbl_ping.setToolTip(
+            f"RTT: {rtt}\n"
+            f"Loss: {stats['loss_pct']}% ({stats['lost']} of {stats['sent']} probes)\n"
+            f"Reordered: {stats['reordered']}, late: {stats['late']}"
+        )
 
     def update_fps(self, fps):
         self.lbl_fps.setText(f"FPS: {fps}")
 
+    def update_pipeline_stats(self, stats):
+        cap, inf, disp = stats['capture'], stats['inference'], stats['display']
+        if inf['fps'] > 0:
+            self.lbl_pipeline.setText(f"AI: {inf['fps']:.1f} fps | Age: {inf['age_ms']:.0f}ms")
+        else:
+            self.lbl_pipeline.setText("AI: --")
+        self.lbl_pipeline.setToolTip(
+            f"Capture: {cap['fps']} fps\n"
+            f"Inference: {inf['fps']} fps, age {inf['age_ms']}ms (max {inf['max_age_ms']}ms), dropped {inf['dropped']}\n"
+            f"Display: {disp['fps']} fps, age {disp['age_ms']}ms, dropped {disp['dropped']}\n"
+            f"GUI thread: {self.video_view.gui_ms:.2f}ms/frame"
+            + self._scheduler_summary(stats.get('scheduler'))
+            + self._roi_summary(stats.get('roi'))
+            + self._motion_summary(stats.get('motion'))
+            + self._model_summary(stats.get('model'))
+        )
+
+    def _scheduler_summary(self, sched):
+        if not sched:
+            return ""
+        lines = [f"\nScheduler: {sched['state']} {sched['rate_hz']}Hz imgsz {sched['imgsz']}"
+                 f"{' ROI' if sched['roi'] else ''}, infer {sched['latency_ms']}ms, backoff x{sched['backoff']}"]
+        for name, st in sched['per_state'].items():
+            decision = "--" if st['decision_p50_ms'] is None else f"{st['decision_p50_ms']}/{st['decision_p95_ms']}ms"
+            lines.append(f"  {name}: CPU {st['cpu_pct']}%, {st['rate_hz']}Hz, decision p50/p95 {decision}")
+        return "\n".join(lines)
+
+    def _roi_summary(self, roi_stats):
+        if not roi_stats or not roi_stats['roi']:
+            return ""
+        return (f"\nROI: {roi_stats['roi']} crops, {roi_stats['hit_pct']}% hits ({roi_stats['fallbacks']} fallbacks), "
+                f"{roi_stats['roi_ms']}ms vs full frame {roi_stats['full_ms']}ms")
+
+    def _motion_summary(self, motion):
+        if not motion or not motion['checks']:
+            return ""
+        return (f"\nMotion gate: skipped {motion['skip_pct']}% ({motion['skips']} of {motion['checks']}), "
+                f"CPU saved {motion['cpu_saved_s']}s, check {motion['gate_cpu_ms']}ms"
+                f"{' (off, moving)' if motion['moving'] else ''}")
+
+    def _model_summary(self, model):
+        if not model or 'backend' not in model:  # not loaded yet, or handed over without preload
+            return ""
+        first = f", first result {model['first_result_ms']}ms after AUTO" if 'first_result_ms' in model else ""
+        return (f"\nModel: {model['backend']}{' (cached)' if model['cached'] else ''}, load {model['load_ms']}ms, "
+                f"warmup {sum(model['warmup_ms']):.0f}ms, ready {model['ready_s']}s after start{first}")
+
+    def update_model_status(self, msg, percent):
+        """Background model load / warmup progress. The window stays usable (manual driving)."""
+        if 0 <= percent < 100:
+            self.loader.show_msg(msg, f"{percent}%")
+        elif not self.is_processing:
+            self.loader.hide()
+        if percent < 0:
+            self.show_loading("MODEL ERROR", 1500)
+        self.lbl_info.setText(msg)
+
     def keyPressEvent(self, e):
         if not e.isAutoRepeat(): self.handle_key(e.key(), True)
     def keyReleaseEvent(self, e):
@@ -558,15 +719,27 @@ class RobotApp(QMainWindow):
         self.show_loading("EMERGENCY STOP!", 1000)
 
     def closeEvent(self, e):
+        if getattr(self, 'recorder', None) is not None:
+            self.recorder.event("close")
         if hasattr(self, 'net_thread'):
             self.net_thread.send_command({"cmd": "STOP", "L": 0, "R": 0})
             self.net_thread.stop()
         if hasattr(self, 'video_thread'):
             self.video_thread.stop()
+        if getattr(self, 'recorder', None) is not None:
+            self.recorder.close()
         e.accept()
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    win = RobotApp()
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--record", metavar="FILE", help="record frames, telemetry, detections and commands")
+    parser.add_argument("--profile-startup", metavar="FILE", nargs="?", const="",
+                        help="print import and init times at the first paint, optionally save them as JSON")
+    args, qt_args = parser.parse_known_args()
+
+    PROFILE.step("QApplication")
+    app = QApplication(sys.argv[:1] + qt_args)
+    win = RobotApp(record_path=args.record)
     win.show()
     sys.exit(app.exec())
\ No newline at end of file
@@ -0,0 +1,324 @@
+import random
+import socket
+import time
+from urllib.parse import urlsplit
+
+import cv2
+import numpy as np
+
+try:
+    from turbojpeg import TurboJPEG
+except ImportError:
+    TurboJPEG = None
+
+# cv2 flags that make libjpeg decode with DCT scaling (1/2, 1/4, 1/8 of full size)
+_CV2_REDUCED = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+
+def jpeg_size(data):
+    """(width, height) from the SOF marker, without decoding. None if not found."""
+    view = memoryview(data)
+    i, n = 2, len(view)
+    while i + 9 < n:
+        if view[i] != 0xFF:
+            i += 1
+            continue
+        marker = view[i + 1]
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+            i += 2
+            continue
+        seg_len = (view[i + 2] << 8) | view[i + 3]
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            h = (view[i + 5] << 8) | view[i + 6]
+            w = (view[i + 7] << 8) | view[i + 8]
+            return w, h
+        i += 2 + seg_len
+    return None
+
+
+class JpegDecoder:
+    """Decode JPEG bytes to BGR, optionally at 1/2, 1/4 or 1/8 scale straight from the DCT."""
+
+    def __init__(self, scale=1):
+        self.scale = scale
+        self._turbo = None
+        if TurboJPEG is not None:
+            try:
+                self._turbo = TurboJPEG()
+            except Exception as e:
+                print(f"TurboJPEG unavailable, using OpenCV decoder: {e}")
+        self.name = "turbojpeg" if self._turbo else "opencv"
+
+    def decode(self, data):
+        if self._turbo is not None:
+            sf = (1, self.scale) if self.scale > 1 else None
+            return self._turbo.decode(data, scaling_factor=sf)
+        buf = np.frombuffer(data, dtype=np.uint8)
+        return cv2.imdecode(buf, _CV2_REDUCED.get(self.scale, cv2.IMREAD_COLOR))
+
+
+class MjpegClient:
+    """Minimal multipart/x-mixed-replace reader for the ESP32-CAM :81/stream endpoint.
+
+    Drop-in for the parts of cv2.VideoCapture that VideoThread uses (read / isOpened / release).
+    Frames are parsed out of one reusable receive buffer, and with target_width set the
+    decoder picks the largest DCT downscale that still gives at least that width.
+    The firmware sends the body with Transfer-Encoding: chunked; _fill strips the chunk framing,
+    so the multipart parser only ever sees the payload.
+    Reconnects by itself with exponential backoff plus jitter, so callers just keep calling read().
+    """
+
+    handles_reconnect = True
+
+    def __init__(self, url, target_width=None, scale=None, timeout=3.0,
+                 reconnect_base=0.5, reconnect_max=5.0, chunk_size=65536):
+        parts = urlsplit(url)
+        self.url = url
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        self.timeout = timeout
+        self.target_width = target_width
+        self.reconnect_base = reconnect_base
+        self.reconnect_max = reconnect_max
+
+        self.decoder = JpegDecoder(scale or 1)
+        self._auto_scale = scale is None and target_width is not None
+
+        self._sock = None
+        self._boundary = None
+        self._buf = bytearray()
+        self._pos = 0
+        self._chunk = bytearray(chunk_size)
+        self._chunk_view = memoryview(self._chunk)
+        self._chunked = False
+        self._raw = bytearray()     # chunked: received bytes not parsed yet (a partial size line)
+        self._chunk_left = 0        # chunked: payload bytes left in the current chunk
+        self._ended = False         # chunked: last chunk received, the buffer holds all that is left
+
+        self._attempt = 0
+        self._next_attempt = 0.0
+        self.frames = 0
+        self.bytes = 0
+        self.reconnects = 0
+        self.last_error = ""
+
+        self.open()
+
+    # ---------------- connection ----------------
+
+    def open(self):
+        self._close_socket()
+        try:
+            sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+            sock.settimeout(self.timeout)
+            request = (f"GET {self.path} HTTP/1.1\r\nHost: {self.host}\r\n"
+                       f"Accept: multipart/x-mixed-replace\r\nConnection: keep-alive\r\n\r\n")
+            sock.sendall(request.encode())
+            self._sock = sock
+            self._buf.clear()
+            self._pos = 0
+            self._chunked = False
+            self._raw.clear()
+            self._chunk_left = 0
+            self._ended = False
+            headers = self._read_until(b"\r\n\r\n")
+            if headers is None:
+                raise ConnectionError("no HTTP header")
+            self._boundary, chunked = self._parse_headers(headers)
+            if chunked:
+                # What came in with the header is already chunk-framed body
+                body = bytes(self._buf[self._pos:])
+                self._buf.clear()
+                self._pos = 0
+                self._chunked = True
+                self._dechunk(body)
+            self._attempt = 0
+            return True
+        except (OSError, ConnectionError, ValueError) as e:
+            self.last_error = str(e)
+            self._schedule_reconnect()
+            return False
+
+    def _parse_headers(self, headers):
+        """(multipart boundary, chunked transfer-encoding) from the response header."""
+        lines = headers.decode("latin-1").split("\r\n")
+        if not lines or " 200" not in lines[0]:
+            raise ConnectionError(f"bad status: {lines[0] if lines else ''}")
+        boundary, chunked = None, False
+        for line in lines[1:]:
+            name, _, value = line.partition(":")
+            name = name.strip().lower()
+            if name == "content-type":
+                for param in value.split(";"):
+                    key, _, val = param.strip().partition("=")
+                    if key.lower() == "boundary":
+                        val = val.strip('"')
+                        if val.startswith("--"):
+                            val = val[2:]
+                        boundary = b"--" + val.encode()
+            elif name == "transfer-encoding":
+                chunked = "chunked" in value.lower()
+        if boundary is None:
+            raise ValueError("no multipart boundary in Content-Type")
+        return boundary, chunked
+
+    def _schedule_reconnect(self):
+        self._close_socket()
+        delay = min(self.reconnect_max, self.reconnect_base * (2 ** self._attempt))
+        # Jitter so several clients (or a flapping AP) don't retry in lockstep
+        delay *= random.uniform(0.5, 1.5)
+        self._next_attempt = time.time() + delay
+        self._attempt += 1
+
+    def _close_socket(self):
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+        self._sock = None
+
+    def isOpened(self):
+        return self._sock is not None
+
+    def release(self):
+        self._close_socket()
+
+    # ---------------- buffer ----------------
+
+    def _fill(self):
+        if self._ended:
+            raise ConnectionError("stream ended")
+        n = self._sock.recv_into(self._chunk_view)
+        if n == 0:
+            raise ConnectionError("stream closed")
+        # Compact once the consumed prefix dominates, instead of on every frame
+        if self._pos and self._pos > len(self._buf) // 2:
+            del self._buf[:self._pos]
+            self._pos = 0
+        if self._chunked:
+            self._dechunk(self._chunk_view[:n])
+        else:
+            self._buf += self._chunk_view[:n]
+        self.bytes += n
+
+    def _dechunk(self, data):
+        """Append the payload of chunk-framed data (<hex size> CRLF <payload> CRLF per chunk) to the buffer."""
+        raw = self._raw
+        raw += data
+        i, n = 0, len(raw)
+        with memoryview(raw) as view:
+            while i < n:
+                if self._chunk_left:
+                    take = min(self._chunk_left, n - i)
+                    self._buf += view[i:i + take]
+                    self._chunk_left -= take
+                    i += take
+                    continue
+                end = raw.find(b"\r\n", i)
+                if end < 0:
+                    break   # size line not complete yet
+                line = raw[i:end].split(b";", 1)[0].strip()
+                i = end + 2
+                if not line:
+                    continue   # the CRLF closing the previous chunk
+                size = int(line, 16)
+                if size == 0:
+                    # Frames before it may still be in the buffer, _fill raises once they are read
+                    self._ended = True
+                    i = n
+                    break
+                self._chunk_left = size
+        del raw[:i]
+
+    def _find(self, token):
+        """Index of the next token after the read position, receiving more data as needed."""
+        scanned = 0  # relative to _pos, since _fill may compact the buffer
+        while True:
+            idx = self._buf.find(token, self._pos + scanned)
+            if idx >= 0:
+                return idx
+            scanned = max(0, len(self._buf) - self._pos - len(token) + 1)
+            self._fill()
+
+    def _take(self, end, skip=0):
+        with memoryview(self._buf) as view:
+            data = bytes(view[self._pos:end])
+        self._pos = end + skip
+        return data
+
+    def _read_until(self, token):
+        """Return the bytes up to (excluding) token and consume through it."""
+        return self._take(self._find(token), len(token))
+
+    def _skip_until(self, token):
+        self._pos = self._find(token) + len(token)
+
+    def _read_exact(self, n):
+        while len(self._buf) - self._pos < n:
+            self._fill()
+        return self._take(self._pos + n)
+
+    # ---------------- frames ----------------
+
+    def read_jpeg(self):
+        """Next JPEG payload as bytes. Raises on socket errors."""
+        self._skip_until(self._boundary)
+        headers = self._read_until(b"\r\n\r\n")
+        length = None
+        for line in headers.split(b"\r\n"):
+            name, _, value = line.partition(b":")
+            if name.strip().lower() == b"content-length":
+                length = int(value)
+                break
+        if length is not None:
+            data = self._read_exact(length)
+        else:
+            # No length: the JPEG runs until the next boundary
+            data = self._read_until(self._boundary)
+            self._pos -= len(self._boundary)
+        self.frames += 1
+        return data
+
+    def _pick_scale(self, data):
+        size = jpeg_size(data)
+        if size is None:
+            return
+        width = size[0]
+        scale = 1
+        for s in (2, 4, 8):
+            if width // s >= self.target_width:
+                scale = s
+        self.decoder.scale = scale
+        self._auto_scale = False
+        print(f"MJPEG: {size[0]}x{size[1]} stream, decoding at 1/{scale} with {self.decoder.name}")
+
+    def read(self):
+        """(ret, frame) like cv2.VideoCapture.read()."""
+        if self._sock is None:
+            if time.time() < self._next_attempt:
+                time.sleep(0.01)
+                return False, None
+            self.reconnects += 1
+            if not self.open():
+                return False, None
+
+        try:
+            data = self.read_jpeg()
+        except (OSError, ConnectionError, ValueError) as e:
+            self.last_error = str(e)
+            self._schedule_reconnect()
+            return False, None
+
+        if self._auto_scale:
+            self._pick_scale(data)
+        frame = self.decoder.decode(data)
+        if frame is None:
+            return False, None
+        return True, frame
@@ -0,0 +1,87 @@
+import time
+
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    """Skips inference while the camera sees the same scene as at the last inference.
+
+    Frames are reduced to a small blurred grayscale image and compared with the one the
+    current detections came from. If fewer than `min_changed` of the pixels moved by more
+    than `pixel_threshold` grey levels, the last detections are reused. A refresh is forced
+    every `max_interval` seconds, and the gate is bypassed while the motors are commanded
+    (the rover moves, so the view changes anyway and stale boxes would steer it wrong).
+    """
+
+    def __init__(self, size=(160, 120), pixel_threshold=12, min_changed=0.001, max_interval=2.0):
+        self.size = size
+        self.pixel_threshold = pixel_threshold
+        self.min_changed = min_changed
+        self.max_interval = max_interval
+        self._moving = False
+        self.reset()
+
+    def reset(self):
+        self._ref = None
+        self._ref_time = 0.0
+        self.checks = 0
+        self.skips = 0
+        self.changed_pct = 0.0            # last measured change, % of pixels
+        self._gate_cpu = 0.0
+        self._infer_cpu_ms = 0.0          # EWMA of process CPU per inference
+
+    # --- GUI thread ---
+    def set_motors(self, left, right):
+        self._moving = bool(left) or bool(right)
+
+    @property
+    def moving(self):
+        return self._moving
+
+    # --- inference thread ---
+    def _small(self, frame):
+        small = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY) if small.ndim == 3 else small
+        # JPEG block noise would otherwise count as change
+        return cv2.GaussianBlur(gray, (3, 3), 0)
+
+    def should_skip(self, frame, now=None):
+        """True when frame can reuse the last detections. Call only in plans that allow gating."""
+        now = time.monotonic() if now is None else now
+        if self._moving or self._ref is None or now - self._ref_time >= self.max_interval:
+            return False
+        cpu = time.process_time()
+        diff = cv2.absdiff(self._small(frame), self._ref)
+        changed = np.count_nonzero(diff > self.pixel_threshold) / diff.size
+        self._gate_cpu += time.process_time() - cpu
+        self.checks += 1
+        self.changed_pct = 100.0 * float(changed)
+        if changed >= self.min_changed:
+            return False
+        self.skips += 1
+        return True
+
+    def inferred(self, frame, cpu_seconds, now=None):
+        """The detections now come from frame: it becomes the reference."""
+        self._ref = self._small(frame)
+        self._ref_time = time.monotonic() if now is None else now
+        ms = cpu_seconds * 1000
+        self._infer_cpu_ms = ms if self._infer_cpu_ms == 0 else 0.8 * self._infer_cpu_ms + 0.2 * ms
+
+    def invalidate(self):
+        """Force the next frame through inference (stream switched, AI toggled)."""
+        self._ref = None
+
+    # --- any thread ---
+    def snapshot(self):
+        saved = self.skips * self._infer_cpu_ms / 1000 - self._gate_cpu
+        return {
+            'moving': self._moving,
+            'checks': self.checks,
+            'skips': self.skips,
+            'skip_pct': round(100.0 * self.skips / self.checks, 1) if self.checks else 0.0,
+            'changed_pct': round(self.changed_pct, 2),
+            'cpu_saved_s': round(max(0.0, saved), 2),
+            'gate_cpu_ms': round(1000 * self._gate_cpu / self.checks, 3) if self.checks else 0.0,
+        }
@@ -1,78 +1,223 @@
-import socket
 import json
 import time
+import threading
 from PyQt6.QtCore import QThread, pyqtSignal
 
+import protocol
+from link_metrics import LinkMetrics
+from transport import UdpTransport
+
+ROBOT_PORT = 8888
+LOCAL_PORT = 9999      # preferred, an ephemeral port is used if it's taken
+HELLO_INTERVAL = 0.3   # resend HELLO until the robot answers
+HELLO_ATTEMPTS = 6     # ~2 s, then assume JSON-only firmware
+PROBE_INTERVAL = 0.2   # RTT echo probes, binary protocol only
+REPORT_INTERVAL = 1.0
+TICK_INTERVAL = 0.05
+
+
+class RobotLink:
+    """Per-robot state on the shared socket: wire format, sequence numbers, link metrics."""
+
+    def __init__(self, ip, port=ROBOT_PORT):
+        self.addr = (ip, port)
+        # Wire format: "json" until the firmware acks our HELLO, then "binary"
+        self.protocol = "json"
+        self.metrics = LinkMetrics(window=50)  # ~10 s of probes
+        self.last_packet_time = 0
+        self.hello_attempts = 0
+        self.last_hello = 0.0
+        self.last_probe = 0.0
+        self._seq = 0
+        self._seq_lock = threading.Lock()
+        self._t0 = time.monotonic()
+
+    @property
+    def ip(self):
+        return self.addr[0]
+
+    @property
+    def name(self):
+        return f"{self.addr[0]}:{self.addr[1]}"
+
+    def next_seq(self):
+        with self._seq_lock:
+            self._seq = (self._seq + 1) & 0xFFFF
+            return self._seq
+
+    def now_ms(self):
+        return int((time.monotonic() - self._t0) * 1000) & 0xFFFFFFFF
+
+    def encode(self, cmd_dict):
+        msg = None
+        if self.protocol == "binary":
+            msg = protocol.encode_command(cmd_dict, self.next_seq(), self.now_ms())
+        if msg is None:
+            msg = json.dumps(cmd_dict).encode()
+        return msg
+
+
 class NetworkThread(QThread):
-    data_received = pyqtSignal(dict) 
-    ping_signal = pyqtSignal(str) 
+    """Hosts the asyncio UDP transport. Signals carry data of the primary robot (target_ip),
+    robot_data also reports every other robot added with add_robot()."""
+
+    data_received = pyqtSignal(dict)
+    ping_signal = pyqtSignal(str)
+    link_signal = pyqtSignal(dict)  # LinkMetrics.snapshot() once per second
+    robot_data = pyqtSignal(str, dict)  # "ip:port", telemetry
 
-    def __init__(self, target_ip, port=9999):
+    def __init__(self, target_ip, port=LOCAL_PORT, robot_port=ROBOT_PORT):
         super().__init__()
-        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        
-        bound = False
-        while not bound:
-            try:
-                self.sock.bind(("0.0.0.0", port))
-                bound = True
-                print(f"Socket bound to port {port}")
-            except OSError:
-                print(f"Port {port} is busy. Trying {port + 1}...")
-                port += 1
-                if port > 10050:
-                    print("Could not bind any port!")
-                    break
-
-        self.sock.settimeout(0.1) 
-        self.target_ip = target_ip 
-        self.target_port = 8888
-        self.running = True
-        self.last_packet_time = 0 
+        self.transport = UdpTransport(self._on_datagram, port=port)
+        self.target_port = robot_port
+        self._robots_lock = threading.Lock()
+        self._robots = {}  # (ip, port) -> RobotLink
+        self._primary = self.add_robot(target_ip)
+        self._last_report = 0.0
+        # Optional recording.Recorder: primary robot telemetry and commands
+        self.recorder = None
+
+    # --- robots ---
+    def add_robot(self, ip, port=None):
+        addr = (ip, port or self.target_port)
+        with self._robots_lock:
+            link = self._robots.get(addr)
+            if link is None:
+                link = RobotLink(*addr)
+                self._robots[addr] = link
+            return link
+
+    def remove_robot(self, ip, port=None):
+        with self._robots_lock:
+            self._robots.pop((ip, port or self.target_port), None)
+
+    def robots(self):
+        with self._robots_lock:
+            return list(self._robots.values())
+
+    @property
+    def target_ip(self):
+        return self._primary.ip
 
+    @property
+    def protocol(self):
+        return self._primary.protocol
+
+    @property
+    def metrics(self):
+        return self._primary.metrics
+
+    @property
+    def last_packet_time(self):
+        return self._primary.last_packet_time
+
+    # --- loop thread ---
     def run(self):
         print("Network Thread Started")
-        while self.running:
-            try:
-                data, addr = self.sock.recvfrom(1024)
-                
-                # Tính Ping
-                now = time.time()
-                if self.last_packet_time != 0:
-                    delta_ms = int((now - self.last_packet_time) * 1000)
-                    self.ping_signal.emit(f"{delta_ms}ms")
-                self.last_packet_time = now
-
-                try:
-                    msg = json.loads(data.decode())
-                    self.data_received.emit(msg)
-                except json.JSONDecodeError:
-                    pass # Bỏ qua gói tin lỗi
-                
-            except socket.timeout:
-                pass 
-            except OSError:
-                break 
-            except Exception as e:
-                print(f"Net Error: {e}")
-        
+        self.transport.run(on_ready=lambda: self.transport.call_every(TICK_INTERVAL, self._tick))
         print("Network Thread Exited")
 
-    def send_command(self, cmd_dict):
+    def _tick(self):
+        now = time.monotonic()
+        for link in self.robots():
+            self._negotiate(link, now)
+            self._probe(link, now)
+        if now - self._last_report >= REPORT_INTERVAL:
+            self._last_report = now
+            for link in self.robots():
+                link.metrics.expire(now)
+            self._report()
+
+    def _negotiate(self, link, now):
+        if link.protocol == "binary" or link.hello_attempts >= HELLO_ATTEMPTS:
+            return
+        if now - link.last_hello < HELLO_INTERVAL:
+            return
+        link.last_hello = now
+        link.hello_attempts += 1
+        self.transport.send(protocol.encode_hello(link.next_seq(), link.now_ms()), link.addr)
+        if link.hello_attempts == HELLO_ATTEMPTS:
+            print(f"No HELLO_ACK from {link.ip}, using JSON protocol")
+
+    def _probe(self, link, now):
+        if link.protocol != "binary" or now - link.last_probe < PROBE_INTERVAL:
+            return
+        link.last_probe = now
+        seq = link.next_seq()
+        link.metrics.probe_sent(seq, now)
+        self.transport.send(protocol.encode_ping(seq, link.now_ms()), link.addr)
+
+    def _report(self):
+        link = self._primary
+        if link.protocol != "binary":
+            # Telemetry gaps say nothing about latency, JSON firmware has no echo
+            self.ping_signal.emit("n/a (JSON)" if link.hello_attempts >= HELLO_ATTEMPTS else "--")
+            return
+        stats = link.metrics.snapshot()
+        self.link_signal.emit(stats)
+        if stats['rtt_p50'] is None:
+            self.ping_signal.emit(f"-- | loss {stats['loss_pct']:.0f}%")
+        else:
+            self.ping_signal.emit(f"{stats['rtt_p50']:.0f}/{stats['rtt_p95']:.0f}ms | loss {stats['loss_pct']:.0f}%")
+
+    def _on_datagram(self, data, addr):
+        with self._robots_lock:
+            link = self._robots.get(addr[:2])
+        if link is None:
+            return # Not one of our robots
+        link.last_packet_time = time.time()
+
+        if protocol.is_binary(data):
+            msg = protocol.unpack(data)
+            if msg is None:
+                return # checksum / version mismatch
+            if msg.type == protocol.HELLO_ACK:
+                if link.protocol != "binary":
+                    print(f"Robot {link.ip} speaks binary protocol v{msg.fields['version']}")
+                link.protocol = "binary"
+            elif msg.type == protocol.PONG:
+                link.metrics.probe_answered(msg.fields['seq'])
+            elif msg.type == protocol.TELEMETRY:
+                self._emit_telemetry(link, msg.fields)
+            return
+
         try:
-            msg = json.dumps(cmd_dict).encode()
-            self.sock.sendto(msg, (self.target_ip, self.target_port))
+            msg = json.loads(data.decode())
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return # Bỏ qua gói tin lỗi
+        if isinstance(msg, dict):
+            self._emit_telemetry(link, msg)
+
+    def _emit_telemetry(self, link, fields):
+        if link is self._primary:
+            if self.recorder is not None:
+                self.recorder.telemetry(fields)
+            self.data_received.emit(fields)
+        self.robot_data.emit(link.name, fields)
+
+    # --- any thread ---
+    def send_command(self, cmd_dict, robot_ip=None, robot_port=None):
+        try:
+            link = self._primary if robot_ip is None else self.add_robot(robot_ip, robot_port)
+            # A newer MOVE makes any MOVE still waiting in the queue pointless
+            key = (link.addr, "MOVE") if cmd_dict.get("cmd") == "MOVE" else None
+            self.transport.send(link.encode(cmd_dict), link.addr, coalesce_key=key)
+            if self.recorder is not None and link is self._primary:
+                self.recorder.command(cmd_dict)
         except Exception as e:
             print(f"Send Error: {e}")
-            
+
     def update_target_ip(self, new_ip):
-        self.target_ip = new_ip
+        old = self._primary
+        if new_ip == old.ip:
+            return
+        # New robot may run different firmware: fresh link, negotiate again
+        self._primary = self.add_robot(new_ip, old.addr[1])
+        self.remove_robot(*old.addr)
+
+    def get_stats(self):
+        return self.transport.get_stats()
 
     def stop(self):
-        self.running = False
-        try:
-            if self.sock:
-                self.sock.close()
-        except Exception as e:
-            print(f"Error closing socket: {e}")
-        self.wait(1000)
\ No newline at end of file
+        self.transport.stop()
+        self.wait(1000)
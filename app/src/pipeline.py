@@ -0,0 +1,144 @@
+import threading
+import time
+
+import numpy as np
+
+
+class LatestFrame:
+    """Single-slot frame buffer. The writer always overwrites, readers always get the newest frame."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._frame = None
+        self._stamp = 0.0
+        self._seq = 0
+
+    def put(self, frame, stamp=None):
+        with self._cond:
+            self._frame = frame
+            self._stamp = stamp if stamp is not None else time.time()
+            self._seq += 1
+            self._cond.notify_all()
+
+    def get(self, after_seq=0, timeout=0.1):
+        """Return (seq, frame, stamp) newer than after_seq, or None on timeout."""
+        with self._cond:
+            if self._seq <= after_seq:
+                self._cond.wait_for(lambda: self._seq > after_seq, timeout)
+            if self._seq <= after_seq:
+                return None
+            return self._seq, self._frame, self._stamp
+
+    @property
+    def seq(self):
+        return self._seq
+
+    def clear(self):
+        with self._cond:
+            self._frame = None
+            self._cond.notify_all()
+
+
+class StageCounter:
+    """Per-stage FPS, dropped-frame and frame-age counters, rolled over once per second."""
+
+    def __init__(self, name):
+        self.name = name
+        self.fps = 0.0
+        self.dropped = 0
+        self.age_ms = 0.0
+        self.max_age_ms = 0.0
+        self._lock = threading.Lock()
+        self._count = 0
+        self._age_sum = 0.0
+        self._age_max = 0.0
+        self._window_start = time.time()
+
+    def tick(self, stamp=None, skipped=0):
+        now = time.time()
+        with self._lock:
+            self._count += 1
+            self.dropped += max(0, skipped)
+            if stamp is not None:
+                age = (now - stamp) * 1000
+                self._age_sum += age
+                self._age_max = max(self._age_max, age)
+            self._roll(now)
+
+    def _roll(self, now):
+        elapsed = now - self._window_start
+        if elapsed < 1.0:
+            return
+        self.fps = self._count / elapsed
+        if self._count:
+            self.age_ms = self._age_sum / self._count
+            self.max_age_ms = self._age_max
+        self._count = 0
+        self._age_sum = 0.0
+        self._age_max = 0.0
+        self._window_start = now
+
+    def drop(self, n=1):
+        with self._lock:
+            self.dropped += n
+
+    def snapshot(self):
+        with self._lock:
+            now = time.time()
+            # Stage stalled: let the numbers decay instead of freezing
+            if now - self._window_start >= 2.0:
+                self._roll(now)
+            return {
+                'fps': round(self.fps, 1),
+                'dropped': self.dropped,
+                'age_ms': round(self.age_ms, 1),
+                'max_age_ms': round(self.max_age_ms, 1),
+            }
+
+    def reset(self):
+        with self._lock:
+            self.fps = 0.0
+            self.dropped = 0
+            self.age_ms = 0.0
+            self.max_age_ms = 0.0
+            self._count = 0
+            self._age_sum = 0.0
+            self._age_max = 0.0
+            self._window_start = time.time()
+
+
+class FrameRing:
+    """Fixed pool of display buffers handed to the GUI without copying.
+
+    A slot stays held from acquire() until the GUI calls release(), so a QImage wrapping
+    the buffer is never overwritten while it can still be painted. When every slot is
+    held, acquire() returns None and the producer drops the frame instead of allocating.
+    """
+
+    def __init__(self, size=3):
+        self._lock = threading.Lock()
+        self._buffers = [None] * size
+        self._held = [False] * size
+
+    def acquire(self, shape, dtype=np.uint8):
+        with self._lock:
+            for i, held in enumerate(self._held):
+                if held:
+                    continue
+                buf = self._buffers[i]
+                # Only free slots are (re)allocated, held ones keep their buffer alive
+                if buf is None or buf.shape != shape or buf.dtype != dtype:
+                    buf = np.empty(shape, dtype=dtype)
+                    self._buffers[i] = buf
+                self._held[i] = True
+                return i, buf
+        return None
+
+    def release(self, slot):
+        with self._lock:
+            if 0 <= slot < len(self._held):
+                self._held[slot] = False
+
+    def in_use(self):
+        with self._lock:
+            return sum(self._held)
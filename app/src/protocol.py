@@ -0,0 +1,163 @@
+"""
+Binary command / telemetry protocol between the app and esp32-firmware (reference encoder/decoder).
+
+Every packet, little-endian:
+
+    offset  size  field
+    0       1     magic 0xAB (never a valid first byte of JSON, so JSON-only firmware ignores it)
+    1       1     protocol version
+    2       1     message type
+    3       2     sequence number (u16, wraps)
+    5       4     sender timestamp in ms (u32, wraps)
+    9       n     payload (fixed layout per type, see PAYLOADS)
+    9+n     2     CRC-16/CCITT-FALSE over bytes 0 .. 9+n-1
+
+The app sends HELLO at startup. Firmware that speaks this protocol answers HELLO_ACK and
+switches its telemetry to binary; older firmware never answers and everything stays JSON.
+PING / PONG echo probes for round-trip time (link_metrics.py) only exist in the binary protocol.
+"""
+import struct
+from collections import namedtuple
+
+MAGIC = 0xAB
+VERSION = 1
+
+HELLO = 0x01
+HELLO_ACK = 0x02
+MOVE = 0x10
+STOP = 0x11
+SPEAK = 0x12
+TELEMETRY = 0x20
+PING = 0x30
+PONG = 0x31
+
+HEADER = struct.Struct("<BBBHI")
+CRC = struct.Struct("<H")
+
+# Fixed payload layouts. SPEAK is variable: u8 length + filename bytes.
+PAYLOADS = {
+    HELLO: struct.Struct("<B"),        # highest version the sender speaks
+    HELLO_ACK: struct.Struct("<B"),    # version the robot will use
+    MOVE: struct.Struct("<hh"),        # L, R (-255 .. 255)
+    STOP: struct.Struct("<"),
+    TELEMETRY: struct.Struct("<hhh"),  # F, L, R distances in cm
+    PING: struct.Struct("<"),          # seq / timestamp of the header are the probe id
+    PONG: struct.Struct("<HI"),        # echoed seq and timestamp of the PING
+}
+
+MAX_SPEAK_LEN = 64
+
+Message = namedtuple("Message", "type seq timestamp fields")
+
+
+def _make_crc_table():
+    table = []
+    for byte in range(256):
+        crc = byte << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x1021) if crc & 0x8000 else (crc << 1)
+        table.append(crc & 0xFFFF)
+    return table
+
+
+_CRC_TABLE = _make_crc_table()
+
+
+def crc16(data):
+    crc = 0xFFFF
+    for b in data:
+        crc = ((crc << 8) & 0xFFFF) ^ _CRC_TABLE[((crc >> 8) ^ b) & 0xFF]
+    return crc
+
+
+def is_binary(data):
+    return len(data) >= HEADER.size + CRC.size and data[0] == MAGIC
+
+
+def pack(msg_type, seq, timestamp, payload=b""):
+    body = HEADER.pack(MAGIC, VERSION, msg_type, seq & 0xFFFF, timestamp & 0xFFFFFFFF) + payload
+    return body + CRC.pack(crc16(body))
+
+
+def unpack(data):
+    """bytes -> Message, or None when magic, version, length or checksum is wrong."""
+    if not is_binary(data):
+        return None
+    body, (crc,) = data[:-CRC.size], CRC.unpack_from(data, len(data) - CRC.size)
+    if crc16(body) != crc:
+        return None
+    _, version, msg_type, seq, timestamp = HEADER.unpack_from(body)
+    if version != VERSION:
+        return None
+    payload = body[HEADER.size:]
+
+    if msg_type == SPEAK:
+        if not payload or payload[0] + 1 > len(payload):
+            return None
+        fields = {"file": payload[1:1 + payload[0]].decode("utf-8", "replace")}
+    elif msg_type in PAYLOADS:
+        layout = PAYLOADS[msg_type]
+        if len(payload) != layout.size:
+            return None
+        values = layout.unpack(payload)
+        if msg_type == MOVE:
+            fields = {"L": values[0], "R": values[1]}
+        elif msg_type == TELEMETRY:
+            fields = {"F": values[0], "L": values[1], "R": values[2]}
+        elif msg_type in (HELLO, HELLO_ACK):
+            fields = {"version": values[0]}
+        elif msg_type == PONG:
+            fields = {"seq": values[0], "timestamp": values[1]}
+        else:
+            fields = {}
+    else:
+        return None
+    return Message(msg_type, seq, timestamp, fields)
+
+
+def encode_command(cmd, seq, timestamp):
+    """App command dict ({"cmd": "MOVE", "L": .., "R": ..} etc.) -> binary packet, None if unsupported."""
+    name = cmd.get("cmd")
+    if name == "MOVE":
+        L = max(-255, min(255, int(cmd.get("L", 0))))
+        R = max(-255, min(255, int(cmd.get("R", 0))))
+        return pack(MOVE, seq, timestamp, PAYLOADS[MOVE].pack(L, R))
+    if name == "STOP":
+        return pack(STOP, seq, timestamp)
+    if name == "SPEAK":
+        fname = cmd.get("file", "").encode("utf-8")[:MAX_SPEAK_LEN]
+        return pack(SPEAK, seq, timestamp, bytes([len(fname)]) + fname)
+    return None
+
+
+def decode_command(msg):
+    """Message -> the same command dict the JSON path uses."""
+    if msg.type == MOVE:
+        return {"cmd": "MOVE", "L": msg.fields["L"], "R": msg.fields["R"]}
+    if msg.type == STOP:
+        return {"cmd": "STOP", "L": 0, "R": 0}
+    if msg.type == SPEAK:
+        return {"cmd": "SPEAK", "file": msg.fields["file"]}
+    return None
+
+
+def encode_telemetry(front, left, right, seq, timestamp):
+    clamp = lambda v: max(-32768, min(32767, int(v)))
+    return pack(TELEMETRY, seq, timestamp, PAYLOADS[TELEMETRY].pack(clamp(front), clamp(left), clamp(right)))
+
+
+def encode_hello(seq, timestamp, version=VERSION):
+    return pack(HELLO, seq, timestamp, PAYLOADS[HELLO].pack(version))
+
+
+def encode_hello_ack(seq, timestamp, version=VERSION):
+    return pack(HELLO_ACK, seq, timestamp, PAYLOADS[HELLO_ACK].pack(version))
+
+
+def encode_ping(seq, timestamp):
+    return pack(PING, seq, timestamp)
+
+
+def encode_pong(ping, seq, timestamp):
+    """Answer to a decoded PING Message."""
+    return pack(PONG, seq, timestamp, PAYLOADS[PONG].pack(ping.seq, ping.timestamp))
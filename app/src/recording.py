@@ -0,0 +1,137 @@
+import json
+import queue
+import struct
+import threading
+import time
+from collections import namedtuple
+
+import cv2
+import numpy as np
+
+from inference import detections as det
+
+# One append-only file per session:
+#   MAGIC, then records of RECORD header (kind, t = time.time() of the event, payload length) + payload
+MAGIC = b"TDREC\x01\r\n"
+RECORD = struct.Struct("<BdI")
+STAMP = struct.Struct("<d")
+
+FRAME = 1          # JPEG bytes, t = capture stamp
+TELEMETRY = 2      # JSON sensor packet from the robot
+DETECTIONS = 3     # frame stamp + DETECTION_DTYPE array bytes, t = publish time
+COMMAND = 4        # JSON command as sent to the robot
+EVENT = 5          # JSON {"event": name, ...}: mode switches, config, controller state changes
+
+KIND_NAMES = {FRAME: "frame", TELEMETRY: "telemetry", DETECTIONS: "detections", COMMAND: "command", EVENT: "event"}
+
+Record = namedtuple("Record", "kind t data")
+
+
+class Recorder:
+    """Writes frames, telemetry, detections, commands and events to one file on a writer thread.
+
+    The record methods are safe to call from any thread and never block: JPEG encoding and
+    disk writes happen on the writer, and when it falls behind, frames are dropped first.
+    """
+
+    def __init__(self, path, jpeg_quality=80, max_fps=15.0, max_queue=256):
+        self.path = path
+        self.jpeg_quality = jpeg_quality
+        self.min_frame_gap = 1.0 / max_fps if max_fps else 0.0
+        self._queue = queue.Queue(max_queue)
+        self._last_frame = 0.0
+        self.records = 0
+        self.bytes = 0
+        self.dropped = 0
+        self._file = open(path, "wb")
+        self._file.write(MAGIC)
+        self._thread = threading.Thread(target=self._writer, name="recorder", daemon=True)
+        self._thread.start()
+
+    def _put(self, item):
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+
+    # --- any thread ---
+    def frame(self, frame, stamp):
+        if stamp - self._last_frame < self.min_frame_gap:
+            return
+        # Keep half the queue for the small records
+        if self._queue.qsize() > self._queue.maxsize // 2:
+            self.dropped += 1
+            return
+        self._last_frame = stamp
+        # Frames in LatestFrame are never written to after put(), no copy needed
+        self._put((FRAME, stamp, frame))
+
+    def telemetry(self, fields, t=None):
+        self._put((TELEMETRY, time.time() if t is None else t, json.dumps(fields).encode()))
+
+    def detections(self, dets, frame_stamp, t=None):
+        payload = STAMP.pack(frame_stamp) + np.ascontiguousarray(dets, dtype=det.DETECTION_DTYPE).tobytes()
+        self._put((DETECTIONS, time.time() if t is None else t, payload))
+
+    def command(self, cmd, t=None):
+        self._put((COMMAND, time.time() if t is None else t, json.dumps(cmd).encode()))
+
+    def event(self, name, t=None, **fields):
+        self._put((EVENT, time.time() if t is None else t, json.dumps({"event": name, **fields}).encode()))
+
+    # --- writer thread ---
+    def _writer(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            kind, t, payload = item
+            if kind == FRAME:
+                ok, buf = cv2.imencode(".jpg", payload, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+                if not ok:
+                    continue
+                payload = buf.tobytes()
+            self._file.write(RECORD.pack(kind, t, len(payload)))
+            self._file.write(payload)
+            self.records += 1
+            self.bytes += RECORD.size + len(payload)
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+        self._file.close()
+        print(f"Recording saved: {self.path} ({self.records} records, {self.bytes / 1e6:.1f} MB, dropped {self.dropped})")
+
+
+def read(path, decode=True):
+    """Yields Record(kind, t, data) in file order.
+
+    With decode=True data is a dict for JSON records, (frame_stamp, DETECTION_DTYPE array)
+    for detections and raw JPEG bytes for frames (decode_frame() when needed).
+    """
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a recording")
+        while True:
+            header = f.read(RECORD.size)
+            if len(header) < RECORD.size:
+                return
+            kind, t, length = RECORD.unpack(header)
+            payload = f.read(length)
+            if len(payload) < length:
+                return  # recording cut short (app killed), keep what is complete
+            if decode:
+                payload = _decode(kind, payload)
+            yield Record(kind, t, payload)
+
+
+def _decode(kind, payload):
+    if kind in (TELEMETRY, COMMAND, EVENT):
+        return json.loads(payload)
+    if kind == DETECTIONS:
+        return STAMP.unpack_from(payload)[0], np.frombuffer(payload, det.DETECTION_DTYPE, offset=STAMP.size).copy()
+    return payload
+
+
+def decode_frame(jpeg):
+    return cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_COLOR)
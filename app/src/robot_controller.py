@@ -1,6 +1,8 @@
 from enum import Enum
 import time
 
+from inference import detections as det
+
 class RobotState(Enum):
     IDLE = "IDLE"                  
     SEARCH_STEP = "SEARCH_STEP"    
@@ -10,8 +12,15 @@ class RobotState(Enum):
     CHASING = "CHASING"            
     REACHED = "REACHED"            
 
+# Tunables saved with recordings and applied again on replay
+PARAMS = ("base_speed", "confidence_threshold", "SCAN_TURN_DURATION", "SCAN_WAIT_DURATION", "SCAN_SPEED",
+          "ALIGN_SPEED", "SEARCH_DELAY", "LOST_TARGET_TIMEOUT", "CONFIRM_TIME", "ALIGN_TOLERANCE",
+          "TURN_SENSITIVITY", "STOP_DISTANCE", "MOTOR_LEFT_BOOST", "MOTOR_RIGHT_BOOST")
+
 class RobotController:
-    def __init__(self, base_speed=60, screen_width=640):
+    def __init__(self, base_speed=60, screen_width=640, clock=time.time):
+        # clock() -> seconds; replays and simulations pass a clock.VirtualClock
+        self.clock = clock
         self.state = RobotState.IDLE
         self.base_speed = base_speed
         self.screen_width = screen_width
@@ -36,6 +45,7 @@ class RobotController:
         self.MOTOR_RIGHT_BOOST = 1.0
 
         self.target_x = None
+        self.track_id = None
         self.current_label = ""
         self.dist_front = 999
         
@@ -47,51 +57,80 @@ class RobotController:
         self.search_enabled = False
         self.search_started_time = 0
 
+    def params(self):
+        return {name: getattr(self, name) for name in PARAMS}
+
+    def apply_params(self, params):
+        for name, value in params.items():
+            if name in PARAMS:
+                setattr(self, name, value)
+
     def update_sensors(self, front, left, right):
         self.dist_front = front if front > 0 else 999
 
-    def update_detection(self, detections):
-        """Cập nhật dữ liệu từ AI"""
-        if not detections:
+    def update_detection(self, detections, names=None):
+        """Cập nhật dữ liệu từ AI (DETECTION_DTYPE array)"""
+        best = det.best(detections)
+        if best is None:
             return
-        
-        best = max(detections, key=lambda x: x['conf'])
-        
+        self._accept_target(float(best['conf']), int(best['center_x']), det.label_of(best, names))
+
+    def update_track(self, track, names=None):
+        """Locked track from tracker.Tracker (TRACK_DTYPE row), measured or predicted.
+
+        A predicted position of the current target only moves target_x between inference frames.
+        The target counts as seen at its last detection (clock() - stale), so LOST_TARGET_TIMEOUT
+        runs from there whether the tracker still extrapolates the track or not.
+        """
+        if track is None:
+            return
+        track_id = int(track['track_id'])
+        same_target = track_id == self.track_id
+        if same_target and track['stale'] > 0:
+            if track['conf'] >= self.confidence_threshold:
+                self.target_x = int(track['center_x'])
+            return
+        self.track_id = track_id
+        self._accept_target(float(track['conf']), int(track['center_x']), det.label_of(track, names),
+                            same_target=same_target, seen=self.clock() - float(track['stale']))
 
-        if best['conf'] < self.confidence_threshold:
+    def _accept_target(self, conf, center_x, label, same_target=False, seen=None):
+        if conf < self.confidence_threshold:
             return
 
-        self.target_x = best['center_x']
-        self.current_label = best['label']
-        self.last_seen_time = time.time()
+        self.target_x = center_x
+        self.current_label = label
+        # Never earlier than a detection accepted before (a re-lock may pick an older track)
+        self.last_seen_time = self.clock() if seen is None else max(self.last_seen_time, seen)
         
         # Only skip in CRITICAL states where we need centered target
-        skip_out_of_tolerance = self.state in [RobotState.ALIGNING, RobotState.CHASING]
+        # (a tracked target may drift off-center, it is still the same object)
+        skip_out_of_tolerance = self.state in [RobotState.ALIGNING, RobotState.CHASING] and not same_target
         
-        if abs(best['center_x'] - self.center_x) > self.ALIGN_TOLERANCE:
+        if abs(center_x - self.center_x) > self.ALIGN_TOLERANCE:
             if skip_out_of_tolerance:
-                print(f"Skip {self.current_label} - too far left/right (x={best['center_x']})")
+                print(f"Skip {self.current_label} - too far left/right (x={center_x})")
                 return
             elif self.state not in [RobotState.VERIFYING]:
                 # In SEARCH mode, accept even if off-center to trigger verification
                 pass
     
         if self.state in [RobotState.SEARCH_STEP, RobotState.SEARCH_WAIT, RobotState.IDLE, RobotState.REACHED]:
-            print(f"Spotted {self.current_label} ({best['conf']:.2f}) at x={best['center_x']} -> Verifying")
+            print(f"Spotted {self.current_label} ({conf:.2f}) at x={center_x} -> Verifying")
             self.state = RobotState.VERIFYING
-            self.first_seen_time = time.time()
+            self.first_seen_time = self.clock()
 
     def enable_search(self, enabled):
         self.search_enabled = enabled
         if enabled:
             self.state = RobotState.SEARCH_WAIT
-            self.search_started_time = time.time()
-            self.state_timer = time.time()
+            self.search_started_time = self.clock()
+            self.state_timer = self.clock()
         else:
             self.state = RobotState.IDLE
 
     def compute_control(self):
-        now = time.time()
+        now = self.clock()
         
         # Dừng nếu quá gần
         if self.dist_front < self.STOP_DISTANCE:
@@ -201,8 +240,9 @@ class RobotController:
             self.state = RobotState.SEARCH_WAIT
         else:
             self.state = RobotState.IDLE
-        self.state_timer = time.time()
+        self.state_timer = self.clock()
         self.target_x = None
+        self.track_id = None
         self.dist_front = 999
 
     def emergency_stop(self):
@@ -0,0 +1,72 @@
+import numpy as np
+
+# A crop that covers most of the frame saves nothing over full-frame inference
+MAX_AREA_FRACTION = 0.6
+
+
+def window(box, frame_shape, imgsz=320, pad=1.0):
+    """Crop window (x0, y0, x1, y1) around an xyxy box, or None when a crop is not worth it.
+
+    The box is grown by pad x its size on every side and the window is never smaller than
+    imgsz, so the detector downsamples the crop instead of upsampling it. The window is
+    shifted (not shrunk) to stay inside the frame.
+    """
+    h, w = frame_shape[:2]
+    x1, y1, x2, y2 = (float(v) for v in box[:4])
+    bw, bh = max(x2 - x1, 1.0), max(y2 - y1, 1.0)
+    cw = min(w, max(imgsz, bw * (1 + 2 * pad)))
+    ch = min(h, max(imgsz, bh * (1 + 2 * pad)))
+    if cw * ch > MAX_AREA_FRACTION * w * h:
+        return None
+
+    cx, cy = (x1 + x2) * 0.5, (y1 + y2) * 0.5
+    x0 = int(round(min(max(cx - cw * 0.5, 0), w - cw)))
+    y0 = int(round(min(max(cy - ch * 0.5, 0), h - ch)))
+    return x0, y0, x0 + int(cw), y0 + int(ch)
+
+
+def crop(frame, win):
+    """View into frame, no copy (the backends letterbox into their own buffer)."""
+    x0, y0, x1, y1 = win
+    return frame[y0:y1, x0:x1]
+
+
+def to_frame(boxes, win):
+    """Shift (N, 6) crop-space [x1, y1, x2, y2, conf, cls] rows back to full-frame pixels, in place."""
+    if len(boxes):
+        boxes[:, [0, 2]] += win[0]
+        boxes[:, [1, 3]] += win[1]
+    return boxes
+
+
+def drop_cut(boxes, win, frame_shape, margin=2.0):
+    """Drop boxes touching a window edge that is not also a frame edge: the object continues outside the crop."""
+    if not len(boxes):
+        return boxes
+    h, w = frame_shape[:2]
+    x0, y0, x1, y1 = win
+    cut = np.zeros(len(boxes), bool)
+    if x0 > 0:
+        cut |= boxes[:, 0] <= x0 + margin
+    if y0 > 0:
+        cut |= boxes[:, 1] <= y0 + margin
+    if x1 < w:
+        cut |= boxes[:, 2] >= x1 - margin
+    if y1 < h:
+        cut |= boxes[:, 3] >= y1 - margin
+    return boxes[~cut]
+
+
+def predict(model, frame, box, conf, imgsz, max_det, pad=1.0):
+    """Run model on the window around box at imgsz.
+
+    Returns (boxes, win): full-frame (N, 6) boxes and the window used, or (None, None)
+    when no crop applies and the caller should run full-frame inference. Boxes cut by the
+    window are dropped, so a target that outgrew the crop comes back empty (= fall back).
+    """
+    win = window(box, frame.shape, imgsz, pad)
+    if win is None:
+        return None, None
+    boxes = model.predict(np.ascontiguousarray(crop(frame, win)), conf=conf, imgsz=imgsz, max_det=max_det)
+    boxes = to_frame(np.array(boxes, dtype=np.float32, copy=True).reshape(-1, 6), win)
+    return drop_cut(boxes, win, frame.shape), win
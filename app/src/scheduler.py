@@ -0,0 +1,168 @@
+import threading
+import time
+from collections import deque, namedtuple
+
+import numpy as np
+
+from robot_controller import RobotState
+
+# rate_hz: inferences per second, imgsz: full-frame input size,
+# roi: run on a crop around the tracked target when one is available, at roi_imgsz
+# gate: reuse the last detections while the scene is unchanged (MotionGate)
+Plan = namedtuple("Plan", "enabled rate_hz imgsz roi roi_imgsz gate", defaults=(False,))
+
+OFF = Plan(False, 0.0, 640, False, 320)
+
+# Auto mode policy. Manual mode never runs inference (OFF).
+DEFAULT_POLICY = {
+    RobotState.IDLE: Plan(True, 5.0, 640, False, 320, True),         # standing detection
+    RobotState.SEARCH_WAIT: Plan(True, 3.0, 640, False, 320, True),  # scene is still, full view
+    RobotState.SEARCH_STEP: Plan(True, 2.0, 640, False, 320),        # turning, frames are blurred
+    RobotState.VERIFYING: Plan(True, 8.0, 640, False, 320),
+    RobotState.ALIGNING: Plan(True, 15.0, 640, True, 320),
+    RobotState.CHASING: Plan(True, 15.0, 640, True, 320),
+    RobotState.REACHED: OFF,
+}
+
+# Stands in for "state" in the per-state stats while in manual mode
+MANUAL = "MANUAL"
+
+
+class _StateStats:
+    def __init__(self):
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.inferences = 0
+        self.decision_ms = deque(maxlen=300)   # frame capture -> result published
+
+
+class InferenceScheduler:
+    """Chooses inference rate and input size from the robot state.
+
+    set_state() comes from the GUI control loop, plan() / due() / record() from the
+    inference thread. When the measured inference time exceeds the frame budget
+    (1 / rate), the interval grows multiplicatively up to max_backoff and shrinks
+    back once inference is fast enough again.
+    With adaptive=False it behaves like the old fixed loop: every frame, full size.
+    """
+
+    def __init__(self, policy=None, adaptive=True, max_backoff=4.0, fixed_imgsz=640):
+        self.policy = dict(DEFAULT_POLICY if policy is None else policy)
+        self.adaptive = adaptive
+        self.max_backoff = max_backoff
+        self.fixed_imgsz = fixed_imgsz
+        self._lock = threading.Lock()
+        self._state = MANUAL
+        self._plan = OFF
+        self.backoff = 1.0
+        self.latency_ms = 0.0                  # EWMA of inference time
+        self._last_start = 0.0
+        self._stats = {}
+        self._mark_wall = time.monotonic()
+        self._mark_cpu = time.process_time()
+
+    # --- GUI thread ---
+    def set_state(self, state, auto=True):
+        key = state if auto else MANUAL
+        with self._lock:
+            if key == self._state:
+                return
+            self._account()
+            self._state = key
+            self._plan = self.policy.get(state, OFF) if auto else OFF
+
+    def _account(self):
+        now, cpu = time.monotonic(), time.process_time()
+        stats = self._stats.setdefault(self._state, _StateStats())
+        stats.wall += now - self._mark_wall
+        stats.cpu += cpu - self._mark_cpu
+        self._mark_wall, self._mark_cpu = now, cpu
+
+    # --- inference thread ---
+    def plan(self):
+        with self._lock:
+            if not self.adaptive:
+                return Plan(self._plan.enabled, 0.0, self.fixed_imgsz, False, self.fixed_imgsz)
+            return self._plan
+
+    def interval(self):
+        """Seconds between inference starts for the current plan, backoff included."""
+        plan = self.plan()
+        if not plan.enabled or plan.rate_hz <= 0:
+            return 0.0
+        return self.backoff / plan.rate_hz
+
+    def due(self):
+        """Seconds to wait before the next inference may start (0 = now)."""
+        return max(0.0, self._last_start + self.interval() - time.monotonic())
+
+    def started(self):
+        self._last_start = time.monotonic()
+
+    def record(self, latency, frame_stamp=None):
+        """latency: seconds spent in predict, frame_stamp: capture time.time() of the frame."""
+        ms = latency * 1000
+        self.latency_ms = ms if self.latency_ms == 0 else 0.7 * self.latency_ms + 0.3 * ms
+        with self._lock:
+            stats = self._stats.setdefault(self._state, _StateStats())
+            stats.inferences += 1
+            if frame_stamp is not None:
+                stats.decision_ms.append((time.time() - frame_stamp) * 1000)
+            plan = self._plan
+        if not (self.adaptive and plan.enabled and plan.rate_hz > 0):
+            return
+        budget_ms = 1000.0 / plan.rate_hz
+        if self.latency_ms > budget_ms * self.backoff:
+            self.backoff = min(self.max_backoff, self.backoff * 1.25)
+        elif self.latency_ms < 0.7 * budget_ms * self.backoff:
+            self.backoff = max(1.0, self.backoff / 1.1)
+
+    # --- any thread ---
+    @property
+    def state(self):
+        return self._state
+
+    def snapshot(self):
+        with self._lock:
+            self._account()
+            per_state = {}
+            for key, s in self._stats.items():
+                name = key.value if isinstance(key, RobotState) else key
+                lat = np.fromiter(s.decision_ms, float, len(s.decision_ms))
+                per_state[name] = {
+                    'seconds': round(s.wall, 1),
+                    'cpu_pct': round(100.0 * s.cpu / s.wall, 1) if s.wall > 0 else 0.0,
+                    'inferences': s.inferences,
+                    'rate_hz': round(s.inferences / s.wall, 1) if s.wall > 0 else 0.0,
+                    'decision_p50_ms': round(float(np.percentile(lat, 50)), 1) if len(lat) else None,
+                    'decision_p95_ms': round(float(np.percentile(lat, 95)), 1) if len(lat) else None,
+                }
+            plan = self._plan
+            state = self._state.value if isinstance(self._state, RobotState) else self._state
+        return {
+            'state': state,
+            'adaptive': self.adaptive,
+            'rate_hz': round(plan.rate_hz / self.backoff, 1) if plan.enabled else 0.0,
+            'imgsz': plan.imgsz,
+            'roi': plan.roi,
+            'gate': plan.gate,
+            'backoff': round(self.backoff, 2),
+            'latency_ms': round(self.latency_ms, 1),
+            'per_state': per_state,
+        }
+
+    def input_sizes(self):
+        """Every input size the policy can ask for (full frame and ROI), to warm the model up with."""
+        sizes = {self.fixed_imgsz}
+        for plan in self.policy.values():
+            if plan.enabled:
+                sizes.add(plan.imgsz)
+                if plan.roi:
+                    sizes.add(plan.roi_imgsz)
+        return sorted(sizes, reverse=True)
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats.clear()
+            self._mark_wall = time.monotonic()
+            self._mark_cpu = time.process_time()
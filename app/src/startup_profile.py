@@ -0,0 +1,131 @@
+import builtins
+import importlib.util
+import json
+import sys
+import threading
+import time
+
+# main.py --profile-startup [FILE]: wall time of every module import and of each init phase,
+# reported (and written to FILE as JSON) when the main window paints for the first time.
+# Imported first by main.py so that the clock and the import hook cover everything after it.
+
+T0 = time.perf_counter()
+
+
+class ImportTimer:
+    """builtins.__import__ hook: self and cumulative time of every module loaded while installed."""
+
+    def __init__(self):
+        self.records = {}   # module -> (self_s, cumulative_s, depth)
+        self._local = threading.local()
+        self._import = None
+
+    def install(self):
+        self._import = builtins.__import__
+        builtins.__import__ = self._timed_import
+
+    def uninstall(self):
+        if self._import is not None:
+            builtins.__import__ = self._import
+            self._import = None
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        full = name
+        if level:
+            try:
+                full = importlib.util.resolve_name("." * level + name, (globals or {}).get("__package__"))
+            except (ImportError, ValueError):
+                pass
+        if full in sys.modules:
+            return self._import(name, globals, locals, fromlist, level)
+        stack = self._local.__dict__.setdefault("stack", [])
+        stack.append(0.0)
+        t0 = time.perf_counter()
+        try:
+            return self._import(name, globals, locals, fromlist, level)
+        finally:
+            total = time.perf_counter() - t0
+            children = stack.pop()
+            if stack:
+                stack[-1] += total
+            self.records.setdefault(full, (total - children, total, len(stack) + 1))
+
+
+class StartupProfile:
+    """Import times plus consecutive init phases: step(name) ends the running phase and starts the next."""
+
+    enabled = True
+
+    def __init__(self, output=None):
+        self.output = output
+        self.imports = ImportTimer()
+        self.imports.install()
+        self.phases = []          # (name, start_s, duration_s)
+        self._phase = None
+        self.first_paint_s = None
+
+    def _now(self):
+        return time.perf_counter() - T0
+
+    def step(self, name=None):
+        now = self._now()
+        if self._phase is not None:
+            label, start = self._phase
+            self.phases.append((label, round(start, 4), round(now - start, 4)))
+        self._phase = (name, now) if name else None
+
+    def first_paint(self):
+        if self.first_paint_s is not None:
+            return
+        self.step(None)
+        self.first_paint_s = self._now()
+        self.imports.uninstall()
+        self.report()
+
+    def summary(self):
+        records = self.imports.records
+        return {
+            'first_paint_s': round(self.first_paint_s, 4),
+            'imports_s': round(sum(r[0] for r in records.values()), 4),
+            'phases': [{'name': n, 'start_s': s, 'seconds': d} for n, s, d in self.phases],
+            # Direct imports of main.py with everything they pulled in, then the slowest modules by self time
+            'top_level': {name: round(r[1], 4) for name, r in records.items() if r[2] == 1},
+            'modules': {name: round(r[0], 4) for name, r in sorted(records.items(), key=lambda kv: -kv[1][0])},
+        }
+
+    def report(self, top=15):
+        s = self.summary()
+        print(f"\n=== Startup profile: first paint {s['first_paint_s'] * 1000:.0f} ms after main.py started, "
+              f"imports {s['imports_s'] * 1000:.0f} ms ===")
+        print("Phases:")
+        for p in s['phases']:
+            print(f"  {p['name']:<24} {p['seconds'] * 1000:8.1f} ms  (at {p['start_s'] * 1000:.0f} ms)")
+        print("Imports by main.py (cumulative):")
+        for name, secs in sorted(s['top_level'].items(), key=lambda kv: -kv[1]):
+            print(f"  {name:<24} {secs * 1000:8.1f} ms")
+        print(f"Slowest modules (self time, top {top}):")
+        for name, secs in list(s['modules'].items())[:top]:
+            print(f"  {name:<40} {secs * 1000:8.1f} ms")
+        if self.output:
+            with open(self.output, "w") as f:
+                json.dump(s, f, indent=2)
+            print(f"Startup profile saved: {self.output}")
+
+
+class _NoProfile:
+    enabled = False
+
+    def step(self, name=None):
+        pass
+
+    def first_paint(self):
+        pass
+
+
+def from_argv(argv):
+    """StartupProfile when argv has --profile-startup [FILE], otherwise a no-op stand-in."""
+    if "--profile-startup" not in argv:
+        return _NoProfile()
+    i = argv.index("--profile-startup")
+    output = argv[i + 1] if i + 1 < len(argv) and not argv[i + 1].startswith("-") else None
+    return StartupProfile(output)
@@ -126,6 +126,18 @@ QLineEdit {{
 QLineEdit:focus {{ border: 2px solid {PRIMARY_COLOR}; }}
 """
 
+COMBO_STYLE = f"""
+QComboBox {{
+    background-color: {BG_TERTIARY}; 
+    color: {TEXT_PRIMARY}; 
+    border: 2px solid {BG_TERTIARY}; 
+    padding: 6px 10px; 
+    border-radius: 8px;
+}}
+QComboBox:focus {{ border: 2px solid {PRIMARY_COLOR}; }}
+QComboBox QAbstractItemView {{ background: {BG_PRIMARY}; selection-background-color: {PRIMARY_COLOR}; }}
+"""
+
 BTN_STOP_STYLE = f"""
 QPushButton {{ 
     background-color: {DANGER_COLOR}; 
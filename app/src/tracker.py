@@ -0,0 +1,221 @@
+import numpy as np
+
+from inference import detections as det
+
+# Tracks carry the detection fields (so det.xyxy / det.label_of work on them) plus identity.
+TRACK_DTYPE = np.dtype(det.DETECTION_DTYPE.descr + [
+    ('track_id', np.int32),
+    ('hits', np.int32),          # matched detections so far
+    ('stale', np.float32),       # seconds since the last matched detection (0 = measured this frame)
+])
+
+# Constant-velocity Kalman filter on [cx, cy, w, h, vcx, vcy, vw, vh], measurement [cx, cy, w, h].
+_H = np.hstack([np.eye(4, dtype=np.float64), np.zeros((4, 4))])
+_R = np.diag([4.0, 4.0, 10.0, 10.0]) ** 2              # detector jitter, px
+_P0 = np.diag([10.0, 10.0, 10.0, 10.0, 100.0, 100.0, 50.0, 50.0]) ** 2
+_Q_POS = 1.0                                           # px^2 per second
+_Q_VEL = 200.0 ** 2                                    # (px/s)^2 per second, i.e. turning robot
+CHI2_GATE_2D = 9.21                                    # 99% for a 2-dof centre innovation
+
+
+def _transition(dt):
+    F = np.eye(8)
+    F[:4, 4:] = np.eye(4) * dt
+    return F
+
+
+def _to_state(boxes):
+    """(N, 4) xyxy -> (N, 4) cx, cy, w, h"""
+    wh = boxes[:, 2:4] - boxes[:, 0:2]
+    return np.hstack([boxes[:, 0:2] + wh * 0.5, wh])
+
+
+def _to_xyxy(state):
+    cxcy = state[:, 0:2]
+    half = np.maximum(state[:, 2:4], 1.0) * 0.5
+    return np.hstack([cxcy - half, cxcy + half])
+
+
+def iou_matrix(a, b):
+    """(N, 4) x (M, 4) xyxy -> (N, M) IoU."""
+    if len(a) == 0 or len(b) == 0:
+        return np.zeros((len(a), len(b)))
+    tl = np.maximum(a[:, None, :2], b[None, :, :2])
+    br = np.minimum(a[:, None, 2:], b[None, :, 2:])
+    inter = np.prod(np.clip(br - tl, 0, None), axis=2)
+    area_a = np.prod(a[:, 2:] - a[:, :2], axis=1)
+    area_b = np.prod(b[:, 2:] - b[:, :2], axis=1)
+    return inter / np.maximum(area_a[:, None] + area_b[None, :] - inter, 1e-9)
+
+
+def _greedy(score, valid, used_rows, used_cols, descending=True):
+    """Best-first one-to-one assignment over the valid (row, col) pairs."""
+    rows, cols = np.nonzero(valid)
+    if len(rows) == 0:
+        return []
+    s = score[rows, cols]
+    order = np.argsort(-s if descending else s, kind="stable")
+    pairs = []
+    for i in order:
+        r, c = rows[i], cols[i]
+        if r in used_rows or c in used_cols:
+            continue
+        used_rows.add(r)
+        used_cols.add(c)
+        pairs.append((r, c))
+    return pairs
+
+
+class Tracker:
+    """SORT-style multi-object tracker: Kalman prediction, IoU then centroid association.
+
+    update() is called with every inference result, predict() in between (frames that
+    skip inference, control ticks) and never changes the filter state. One confirmed track
+    is kept locked for the controller until it dies, so the target no longer jumps to
+    whichever box has the highest confidence in a given frame. A track dies max_age after
+    its last match, also when no result arrives in the meantime: predict() leaves it out
+    and locked() lets go of it.
+    """
+
+    def __init__(self, iou_threshold=0.2, center_gate=CHI2_GATE_2D, max_age=1.0, min_hits=2, min_conf=0.0):
+        self.iou_threshold = iou_threshold
+        self.center_gate = center_gate           # squared Mahalanobis distance of the box centre
+        self.max_age = max_age                   # seconds without a match before a track is dropped
+        self.min_hits = min_hits
+        self.min_conf = min_conf
+        self.reset()
+
+    def reset(self):
+        self._x = np.zeros((0, 8))
+        self._P = np.zeros((0, 8, 8))
+        self._ids = np.zeros(0, np.int32)
+        self._hits = np.zeros(0, np.int32)
+        self._seen = np.zeros(0)                 # stamp of the last matched detection
+        self._conf = np.zeros(0, np.float32)
+        self._cls = np.zeros(0, np.int32)
+        self._stamp = None
+        self._next_id = 1
+        self.locked_id = None
+
+    def __len__(self):
+        return len(self._ids)
+
+    def _predicted(self, stamp):
+        """Means and covariances extrapolated to stamp (no state change)."""
+        if self._stamp is None or len(self._ids) == 0:
+            return self._x.copy(), self._P.copy()
+        dt = max(0.0, stamp - self._stamp)
+        F = _transition(dt)
+        x = self._x @ F.T
+        P = F @ self._P @ F.T
+        P[:, :4, :4] += np.eye(4) * _Q_POS * dt
+        P[:, 4:, 4:] += np.eye(4) * _Q_VEL * dt
+        return x, P
+
+    def update(self, detections, stamp):
+        """Feed one inference result (DETECTION_DTYPE array), returns the confirmed tracks."""
+        x, P = self._predicted(stamp)
+        if len(detections) and self.min_conf > 0:
+            detections = detections[detections['conf'] >= self.min_conf]
+        boxes = det.xyxy(detections).astype(np.float64) if len(detections) else np.zeros((0, 4))
+
+        used_t, used_d = set(), set()
+        matches = []
+        if len(x) and len(boxes):
+            pred = _to_xyxy(x[:, :4])
+            iou = iou_matrix(pred, boxes)
+            matches += _greedy(iou, iou >= self.iou_threshold, used_t, used_d)
+            # Small / fast objects often have no overlap with their prediction: fall back to centroids,
+            # gated by the predicted uncertainty so young tracks (unknown velocity) get a wider window
+            z = _to_state(boxes)
+            diff = z[None, :, :2] - x[:, None, :2]
+            S_inv = np.linalg.inv(P[:, :2, :2] + _R[:2, :2])
+            d2 = np.einsum('tdi,tij,tdj->td', diff, S_inv, diff)
+            matches += _greedy(d2, d2 <= self.center_gate, used_t, used_d, descending=False)
+
+        if matches:
+            t_idx = np.array([m[0] for m in matches])
+            d_idx = np.array([m[1] for m in matches])
+            z = _to_state(boxes[d_idx])
+            Pm = P[t_idx]
+            S = Pm[:, :4, :4] + _R
+            K = Pm[:, :, :4] @ np.linalg.inv(S)
+            innovation = z - x[t_idx, :4]
+            x[t_idx] += np.einsum('nij,nj->ni', K, innovation)
+            P[t_idx] = (np.eye(8) - K @ _H) @ Pm
+            self._hits[t_idx] += 1
+            self._seen[t_idx] = stamp
+            self._conf[t_idx] = detections['conf'][d_idx]
+            self._cls[t_idx] = detections['cls'][d_idx]
+
+        self._x, self._P, self._stamp = x, P, stamp
+
+        new = np.array(sorted(set(range(len(boxes))) - used_d), dtype=np.int64)
+        if len(new):
+            n = len(new)
+            x0 = np.zeros((n, 8))
+            x0[:, :4] = _to_state(boxes[new])
+            self._x = np.vstack([self._x, x0])
+            self._P = np.concatenate([self._P, np.repeat(_P0[None], n, axis=0)])
+            self._ids = np.concatenate([self._ids, np.arange(self._next_id, self._next_id + n, dtype=np.int32)])
+            self._next_id += n
+            self._hits = np.concatenate([self._hits, np.ones(n, np.int32)])
+            self._seen = np.concatenate([self._seen, np.full(n, stamp)])
+            self._conf = np.concatenate([self._conf, detections['conf'][new]])
+            self._cls = np.concatenate([self._cls, detections['cls'][new]])
+
+        alive = stamp - self._seen <= self.max_age
+        if not alive.all():
+            self._x, self._P = self._x[alive], self._P[alive]
+            self._ids, self._hits = self._ids[alive], self._hits[alive]
+            self._seen, self._conf, self._cls = self._seen[alive], self._conf[alive], self._cls[alive]
+
+        self._relock()
+        return self._tracks(self._x, stamp, confirmed_only=True)
+
+    def predict(self, stamp):
+        """Confirmed tracks extrapolated to stamp, without the ones unmatched for more than max_age."""
+        x, _ = self._predicted(stamp)
+        tracks = self._tracks(x, stamp, confirmed_only=True)
+        # update() drops them too, but only runs when a result arrives
+        return tracks[tracks['stale'] <= self.max_age]
+
+    def _relock(self):
+        if self.locked_id is not None and self.locked_id in self._ids:
+            return
+        confirmed = self._hits >= self.min_hits
+        measured = self._seen == self._stamp
+        candidates = np.nonzero(confirmed & measured)[0]
+        if len(candidates):
+            self.locked_id = int(self._ids[candidates[self._conf[candidates].argmax()]])
+        else:
+            self.locked_id = None
+
+    def locked(self, stamp=None):
+        """The locked track (TRACK_DTYPE row) extrapolated to stamp, or None."""
+        if self.locked_id is None:
+            return None
+        tracks = self.predict(self._stamp if stamp is None else stamp)
+        rows = tracks[tracks['track_id'] == self.locked_id]
+        if not len(rows):
+            # Unmatched for max_age: gone, lock on to a fresh track if there is one
+            self.unlock()
+            rows = tracks[tracks['track_id'] == self.locked_id]
+        return rows[0] if len(rows) else None
+
+    def unlock(self):
+        self.locked_id = None
+        self._relock()
+
+    def _tracks(self, x, stamp, confirmed_only):
+        keep = self._hits >= self.min_hits if confirmed_only else np.ones(len(self._ids), bool)
+        boxes = _to_xyxy(x[keep, :4]) if len(x) else np.zeros((0, 4))
+        out = np.empty(int(keep.sum()), dtype=TRACK_DTYPE)
+        out['x1'], out['y1'], out['x2'], out['y2'] = boxes.T
+        out['conf'] = self._conf[keep]
+        out['cls'] = self._cls[keep]
+        out['center_x'] = x[keep, 0] if len(x) else 0
+        out['track_id'] = self._ids[keep]
+        out['hits'] = self._hits[keep]
+        out['stale'] = (stamp - self._seen[keep]) if stamp is not None else 0
+        return out
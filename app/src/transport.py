@@ -0,0 +1,180 @@
+import asyncio
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+
+class _Protocol(asyncio.DatagramProtocol):
+    def __init__(self, owner):
+        self.owner = owner
+
+    def connection_made(self, transport):
+        self.owner._transport = transport
+
+    def datagram_received(self, data, addr):
+        try:
+            self.owner.on_datagram(data, addr)
+        except Exception as e:
+            print(f"Net Error: {e}")
+
+    def error_received(self, exc):
+        # ICMP port unreachable etc. while the robot is offline
+        self.owner.errors += 1
+
+
+class UdpTransport:
+    """One UDP socket driven by an asyncio event loop on its own thread.
+
+    send() may be called from any thread: packets go into a queue that the loop drains.
+    Packets sent with a coalesce_key replace a still-queued packet with the same key
+    (the old one is dropped, the new one goes to the back so ordering with other
+    commands is kept). on_datagram(data, addr) is called on the loop thread.
+    """
+
+    def __init__(self, on_datagram, host="0.0.0.0", port=0, latency_window=2000):
+        self.on_datagram = on_datagram
+        self.host = host
+        self.requested_port = port
+        self.port = None
+        self.loop = None
+        self.errors = 0
+        self._transport = None
+        self._ready = threading.Event()
+        self._thread = None
+
+        self._lock = threading.Lock()
+        self._queue = deque()           # [data, addr, key, enqueue time, alive]
+        self._keyed = {}                # coalesce_key -> queued entry
+        self._drain_scheduled = False
+        self._latency = deque(maxlen=latency_window)  # enqueue -> sendto, ms
+        self.queued = 0
+        self.sent = 0
+        self.coalesced = 0
+        self.max_depth = 0
+
+    # --- loop thread ---
+    async def _open(self):
+        try:
+            await self.loop.create_datagram_endpoint(
+                lambda: _Protocol(self), local_addr=(self.host, self.requested_port))
+        except OSError:
+            # Preferred port taken (second app instance): let the OS pick one,
+            # the robot answers to whatever port the commands come from
+            print(f"Port {self.requested_port} is busy, using an ephemeral port")
+            await self.loop.create_datagram_endpoint(
+                lambda: _Protocol(self), local_addr=(self.host, 0))
+        self.port = self._transport.get_extra_info("sockname")[1]
+        print(f"Socket bound to port {self.port}")
+
+    def run(self, on_ready=None):
+        """Blocking: bind, run the loop until stop(). Call on the thread that should own the loop."""
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_until_complete(self._open())
+            if on_ready:
+                on_ready()
+            self._ready.set()
+            with self._lock:
+                pending = bool(self._queue)
+            if pending:
+                self._drain()
+            self.loop.run_forever()
+        finally:
+            self._ready.set()
+            if self._transport:
+                self._transport.close()
+            self.loop.run_until_complete(asyncio.sleep(0))
+            self.loop.close()
+
+    def _drain(self):
+        with self._lock:
+            batch = self._queue
+            self._queue = deque()
+            self._keyed.clear()
+            self._drain_scheduled = False
+        if self._transport is None:
+            return
+        now = time.perf_counter()
+        latencies = []
+        for data, addr, _, stamp, alive in batch:
+            if not alive:
+                continue
+            self._transport.sendto(data, addr)
+            latencies.append((now - stamp) * 1000)
+        with self._lock:
+            self.sent += len(latencies)
+            self._latency.extend(latencies)
+
+    def _shutdown(self):
+        self._drain()
+        self.loop.stop()
+
+    # --- any thread ---
+    def start(self, timeout=2.0):
+        """run() on a daemon thread, returns once the socket is bound."""
+        self._thread = threading.Thread(target=self.run, daemon=True)
+        self._thread.start()
+        self._ready.wait(timeout)
+        return self
+
+    def wait_ready(self, timeout=None):
+        return self._ready.wait(timeout)
+
+    def send(self, data, addr, coalesce_key=None):
+        entry = [data, addr, coalesce_key, time.perf_counter(), True]
+        with self._lock:
+            if coalesce_key is not None:
+                old = self._keyed.get(coalesce_key)
+                if old is not None:
+                    old[4] = False
+                    self.coalesced += 1
+                self._keyed[coalesce_key] = entry
+            self._queue.append(entry)
+            self.queued += 1
+            self.max_depth = max(self.max_depth, len(self._queue))
+            if self._drain_scheduled or self.loop is None or not self._ready.is_set():
+                return
+            self._drain_scheduled = True
+        try:
+            self.loop.call_soon_threadsafe(self._drain)
+        except RuntimeError:
+            pass  # loop already closed
+
+    def call_every(self, interval, fn):
+        """Run fn() on the loop thread every `interval` seconds (call from on_ready or the loop)."""
+        def tick():
+            try:
+                fn()
+            except Exception as e:
+                print(f"Net Error: {e}")
+            self.loop.call_later(interval, tick)
+        self.loop.call_soon(tick)
+
+    def stop(self):
+        """Flush the queue and stop the loop."""
+        if self.loop is not None and not self.loop.is_closed():
+            try:
+                self.loop.call_soon_threadsafe(self._shutdown)
+            except RuntimeError:
+                pass
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+
+    def get_stats(self):
+        with self._lock:
+            lat = np.fromiter(self._latency, float, len(self._latency))
+            depth = len(self._queue)
+        p50, p99 = np.percentile(lat, (50, 99)) if len(lat) else (0.0, 0.0)
+        return {
+            'queued': self.queued,
+            'sent': self.sent,
+            'coalesced': self.coalesced,
+            'depth': depth,
+            'max_depth': self.max_depth,
+            'queue_p50_ms': round(float(p50), 3),
+            'queue_p99_ms': round(float(p99), 3),
+            'errors': self.errors,
+        }
@@ -1,12 +1,14 @@
 # ui/panels.py - FLEXIBLE LAYOUT VERSION
+import os
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QGridLayout, QLabel, 
                             QSlider, QGroupBox, QLineEdit, QPushButton, 
                             QListWidget, QListWidgetItem, QHBoxLayout, 
-                            QTabWidget, QFormLayout, QCheckBox, QSizePolicy)
+                            QTabWidget, QFormLayout, QCheckBox, QSizePolicy,
+                            QComboBox)
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QFont
 from ui.widgets import VisualKey
-from styles import BTN_STYLE, INPUT_STYLE, PRIMARY_COLOR, TEXT_SECONDARY, BG_TERTIARY, TEXT_PRIMARY, CHECKBOX_STYLE
+from styles import BTN_STYLE, INPUT_STYLE, COMBO_STYLE, PRIMARY_COLOR, TEXT_SECONDARY, BG_TERTIARY, TEXT_PRIMARY, CHECKBOX_STYLE
 
 class ManualPanel(QWidget):
     def __init__(self, parent_app):
@@ -256,6 +258,14 @@ class SettingsPanel(QWidget):
         self.slider_ai_frame.valueChanged.connect(lambda v: lbl_frame.setText(f"{v}"))
         l_frame.addWidget(lbl_frame_title); l_frame.addWidget(self.slider_ai_frame); l_frame.addWidget(lbl_frame)
 
+        l_model = QHBoxLayout()
+        lbl_model_title = QLabel("AI Model:")
+        lbl_model_title.setMinimumWidth(70)
+        self.cmb_model = QComboBox()
+        self.cmb_model.setStyleSheet(COMBO_STYLE)
+        self.populate_models()
+        l_model.addWidget(lbl_model_title); l_model.addWidget(self.cmb_model, 1)
+
         self.chk_spin = QCheckBox("Enable Scan Mode")
         self.chk_spin.setFont(QFont("Segoe UI", 10, QFont.Weight.Bold))
         self.chk_spin.setStyleSheet(CHECKBOX_STYLE)
@@ -444,6 +454,7 @@ class SettingsPanel(QWidget):
         layout.addLayout(l1)
         layout.addLayout(l2)
         layout.addLayout(l_frame)
+        layout.addLayout(l_model)
         layout.addWidget(self.chk_spin)
         layout.addWidget(grp_strat)
         layout.addWidget(grp_move)
@@ -452,6 +463,28 @@ class SettingsPanel(QWidget):
         widget.setLayout(layout)
         return widget
 
+    def populate_models(self):
+        """List the FP32 / ONNX / INT8 models found next to best.pt"""
+        model_dir = os.path.dirname(os.path.abspath(self.app.MODEL_PATH))
+        current = os.path.abspath(self.app.MODEL_PATH)
+        self.cmb_model.clear()
+        files = []
+        if os.path.isdir(model_dir):
+            files = sorted(f for f in os.listdir(model_dir) if f.endswith((".pt", ".onnx")))
+        for f in files:
+            path = os.path.join(model_dir, f)
+            if f.endswith(".pt"):
+                kind = "FP32 torch"
+            elif "int8" in f.lower():
+                kind = "INT8 ONNX"
+            else:
+                kind = "FP32 ONNX"
+            self.cmb_model.addItem(f"{f} ({kind})", path)
+            if os.path.abspath(path) == current:
+                self.cmb_model.setCurrentIndex(self.cmb_model.count() - 1)
+        if not files:
+            self.cmb_model.addItem(os.path.basename(self.app.MODEL_PATH), self.app.MODEL_PATH)
+
     def apply_manual(self):
         s = self.slider_man_speed.value()
         motor_balance = self.slider_man_motor.value() / 100.0
@@ -475,7 +508,9 @@ class SettingsPanel(QWidget):
         timeout = self.slider_timeout.value() / 10.0
         motor_left_boost = self.slider_motor_left.value() / 100.0
         ai_frame_interval = self.slider_ai_frame.value()
+        model_path = self.cmb_model.currentData()
         
         self.app.apply_auto_config(speed, conf, spin_enabled, scan_dur, wait_dur, verify_time, 
                                    scan_speed, search_delay, align_tol, turn_sens, stop_dist,
-                                   align_speed, timeout, motor_left_boost, ai_frame_interval)
\ No newline at end of file
+                                   align_speed, timeout, motor_left_boost, ai_frame_interval,
+                                   model_path)
\ No newline at end of file
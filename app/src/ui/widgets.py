@@ -1,7 +1,8 @@
 # ui/widgets.py - FIXED VERSION
+import time
 from PyQt6.QtWidgets import QPushButton, QLabel, QFrame, QVBoxLayout, QWidget, QProgressBar
-from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QFont, QColor, QPainter
+from PyQt6.QtCore import Qt, QRect, pyqtSignal
+from PyQt6.QtGui import QFont, QColor, QPainter, QPen
 
 class VisualKey(QPushButton):
     def __init__(self, text, key_code):
@@ -201,4 +202,82 @@ class LoadingOverlay(QWidget):
     def paintEvent(self, event):
         """Vẽ nền mờ"""
         painter = QPainter(self)
-        painter.fillRect(self.rect(), QColor(0, 0, 0, 120))
\ No newline at end of file
+        painter.fillRect(self.rect(), QColor(0, 0, 0, 120))
+
+class VideoWidget(QWidget):
+    """Paints frames from VideoThread as-is.
+
+    Frames arrive already scaled to this widget's size (VideoThread does the resize on its
+    own thread), so painting is a plain blit. Each frame wraps a FrameRing slot, and the
+    previous slot is handed back through release_cb once the new one replaces it.
+    """
+    size_changed = pyqtSignal(int, int)
+
+    def __init__(self, release_cb=None, parent=None):
+        super().__init__(parent)
+        self.release_cb = release_cb
+        self.image = None
+        self.slot = -1
+        self.setAttribute(Qt.WidgetAttribute.WA_OpaquePaintEvent)
+
+        # GUI-thread cost per frame (set_frame + paint)
+        self.gui_ms = 0.0
+        self._gui_time = 0.0
+        self._gui_frames = 0
+        self._gui_window = time.time()
+
+    def _account(self, dt):
+        self._gui_time += dt
+        now = time.time()
+        if now - self._gui_window >= 1.0:
+            if self._gui_frames:
+                self.gui_ms = self._gui_time / self._gui_frames * 1000
+            self._gui_time = 0.0
+            self._gui_frames = 0
+            self._gui_window = now
+
+    def set_frame(self, image, slot=-1):
+        t0 = time.perf_counter()
+        old_slot = self.slot
+        self.image = image
+        self.slot = slot
+        if old_slot >= 0 and self.release_cb:
+            self.release_cb(old_slot)
+        self._gui_frames += 1
+        self.update()
+        self._account(time.perf_counter() - t0)
+
+    def clear(self):
+        if self.slot >= 0 and self.release_cb:
+            self.release_cb(self.slot)
+        self.image = None
+        self.slot = -1
+        self.update()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        # Leave room for the 2px border
+        self.size_changed.emit(max(1, self.width() - 4), max(1, self.height() - 4))
+
+    def paintEvent(self, event):
+        t0 = time.perf_counter()
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor(0, 0, 0))
+
+        inner = self.rect().adjusted(2, 2, -2, -2)
+        if self.image is None or self.image.isNull():
+            painter.setPen(QColor("#555"))
+            painter.drawText(inner, Qt.AlignmentFlag.AlignCenter, "NO SIGNAL")
+        else:
+            w, h = self.image.width(), self.image.height()
+            if w > inner.width() or h > inner.height():
+                # Frame still sized for the old widget size: let the painter fit it until the next one
+                scale = min(inner.width() / w, inner.height() / h)
+                w, h = int(w * scale), int(h * scale)
+            target = QRect(inner.x() + (inner.width() - w) // 2, inner.y() + (inner.height() - h) // 2, w, h)
+            painter.drawImage(target, self.image)
+
+        painter.setPen(QPen(QColor("#0078D4"), 2))
+        painter.drawRect(self.rect().adjusted(1, 1, -1, -1))
+        painter.end()
+        self._account(time.perf_counter() - t0)
@@ -0,0 +1,141 @@
+import numpy as np
+
+from robot_controller import RobotController, RobotState, PARAMS
+
+# State codes: index into STATES
+STATES = list(RobotState)
+IDLE, SEARCH_STEP, SEARCH_WAIT, VERIFYING, ALIGNING, CHASING, REACHED = (
+    STATES.index(s) for s in (RobotState.IDLE, RobotState.SEARCH_STEP, RobotState.SEARCH_WAIT,
+                              RobotState.VERIFYING, RobotState.ALIGNING, RobotState.CHASING,
+                              RobotState.REACHED))
+
+
+class VecController:
+    """RobotController's state machine for n robots at once, one NumPy array per field.
+
+    Same transitions and motor outputs as RobotController.compute_control() (int truncation
+    included), so a parameter sweep over thousands of instances is one vectorized step per
+    control tick. Every tunable in robot_controller.PARAMS may be a scalar or an (n,) array.
+    Time comes in as an argument: all instances share one virtual clock.
+    """
+
+    def __init__(self, n, screen_width=640, **params):
+        self.n = n
+        self.center_x = screen_width // 2
+        defaults = RobotController(screen_width=screen_width).params()
+        for name in PARAMS:
+            value = params.pop(name, defaults[name])
+            setattr(self, name, np.broadcast_to(np.asarray(value, dtype=np.float64), (n,)).copy())
+        if params:
+            raise TypeError(f"Unknown controller parameters: {', '.join(params)}")
+
+        self.state = np.full(n, IDLE, np.int8)
+        self.target_x = np.zeros(n)
+        self.track_id = np.full(n, -1, np.int64)
+        self.dist_front = np.full(n, 999.0)
+        self.state_timer = np.zeros(n)
+        self.first_seen_time = np.zeros(n)
+        self.last_seen_time = np.zeros(n)
+        self.search_enabled = np.zeros(n, bool)
+
+    def states(self):
+        """State of every instance as RobotState values (for reports, not for the hot loop)."""
+        return [STATES[s] for s in self.state]
+
+    def update_sensors(self, front):
+        front = np.asarray(front, dtype=np.float64)
+        self.dist_front = np.where(front > 0, front, 999.0)
+
+    def enable_search(self, enabled, now):
+        enabled = np.broadcast_to(enabled, (self.n,))
+        self.search_enabled = enabled.copy()
+        self.state = np.where(enabled, SEARCH_WAIT, IDLE).astype(np.int8)
+        self.state_timer = np.where(enabled, now, self.state_timer)
+
+    def update_detection(self, seen, conf, center_x, now, track_id=None):
+        """seen: (n,) bool, instances that got a target this frame; conf / center_x / track_id: (n,)."""
+        center_x = np.trunc(center_x)
+        valid = seen & (conf >= self.confidence_threshold)
+        if track_id is None:
+            same = np.zeros(self.n, bool)
+        else:
+            same = valid & (track_id == self.track_id)
+            self.track_id = np.where(valid, track_id, self.track_id)
+        self.target_x = np.where(valid, center_x, self.target_x)
+        self.last_seen_time = np.where(valid, now, self.last_seen_time)
+        # Off-centre new targets are ignored while aligning / chasing (state unchanged either way)
+        spotted = valid & np.isin(self.state, (SEARCH_STEP, SEARCH_WAIT, IDLE, REACHED))
+        self.state = np.where(spotted, VERIFYING, self.state).astype(np.int8)
+        self.first_seen_time = np.where(spotted, now, self.first_seen_time)
+
+    def compute_control(self, now):
+        """One control tick for every instance. Returns (L, R) int arrays."""
+        s = self.state
+        L = np.zeros(self.n, np.int64)
+        R = np.zeros(self.n, np.int64)
+        done = np.zeros(self.n, bool)
+
+        reached = self.dist_front < self.STOP_DISTANCE
+        s[reached] = REACHED
+        done |= reached
+
+        # Lost target in VERIFYING / ALIGNING / CHASING
+        lost = ~done & np.isin(s, (VERIFYING, ALIGNING, CHASING)) & (now - self.last_seen_time > self.LOST_TARGET_TIMEOUT)
+        s[lost] = np.where(self.search_enabled[lost], SEARCH_WAIT, IDLE)
+        self.state_timer[lost & self.search_enabled] = now
+        done |= lost
+
+        # SEARCH_WAIT: wait, then start a turn step
+        wait = ~done & (s == SEARCH_WAIT)
+        step = wait & (now - self.state_timer > self.SEARCH_DELAY)
+        s[step] = SEARCH_STEP
+        self.state_timer[step] = now
+        L[step], R[step] = -self.SCAN_SPEED[step], self.SCAN_SPEED[step]
+        done |= wait
+
+        # SEARCH_STEP: turn left for SCAN_TURN_DURATION
+        turning = ~done & (s == SEARCH_STEP)
+        stop = turning & (now - self.state_timer > self.SCAN_TURN_DURATION)
+        s[stop] = SEARCH_WAIT
+        self.state_timer[stop] = now
+        go = turning & ~stop
+        L[go], R[go] = -self.SCAN_SPEED[go], self.SCAN_SPEED[go]
+        done |= turning
+
+        # VERIFYING: creep forward until seen for CONFIRM_TIME
+        verifying = ~done & (s == VERIFYING)
+        confirmed = verifying & (now - self.first_seen_time >= self.CONFIRM_TIME)
+        s[confirmed] = ALIGNING
+        creep = verifying & ~confirmed
+        half = np.trunc(self.base_speed * 0.5).astype(np.int64)
+        L[creep], R[creep] = half[creep], half[creep]
+        done |= verifying
+
+        error = self.target_x - self.center_x
+
+        # ALIGNING: turn in place until the target is within ALIGN_TOLERANCE
+        aligning = ~done & (s == ALIGNING)
+        locked = aligning & (np.abs(error) < self.ALIGN_TOLERANCE)
+        s[locked] = CHASING
+        L[locked], R[locked] = self.base_speed[locked], self.base_speed[locked]
+        turn = aligning & ~locked
+        sign = np.where(error > 0, 1, -1)
+        L[turn] = sign[turn] * self.ALIGN_SPEED[turn]
+        R[turn] = -sign[turn] * self.ALIGN_SPEED[turn]
+        done |= aligning
+
+        # CHASING: proportional steering
+        chasing = ~done & (s == CHASING)
+        steer = np.clip(np.trunc(error * self.TURN_SENSITIVITY), -40, 40)
+        cl = np.clip(np.trunc((self.base_speed + steer) * self.MOTOR_LEFT_BOOST), 0, 255)
+        cr = np.clip(np.trunc((self.base_speed - steer) * self.MOTOR_RIGHT_BOOST), 0, 255)
+        L[chasing], R[chasing] = cl[chasing], cr[chasing]
+
+        return L, R
+
+    def reset_after_reach(self, mask, now):
+        self.state[mask] = np.where(self.search_enabled[mask], SEARCH_WAIT, IDLE)
+        self.state_timer[mask] = now
+        self.target_x[mask] = 0
+        self.track_id[mask] = -1
+        self.dist_front[mask] = 999.0
@@ -2,38 +2,30 @@ import cv2
 import numpy as np
 from PyQt6.QtCore import QThread, pyqtSignal
 from PyQt6.QtGui import QImage
-from ultralytics import YOLO
+import os
 import time
-import torch
-import types
+import threading
 
-def fix_aattn_compat(m):
-    try:
-        model_to_scan = m.model if hasattr(m, 'model') else m
-        
-        for mod in model_to_scan.modules():
-            if mod.__class__.__name__ == 'AAttn':
-                if not hasattr(mod, 'qkv') and hasattr(mod, 'qk') and hasattr(mod, 'v'):
-                    def _qkv(self, x):
-                        qk_out = self.qk(x)
-                        v_out = self.v(x)
-                        return torch.cat([qk_out, v_out], dim=1)
-                    
-                    mod.qkv = types.MethodType(_qkv, mod)
-                    
-        print("Applied YOLOv12 AAttn compatibility fix.")
-    except Exception as e:
-        print(f"Warning: Could not apply AAttn fix: {e}")
+from inference import draw_detections, get_model, warmup
+from inference import detections as det
+from pipeline import LatestFrame, StageCounter, FrameRing
+from mjpeg_client import MjpegClient
+from scheduler import InferenceScheduler
+from motion_gate import MotionGate
+import roi
 
 class VideoThread(QThread):
-    change_pixmap_signal = pyqtSignal(QImage)
+    change_pixmap_signal = pyqtSignal(QImage, int)  # image, FrameRing slot
     ai_results_signal = pyqtSignal(dict)
     fps_signal = pyqtSignal(int)
+    stats_signal = pyqtSignal(dict)
+    model_status_signal = pyqtSignal(str, int)  # message, percent (100 ready, -1 failed)
 
-    def __init__(self, stream_url, model_path):
+    def __init__(self, stream_url, model_path, backend="auto"):
         super().__init__()
         self.stream_url = stream_url
         self.model_path = model_path
+        self.backend = backend
         self._run_flag = True
         self.ai_enabled = False
         self.confidence = 0.25
@@ -50,6 +42,51 @@ class VideoThread(QThread):
         self.reconnect_attempt = 0
         self.last_reconnect_time = 0
 
+        # Pipeline: capture -> (latest frame) -> inference / display
+        self.latest_frame = LatestFrame()
+        self.capture_stats = StageCounter("capture")
+        self.inference_stats = StageCounter("inference")
+        self.display_stats = StageCounter("display")
+        self._last_detections = det.empty()
+        self._last_detections_time = 0
+        self._det_lock = threading.Lock()
+        self._capture_thread = None
+        self._inference_thread = None
+
+        # Display buffers shared with the GUI without copies, sized to the video widget
+        self.frame_ring = FrameRing(3)
+        self._display_size = None
+
+        # Optional shared BatchInferenceService (multi-robot base station)
+        self.batch_service = None
+        self.source_id = None
+        self._batch_done = threading.Event()
+        self._batch_skipped = 0
+
+        # Inference rate / input size follow the robot state (main pushes it every control tick)
+        self.scheduler = InferenceScheduler()
+
+        # ROI mode: crop around the locked target box (set by main), full frame when it misses
+        self.roi_max_age = 0.5
+        self._roi_target = None
+        self._roi_lock = threading.Lock()
+        self._roi_stats = {'full': 0, 'roi': 0, 'hits': 0, 'fallbacks': 0}
+        self._roi_ms = {'full': 0.0, 'roi': 0.0}
+
+        # Standing still: reuse detections while the scene does not change (main reports the motors)
+        self.motion_gate = MotionGate()
+
+        # Optional recording.Recorder: frames and published detections
+        self.recorder = None
+
+        # Model load + warmup runs on its own thread (preload_model), never on the GUI thread
+        self.warmup_runs = 2
+        self._loader = None
+        self._loader_lock = threading.Lock()
+        self.load_stats = {}
+        self._created = time.time()
+        self._ai_enabled_at = None
+
     def update_source(self, url):
         if url != self.stream_url:
             print(f"Setting new URL: {url}")
@@ -59,61 +96,182 @@ class VideoThread(QThread):
     def update_conf(self, conf):
         self.confidence = conf
         
-    def set_ai_mode(self, enabled):
-        self.ai_enabled = enabled
-        if enabled and not hasattr(self, 'model'):
-            print(f"Loading YOLO model from {self.model_path}...")
+    def attach_batch_service(self, service, source_id):
+        """Send frames to a shared BatchInferenceService instead of a private model."""
+        self.batch_service = service
+        self.source_id = source_id
+        service.register(source_id)
+
+    def set_roi_target(self, box, seen=None):
+        """xyxy box of the target to crop around in ROI plans, None to always use the full frame.
+        seen: time.time() the target was last detected (a predicted box is older than the call), now if None.
+        The crop is dropped roi_max_age after seen, however often the box is set again in between."""
+        with self._roi_lock:
+            self._roi_target = None if box is None else (
+                np.array(box[:4], dtype=np.float32), time.time() if seen is None else seen)
+
+    def _roi_box(self):
+        with self._roi_lock:
+            target = self._roi_target
+        if target is None or time.time() - target[1] > self.roi_max_age:
+            return None
+        return target[0]
+
+    def _predict(self, model, frame, plan):
+        """Crop inference around the target when the plan asks for it, full frame otherwise or on a miss."""
+        box = self._roi_box() if plan.roi else None
+        if box is not None:
+            t0 = time.perf_counter()
+            boxes, win = roi.predict(model, frame, box, self.confidence, plan.roi_imgsz, max_det=5)
+            if win is not None:
+                self._roi_stats['roi'] += 1
+                self._roi_ms['roi'] += (time.perf_counter() - t0) * 1000
+                if len(boxes):
+                    self._roi_stats['hits'] += 1
+                    return boxes
+                self._roi_stats['fallbacks'] += 1
+
+        t0 = time.perf_counter()
+        boxes = model.predict(frame, conf=self.confidence, imgsz=plan.imgsz, max_det=5)
+        self._roi_stats['full'] += 1
+        self._roi_ms['full'] += (time.perf_counter() - t0) * 1000
+        return boxes
+
+    def _roi_snapshot(self):
+        s, ms = dict(self._roi_stats), dict(self._roi_ms)
+        return {
+            **s,
+            'hit_pct': round(100.0 * s['hits'] / s['roi'], 1) if s['roi'] else 0.0,
+            'roi_ms': round(ms['roi'] / s['roi'], 1) if s['roi'] else None,
+            'full_ms': round(ms['full'] / s['full'], 1) if s['full'] else None,
+        }
+
+    def set_model(self, model_path):
+        """Switch model file (FP32 .pt, FP32 .onnx or INT8 .onnx). Loads in the background, the
+        current model keeps inferring until the loader swaps the new one in once it is warmed up."""
+        print(f"Switching model: {model_path}")
+        self.model_path = model_path
+        self.preload_model()
+
+    def preload_model(self):
+        """Load and warm up the model on a background thread; progress on model_status_signal."""
+        if self.batch_service is not None:
+            return
+        with self._loader_lock:
+            if self._loader is not None:
+                return  # picks up a model_path change before it finishes
+            self._loader = threading.Thread(target=self._load_model, name="model-loader", daemon=True)
+            self._loader.start()
+
+    def _load_model(self):
+        while True:
+            with self._loader_lock:
+                replacing = getattr(self, 'model', None)
+            path = self.model_path
+            name = os.path.basename(path)
+            print(f"Loading YOLO model from {path}...")
+            self.model_status_signal.emit(f"LOADING {name}", 0)
+            t0 = time.perf_counter()
+            progress = lambda done, total: self.model_status_signal.emit(
+                f"WARMING UP {name}", 30 + 70 * done // total)
             try:
-                self.model = YOLO(self.model_path)
-                
-                fix_aattn_compat(self.model) 
-                
-                print("Model loaded successfully")
-                print(f"AI Detection ENABLED - Running on every {self.process_every_n_frames} frames")
+                model = get_model(path, self.backend)
+                load_ms = (time.perf_counter() - t0) * 1000
+                self.model_status_signal.emit(f"WARMING UP {name}", 30)
+                times = warmup(model, self.scheduler.input_sizes(), self.warmup_runs, progress=progress)
             except Exception as e:
                 print(f"Model Error: {e}")
-                self.ai_enabled = False
+                with self._loader_lock:
+                    if path != self.model_path:
+                        continue  # switched while loading, try the new one
+                    self._loader = None
+                    if not hasattr(self, 'model'):
+                        self.ai_enabled = False
+                self.model_status_signal.emit(f"Model Error: {e}", -1)
+                return
+            with self._loader_lock:
+                if path != self.model_path:
+                    continue  # switched while loading
+                if getattr(self, 'model', None) is not replacing:
+                    # A model was handed over directly meanwhile (tools, tests): keep it
+                    self._loader = None
+                    return
+                self.load_stats = {
+                    'backend': model.name,
+                    'cached': getattr(model, 'cached', False),
+                    'load_ms': round(load_ms, 1),
+                    'warmup_ms': [round(t, 1) for t in times],
+                    'ready_s': round(time.time() - self._created, 2),
+                }
+                self.model = model
+                self._loader = None
+            print(f"Model loaded successfully ({model.name} backend, {load_ms:.0f} ms, "
+                  f"warmup {sum(times):.0f} ms{', from cache' if self.load_stats['cached'] else ''})")
+            self.model_status_signal.emit(f"MODEL READY ({model.name})", 100)
+            return
+
+    def set_ai_mode(self, enabled):
+        self.ai_enabled = enabled
+        # Time to the first inference result after switching on, model load included
+        self._ai_enabled_at = time.time() if enabled else None
+        if enabled and self.batch_service is not None:
+            print(f"AI Detection ENABLED - Batched as source '{self.source_id}'")
+        elif enabled and not hasattr(self, 'model'):
+            # Inference starts by itself once the model is ready
+            print("AI Detection ENABLED - waiting for the model to finish loading")
+            self.preload_model()
+        elif enabled:
+            print(f"AI Detection ENABLED - Running on every {self.process_every_n_frames} frames")
         elif not enabled:
+            with self._det_lock:
+                self._last_detections = det.empty()
+            self.set_roi_target(None)
+            self.motion_gate.invalidate()
             print("AI Detection DISABLED")
 
-    def run(self):
-        print(f"Video Thread Starting with: {self.stream_url}")
+    def _open_capture(self):
+        # ESP32-CAM stream: own MJPEG parser, decodes at reduced scale close to 640 wide
+        if self.stream_url.startswith("http://"):
+            return MjpegClient(self.stream_url, target_width=640)
         cap = cv2.VideoCapture(self.stream_url)
         cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
         cap.set(cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, 3000)
         cap.set(cv2.CAP_PROP_READ_TIMEOUT_MSEC, 3000)
-        
+        return cap
+
+    def _capture_loop(self):
+        """Stage 1: read frames as fast as the stream delivers, keep only the newest."""
+        cap = self._open_capture()
         self.last_reconnect_time = time.time()
         no_frame_count = 0  # Track consecutive frames without data
-        
+
         while self._run_flag:
             if self.reconnect_requested:
                 print(f"Reconnecting to NEW IP: {self.stream_url} ...")
                 if cap.isOpened():
                     cap.release()
                 time.sleep(0.5)
-                cap = cv2.VideoCapture(self.stream_url)
-                cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
-                cap.set(cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, 3000)
-                cap.set(cv2.CAP_PROP_READ_TIMEOUT_MSEC, 3000)
+                cap = self._open_capture()
                 self.ai_frame_counter = 0
                 self.detection_count = 0
                 no_frame_count = 0
+                self.motion_gate.invalidate()
                 self.reconnect_requested = False
 
             ret, frame = cap.read()
-            
+
             if not ret:
                 no_frame_count += 1
+                if getattr(cap, 'handles_reconnect', False):
+                    # MjpegClient backs off and reconnects by itself
+                    time.sleep(0.05)
+                    continue
                 if no_frame_count > 10:  # After 10 failed reads, start backing off
                     if time.time() - self.last_reconnect_time > self.reconnect_delay:
                         print(f"No Frame ({no_frame_count}x). Reconnecting with {self.reconnect_delay}s delay...")
                         if cap.isOpened():
                             cap.release()
-                        cap = cv2.VideoCapture(self.stream_url)
-                        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
-                        cap.set(cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, 3000)
-                        cap.set(cv2.CAP_PROP_READ_TIMEOUT_MSEC, 3000)
+                        cap = self._open_capture()
                         # Reset counters
                         self.ai_frame_counter = 0
                         self.detection_count = 0
@@ -122,95 +280,219 @@ class VideoThread(QThread):
                         self.reconnect_delay = min(5.0, self.reconnect_delay * 2)
                         self.last_reconnect_time = time.time()
                     else:
-                        self.msleep(200)
+                        time.sleep(0.2)
                 else:
-                    self.msleep(500)
+                    time.sleep(0.5)
                 continue
             else:
                 if no_frame_count > 0:
                     print(f"Connection restored after {no_frame_count} failures")
                     self.reconnect_delay = 0.5  # Reset to initial delay
                     no_frame_count = 0
-            
+
+            stamp = time.time()
+
             # Resize
             h, w = frame.shape[:2]
             if w > 640:
                 scale = 640 / w
                 frame = cv2.resize(frame, (640, int(h * scale)))
-            
-            # AI Logic
-            if self.ai_enabled and hasattr(self, 'model'):
-                self.ai_frame_counter += 1
-                if self.ai_frame_counter % self.process_every_n_frames == 0:
-                    try:
-                        # predict
-                        results = self.model.predict(
-                            frame, 
-                            conf=self.confidence, 
-                            verbose=False, 
-                            device='cpu', 
-                            max_det=5
-                        )
-                        
-                        detections = []
-                        if results:
-                            for box in results[0].boxes:
-                                x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
-                                conf = float(box.conf[0])
-                                cls = int(box.cls[0])
-                                label = results[0].names[cls]  # trash
-                                center_x = int((x1 + x2) / 2)
-                                
-                                detections.append({
-                                    'label': label, 
-                                    'conf': conf, 
-                                    'center_x': center_x, 
-                                    'bbox': [int(x1), int(y1), int(x2), int(y2)]
-                                })
-                                
-                                cv2.rectangle(frame, (int(x1), int(y1)), (int(x2), int(y2)), (0, 255, 0), 2)
-                                cv2.putText(frame, f"{label} {conf:.2f}", (int(x1), int(y1)-10), 
-                                          cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
-                            
-                            # 5-CLASS VERSION:
-                            # Filter theo class names: battery, glass, metal, paper, plastic
-                            # class_filter = ["battery", "glass", "metal", "paper", "plastic"]
-                            # for box in results[0].boxes:
-                            #     cls = int(box.cls[0])
-                            #     label = results[0].names[cls]
-                            #     if label not in class_filter:
-                            #         continue
-                                          
-                        if detections:
-                            self.detection_count += 1
-                            if self.detection_count % 30 == 0:
-                                print(f"Detection #{self.detection_count}: Found {len(detections)} object(s)")
-                            self.ai_results_signal.emit({'detections': detections})
-                            
-                    except Exception as e:
-                        print(f"AI Error: {e}")
-
-            # Convert to Qt Image
-            rgb_image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            h, w, ch = rgb_image.shape
-            bytes_per_line = ch * w
-            qt_image = QImage(rgb_image.data, w, h, bytes_per_line, QImage.Format.Format_RGB888)
-            self.change_pixmap_signal.emit(qt_image)
+
+            self.latest_frame.put(frame, stamp)
+            self.capture_stats.tick()
+            if self.recorder is not None:
+                self.recorder.frame(frame, stamp)
+
+        cap.release()
+
+    def _names(self):
+        if self.batch_service is not None:
+            return getattr(self.batch_service.detector, 'classes', {})
+        model = getattr(self, 'model', None)
+        return model.names if model is not None else {}
+
+    def _publish_detections(self, detections, stamp, skipped=0):
+        with self._det_lock:
+            self._last_detections = detections
+            self._last_detections_time = time.time()
+        self.inference_stats.tick(stamp, skipped)
+        if self._ai_enabled_at is not None and self.ai_enabled:
+            self.load_stats['first_result_ms'] = round((time.time() - self._ai_enabled_at) * 1000, 1)
+            self._ai_enabled_at = None
+        if self.recorder is not None and self.ai_enabled:
+            self.recorder.detections(detections, stamp)
+
+        if self.ai_enabled:
+            if len(detections):
+                self.detection_count += 1
+                if self.detection_count % 30 == 0:
+                    print(f"Detection #{self.detection_count}: Found {len(detections)} object(s)")
+            # Empty results too: they are what ages the tracker's tracks out
+            self.ai_results_signal.emit({'detections': detections, 'names': self._names(), 'frame_time': stamp})
+
+    def _on_batch_result(self, source_id, detections, stamp):
+        self._publish_detections(detections, stamp, self._batch_skipped)
+        self._batch_done.set()
+
+    def _inference_loop(self):
+        """Stage 2: whenever free, run YOLO on the newest frame. Older frames are dropped."""
+        last_seq = 0
+        while self._run_flag:
+            # Read once per frame: set_model swaps it from the loader thread
+            model = getattr(self, 'model', None)
+            if not (self.ai_enabled and (model is not None or self.batch_service is not None)):
+                time.sleep(0.05)
+                last_seq = self.latest_frame.seq
+                continue
+
+            plan = self.scheduler.plan()
+            if not plan.enabled:
+                time.sleep(0.05)
+                last_seq = self.latest_frame.seq
+                continue
+            wait = self.scheduler.due()
+            if wait > 0:
+                time.sleep(min(wait, 0.05))
+                continue
+
+            # Skip ahead by process_every_n_frames captured frames, never queue
+            item = self.latest_frame.get(last_seq + max(1, self.process_every_n_frames) - 1)
+            if item is None:
+                continue
+            seq, frame, stamp = item
+            skipped = seq - last_seq - 1 if last_seq else 0
+            last_seq = seq
+            self.ai_frame_counter += 1
+            self.scheduler.started()
+
+            if plan.gate and self.motion_gate.should_skip(frame):
+                with self._det_lock:
+                    detections = self._last_detections
+                self._publish_detections(detections, stamp, skipped)
+                continue
+
+            t0 = time.perf_counter()
+            cpu0 = time.process_time()
+
+            if self.batch_service is not None:
+                # Wait for our slot in the shared batch before taking another frame
+                self._batch_skipped = skipped
+                self._batch_done.clear()
+                self.batch_service.submit(self.source_id, frame, self._on_batch_result, stamp)
+                while self._run_flag and not self._batch_done.wait(0.1):
+                    pass
+                self.scheduler.record(time.perf_counter() - t0, stamp)
+                self.motion_gate.inferred(frame, time.process_time() - cpu0)
+                continue
+
+            try:
+                # predict (ROI crop first when chasing a locked target)
+                boxes = self._predict(model, frame, plan)
+                self.scheduler.record(time.perf_counter() - t0, stamp)
+                self.motion_gate.inferred(frame, time.process_time() - cpu0)
+                
+                # One structured array per frame, no per-box Python objects
+                detections = det.from_boxes(boxes)
+                
+                # 5-CLASS VERSION:
+                # Filter theo class names: battery, glass, metal, paper, plastic
+                # class_filter = ["battery", "glass", "metal", "paper", "plastic"]
+                # class_ids = [i for i, n in self.model.names.items() if n in class_filter]
+                # detections = detections[np.isin(detections['cls'], class_ids)]
+
+                self._publish_detections(detections, stamp, skipped)
+                    
+            except Exception as e:
+                print(f"AI Error: {e}")
+                time.sleep(0.1)
+
+    def set_display_size(self, width, height):
+        """Called when the video widget is resized, frames are scaled to fit here (not on the GUI thread)."""
+        self._display_size = (width, height)
+
+    def release_frame(self, slot):
+        self.frame_ring.release(slot)
+
+    def _fit_display(self, w, h):
+        if not self._display_size:
+            return w, h
+        dw, dh = self._display_size
+        scale = min(dw / w, dh / h)
+        return max(1, int(w * scale)), max(1, int(h * scale))
+
+    def _draw_detections(self, image, scale=1.0):
+        with self._det_lock:
+            detections = self._last_detections
+            det_time = self._last_detections_time
+        # Don't keep stale boxes on screen when inference stalls
+        if not len(detections) or time.time() - det_time > 1.0:
+            return
+        draw_detections(image, detections, self._names(), scale)
+
+    def get_stats(self):
+        return {
+            'capture': self.capture_stats.snapshot(),
+            'inference': self.inference_stats.snapshot(),
+            'display': self.display_stats.snapshot(),
+            'scheduler': self.scheduler.snapshot(),
+            'roi': self._roi_snapshot(),
+            'motion': self.motion_gate.snapshot(),
+            'model': self.load_stats,
+        }
+
+    def run(self):
+        """Stage 3 (display): show the newest frame with the latest known detections."""
+        print(f"Video Thread Starting with: {self.stream_url}")
+        self._capture_thread = threading.Thread(target=self._capture_loop, name="video-capture", daemon=True)
+        self._inference_thread = threading.Thread(target=self._inference_loop, name="video-inference", daemon=True)
+        self._capture_thread.start()
+        self._inference_thread.start()
+
+        last_seq = 0
+        while self._run_flag:
+            item = self.latest_frame.get(last_seq)
+            if item is None:
+                continue
+            seq, frame, stamp = item
+            skipped = seq - last_seq - 1 if last_seq else 0
+            last_seq = seq
+
+            h, w = frame.shape[:2]
+            dw, dh = self._fit_display(w, h)
+            slot = self.frame_ring.acquire((dh, dw, 3))
+            if slot is None:
+                # GUI still holds every buffer: drop rather than queue
+                self.display_stats.drop(skipped + 1)
+                continue
+            idx, buf = slot
+
+            # Scale straight into the pooled buffer; the shared frame is never drawn on
+            if (dw, dh) == (w, h):
+                np.copyto(buf, frame)
+            else:
+                interp = cv2.INTER_AREA if dw < w else cv2.INTER_LINEAR
+                cv2.resize(frame, (dw, dh), dst=buf, interpolation=interp)
+            self._draw_detections(buf, dw / w)
+
+            # Qt reads BGR directly, no colour conversion
+            qt_image = QImage(buf.data, dw, dh, buf.strides[0], QImage.Format.Format_BGR888)
+            self.change_pixmap_signal.emit(qt_image, idx)
+            self.display_stats.tick(stamp, skipped)
             
             # FPS Calculation
             self.frame_count += 1
             if time.time() - self.last_fps_time >= 1.0:
                 self.fps = self.frame_count
                 self.fps_signal.emit(self.fps)
+                self.stats_signal.emit(self.get_stats())
                 self.frame_count = 0
                 self.last_fps_time = time.time()
 
-            self.msleep(1)
-
-        cap.release()
+        for t in (self._capture_thread, self._inference_thread):
+            t.join(timeout=2.0)
         print("Video Thread Stopped")
 
     def stop(self):
         self._run_flag = False
-        if not self.wait(2000):
+        if not self.wait(3000):
             self.terminate()
\ No newline at end of file
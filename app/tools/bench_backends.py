@@ -0,0 +1,60 @@
+# Per-frame latency of each inference backend (torch, onnxruntime CPU, OpenVINO EP).
+# Usage: python app/tools/bench_backends.py --model app/models/best.pt [--images dir] [--frames 100]
+import argparse
+import glob
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from inference import load_backend
+
+
+def load_frames(images, count):
+    if images:
+        files = sorted(glob.glob(os.path.join(images, "*.jpg")) + glob.glob(os.path.join(images, "*.png")))
+        frames = [f for f in (cv2.imread(p) for p in files[:count]) if f is not None]
+        if frames:
+            return frames
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 255, (480, 640, 3), dtype=np.uint8) for _ in range(min(count, 16))]
+
+
+def bench(backend, frames, n):
+    for f in frames[:3]:
+        backend.predict(f)  # warmup
+    times = []
+    for i in range(n):
+        t0 = time.perf_counter()
+        backend.predict(frames[i % len(frames)], conf=0.25, max_det=5)
+        times.append((time.perf_counter() - t0) * 1000)
+    return np.array(times)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default="app/models/best.pt")
+    parser.add_argument("--images", default=None)
+    parser.add_argument("--frames", type=int, default=100)
+    parser.add_argument("--backends", default="torch,onnx,openvino")
+    args = parser.parse_args()
+
+    frames = load_frames(args.images, args.frames)
+    print(f"{'backend':<10} {'mean':>8} {'p50':>8} {'p95':>8} {'fps':>7}")
+    for name in args.backends.split(","):
+        try:
+            backend = load_backend(args.model, name)
+        except Exception as e:
+            print(f"{name:<10} unavailable: {e}")
+            continue
+        t = bench(backend, frames, args.frames)
+        print(f"{backend.name:<10} {t.mean():7.1f}ms {np.percentile(t, 50):7.1f}ms "
+              f"{np.percentile(t, 95):7.1f}ms {1000 / t.mean():7.1f}")
+
+
+if __name__ == "__main__":
+    main()
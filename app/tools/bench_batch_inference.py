@@ -0,0 +1,99 @@
+# Benchmark: N separate predict calls vs one BatchInferenceService on synthetic frames.
+# Usage: python app/tools/bench_batch_inference.py --model app/models/best.pt --sources 4
+import argparse
+import os
+import sys
+import threading
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from ai_engine import TrashDetector
+from batch_engine import BatchInferenceService
+
+
+def make_frames(n, width=640, height=480, seed=0):
+    """Noise background with a few filled blobs, so NMS has something to do."""
+    rng = np.random.default_rng(seed)
+    frames = []
+    for _ in range(n):
+        frame = rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+        for _ in range(3):
+            x, y = int(rng.integers(40, width - 40)), int(rng.integers(40, height - 40))
+            color = tuple(int(c) for c in rng.integers(0, 255, 3))
+            cv2.circle(frame, (x, y), int(rng.integers(15, 40)), color, -1)
+        frames.append(frame)
+    return frames
+
+
+def bench_sequential(detector, frames, sources, duration):
+    done = 0
+    t0 = time.time()
+    while time.time() - t0 < duration:
+        for s in range(sources):
+            detector.detect_batch([frames[(done + s) % len(frames)]])
+        done += sources
+    return done / (time.time() - t0)
+
+
+def bench_batched(detector, frames, sources, duration, window_ms, max_batch):
+    service = BatchInferenceService(detector, window_ms=window_ms, max_batch=max_batch)
+    service.start()
+    counts = [0] * sources
+    stop = threading.Event()
+
+    def source_loop(idx):
+        done = threading.Event()
+        i = idx
+        while not stop.is_set():
+            done.clear()
+            service.submit(idx, frames[i % len(frames)], lambda *_: done.set())
+            done.wait()
+            counts[idx] += 1
+            i += sources
+
+    threads = [threading.Thread(target=source_loop, args=(s,), daemon=True) for s in range(sources)]
+    t0 = time.time()
+    for t in threads:
+        t.start()
+    time.sleep(duration)
+    stop.set()
+    for t in threads:
+        t.join(timeout=5.0)
+    elapsed = time.time() - t0
+    service.stop()
+    return sum(counts) / elapsed, counts, service.get_stats()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default="app/models/best.pt")
+    parser.add_argument("--sources", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--window-ms", type=float, default=10.0)
+    parser.add_argument("--max-batch", type=int, default=8)
+    args = parser.parse_args()
+
+    detector = TrashDetector(args.model)
+    if detector.model is None:
+        sys.exit(1)
+
+    frames = make_frames(16)
+    detector.detect_batch(frames[:1])  # warmup
+
+    seq_fps = bench_sequential(detector, frames, args.sources, args.duration)
+    batch_fps, counts, stats = bench_batched(detector, frames, args.sources, args.duration,
+                                             args.window_ms, args.max_batch)
+
+    print(f"Sources: {args.sources}, window: {args.window_ms}ms, max batch: {args.max_batch}")
+    print(f"Separate calls : {seq_fps:7.2f} frames/s")
+    print(f"Batched service: {batch_fps:7.2f} frames/s ({batch_fps / seq_fps:.2f}x)")
+    print(f"Per source     : {counts}")
+    print(f"Service stats  : {stats}")
+
+
+if __name__ == "__main__":
+    main()
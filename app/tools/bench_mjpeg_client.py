@@ -0,0 +1,83 @@
+# MjpegClient vs cv2.VideoCapture against the local fake ESP32-CAM stream.
+# Usage: python app/tools/bench_mjpeg_client.py [--jpegs dir] [--seconds 5]
+# Without --jpegs, synthetic 1600x1200 JPEGs are generated so reduced-scale decoding kicks in.
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from mjpeg_client import MjpegClient
+from fake_mjpeg_server import MjpegServer, jpeg_file_source
+
+
+def synthetic_source(width=1600, height=1200, count=30):
+    rng = np.random.default_rng(0)
+    frames = []
+    for i in range(count):
+        img = np.full((height, width, 3), 90, np.uint8)
+        for _ in range(6):
+            x, y = int(rng.integers(0, width)), int(rng.integers(0, height))
+            cv2.circle(img, (x, y), int(rng.integers(20, 120)), tuple(int(c) for c in rng.integers(0, 255, 3)), -1)
+        frames.append(cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, 80])[1].tobytes())
+    state = {"i": 0}
+
+    def next_frame():
+        state["i"] += 1
+        return frames[state["i"] % len(frames)]
+
+    return next_frame
+
+
+def run(reader, seconds, target_width=640):
+    """Read for `seconds`, resize to target_width like VideoThread does. Returns (fps, ms per frame, shape)."""
+    frames, busy, shape = 0, 0.0, None
+    t_end = time.time() + seconds
+    while time.time() < t_end:
+        t0 = time.perf_counter()
+        ret, frame = reader.read()
+        if not ret:
+            continue
+        h, w = frame.shape[:2]
+        if w > target_width:
+            frame = cv2.resize(frame, (target_width, int(h * target_width / w)))
+        busy += time.perf_counter() - t0
+        frames += 1
+        shape = frame.shape
+    return frames / seconds, busy / max(frames, 1) * 1000, shape
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jpegs", default=None)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--fps", type=float, default=0, help="server frame rate, 0 = as fast as possible")
+    parser.add_argument("--drop-after", type=int, default=0, help="server drops every connection after N frames")
+    args = parser.parse_args()
+
+    source = jpeg_file_source(args.jpegs) if args.jpegs else synthetic_source()
+    server = MjpegServer(source, port=0, fps=args.fps, drop_after=args.drop_after).start()
+    print(f"Fake stream: {server.url}")
+
+    readers = [
+        ("cv2.VideoCapture", lambda: cv2.VideoCapture(server.url)),
+        ("MjpegClient full", lambda: MjpegClient(server.url, scale=1)),
+        ("MjpegClient auto", lambda: MjpegClient(server.url, target_width=640, reconnect_base=0.05)),
+    ]
+    print(f"{'reader':<18} {'fps':>8} {'ms/frame':>9}  shape")
+    for name, make in readers:
+        reader = make()
+        fps, ms, shape = run(reader, args.seconds)
+        reader.release()
+        extra = f"  reconnects={reader.reconnects}" if hasattr(reader, "reconnects") else ""
+        print(f"{name:<18} {fps:>8.1f} {ms:>9.2f}  {shape}{extra}")
+
+    server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# Time to first detection after launch: model cache cold vs warm, with and without the startup preload.
+# Usage: python app/tools/bench_model_startup.py --model app/models/best.pt [--switch-at 3] [--backend auto]
+# Every run is a fresh process (imports included) with a real VideoThread on the fake ESP32-CAM stream.
+# AUTO mode is switched on --switch-at seconds after launch. "lazy" loads the model only then (what
+# set_ai_mode used to do), "preload" starts loading + warmup at launch like RobotApp does now.
+# cold = empty model cache (first launch after a model change), warm = second launch on the same cache.
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+if not os.environ.get("DISPLAY") and sys.platform.startswith("linux"):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+
+def child(args):
+    from PyQt6.QtGui import QGuiApplication
+
+    from fake_mjpeg_server import MjpegServer
+    from bench_mjpeg_client import synthetic_source
+    from robot_controller import RobotState
+    from video import VideoThread
+
+    imported = time.time() - args.t0
+    app = QGuiApplication(sys.argv[:1])
+    server = MjpegServer(synthetic_source(640, 480), port=0, fps=args.fps).start()
+    vt = VideoThread(server.url, args.model, args.backend)
+    vt.process_every_n_frames = 1
+    vt.start()
+    if args.preload:
+        vt.preload_model()
+
+    def pump(until, done=lambda: False):
+        while time.time() < until and not done():
+            app.processEvents()
+            for slot in range(3):
+                vt.release_frame(slot)
+            time.sleep(0.01)
+
+    pump(args.t0 + args.switch_at)
+    switched = time.time() - args.t0
+    vt.scheduler.set_state(RobotState.IDLE)
+    vt.set_ai_mode(True)
+    pump(time.time() + args.timeout, lambda: 'first_result_ms' in vt.load_stats)
+    stats = dict(vt.load_stats)
+    vt.stop()
+    server.stop()
+    stats.update(import_s=round(imported, 2), switched_s=round(switched, 2))
+    if 'first_result_ms' in stats:
+        stats['first_detection_s'] = round(switched + stats['first_result_ms'] / 1000, 2)
+    print("RESULT " + json.dumps(stats))
+
+
+def launch(args, cache_dir, preload):
+    cmd = [sys.executable, os.path.abspath(__file__), "--child", "--model", args.model, "--backend", args.backend,
+           "--switch-at", str(args.switch_at), "--fps", str(args.fps), "--timeout", str(args.timeout)]
+    if preload:
+        cmd.append("--preload")
+    env = dict(os.environ, TRASH_DETECTOR_CACHE=cache_dir)
+    cmd += ["--t0", repr(time.time())]
+    out = subprocess.run(cmd, env=env, capture_output=True, text=True).stdout
+    for line in out.splitlines():
+        if line.startswith("RESULT "):
+            return json.loads(line[7:])
+    raise RuntimeError(f"child run failed:\n{out[-2000:]}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default="app/models/best.pt")
+    parser.add_argument("--backend", default="auto")
+    parser.add_argument("--switch-at", type=float, default=3.0, help="seconds after launch AUTO is switched on")
+    parser.add_argument("--fps", type=float, default=20.0, help="camera frame rate")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--preload", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--t0", type=float, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args)
+        return
+
+    print(f"Model: {args.model} ({args.backend}), AUTO at {args.switch_at:.1f}s after launch, camera {args.fps:.0f} fps")
+    print(f"{'start':<8} {'cache':<5} | {'import s':>8} {'load ms':>8} {'warmup ms':>9} {'ready s':>7} | "
+          f"{'AUTO -> 1st result ms':>21} {'launch -> 1st result s':>22}")
+    for preload in (False, True):
+        cache_dir = tempfile.mkdtemp(prefix="model-cache-")
+        try:
+            for cache in ("cold", "warm"):
+                r = launch(args, cache_dir, preload)
+                first = r.get('first_result_ms')
+                print(f"{'preload' if preload else 'lazy':<8} {cache:<5} | {r['import_s']:>8} {r.get('load_ms', '--'):>8} "
+                      f"{sum(r.get('warmup_ms', [])):>9.0f} {r.get('ready_s', '--'):>7} | "
+                      f"{'--' if first is None else first:>21} {r.get('first_detection_s', '--'):>22}"
+                      f"{'  (model from cache)' if r.get('cached') else ''}")
+        finally:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
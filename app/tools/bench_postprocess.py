@@ -0,0 +1,100 @@
+# Microbenchmark: per-box Python loop (old VideoThread/TrashDetector code) vs one structured array.
+# Usage: python app/tools/bench_postprocess.py [--repeat 2000]
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from inference import detections as det
+
+BOX_COUNTS = [5, 20, 50, 100, 300]
+NAMES = {0: "trash"}
+
+
+def make_boxes(n, seed=0):
+    rng = np.random.default_rng(seed)
+    xy = rng.uniform(0, 560, (n, 2)).astype(np.float32)
+    wh = rng.uniform(10, 80, (n, 2)).astype(np.float32)
+    conf = rng.uniform(0.25, 1.0, (n, 1)).astype(np.float32)
+    cls = rng.integers(0, len(NAMES), (n, 1)).astype(np.float32)
+    return np.hstack([xy, xy + wh, conf, cls])
+
+
+def make_legacy_boxes(data):
+    """The object the old code iterated over: ultralytics Boxes when available, torch tensors otherwise."""
+    try:
+        import torch
+        tensor = torch.from_numpy(data)
+    except ImportError:
+        return None
+    try:
+        from ultralytics.engine.results import Boxes
+        return Boxes(tensor, (480, 640))
+    except ImportError:
+        pass
+
+    class _Box:
+        def __init__(self, row):
+            self.xyxy = row[None, :4]
+            self.conf = row[None, 4]
+            self.cls = row[None, 5]
+
+    return [_Box(tensor[i]) for i in range(len(tensor))]
+
+
+def legacy_postprocess(boxes):
+    detections = []
+    for box in boxes:
+        x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
+        conf = float(box.conf[0])
+        cls = int(box.cls[0])
+        label = NAMES[cls]
+        center_x = int((x1 + x2) / 2)
+        detections.append({
+            'label': label,
+            'conf': conf,
+            'center_x': center_x,
+            'bbox': [int(x1), int(y1), int(x2), int(y2)]
+        })
+    best = max(detections, key=lambda x: x['conf']) if detections else None
+    return detections, best
+
+
+def vector_postprocess(data):
+    detections = det.from_boxes(data)
+    return detections, det.best(detections)
+
+
+def timeit(fn, arg, repeat):
+    fn(arg)
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn(arg)
+    return (time.perf_counter() - t0) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'boxes':>6} {'legacy (us)':>12} {'structured (us)':>16} {'speedup':>8}")
+    for n in BOX_COUNTS:
+        data = make_boxes(n)
+        legacy = make_legacy_boxes(data)
+        # Legacy loop on real tensors is slow, scale repeats down with box count
+        repeat = max(20, args.repeat // max(1, n // 5))
+        t_vec = timeit(vector_postprocess, data, repeat)
+        if legacy is None:
+            print(f"{n:>6} {'(no torch)':>12} {t_vec:>16.1f} {'-':>8}")
+            continue
+        t_old = timeit(legacy_postprocess, legacy, repeat)
+        print(f"{n:>6} {t_old:>12.1f} {t_vec:>16.1f} {t_old / t_vec:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# GUI-thread time per frame: old QLabel path vs VideoWidget with off-thread scaling.
+# Usage: python app/tools/bench_render.py [--frames 300] [--size 960x720]
+# Runs headless with QT_QPA_PLATFORM=offscreen if no display is available.
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+if not os.environ.get("DISPLAY") and sys.platform.startswith("linux"):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication, QLabel
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QImage, QPixmap
+
+from pipeline import FrameRing
+from ui.widgets import VideoWidget
+
+
+def make_frames(n, w=640, h=480):
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 255, (h, w, 3), dtype=np.uint8) for _ in range(n)]
+
+
+def bench_old(app, frames, size):
+    """VideoThread: cvtColor + QImage; GUI: scaled(Smooth) + QPixmap.fromImage + setPixmap + paint."""
+    label = QLabel()
+    label.resize(*size)
+    label.show()
+    gui = 0.0
+    for frame in frames:
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        img = QImage(rgb.data, rgb.shape[1], rgb.shape[0], rgb.strides[0], QImage.Format.Format_RGB888)
+        t0 = time.perf_counter()
+        scaled = img.scaled(label.size(), Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+        label.setPixmap(QPixmap.fromImage(scaled))
+        label.repaint()
+        gui += time.perf_counter() - t0
+        app.processEvents()
+    label.close()
+    return gui / len(frames) * 1000
+
+
+def bench_new(app, frames, size):
+    """VideoThread: resize into a FrameRing slot, BGR888 QImage; GUI: VideoWidget.set_frame + paint."""
+    ring = FrameRing(3)
+    view = VideoWidget(ring.release)
+    view.resize(*size)
+    view.show()
+    dw, dh = size[0] - 4, size[1] - 4
+    gui = 0.0
+    for frame in frames:
+        h, w = frame.shape[:2]
+        scale = min(dw / w, dh / h)
+        tw, th = int(w * scale), int(h * scale)
+        idx, buf = ring.acquire((th, tw, 3))
+        cv2.resize(frame, (tw, th), dst=buf, interpolation=cv2.INTER_LINEAR)
+        img = QImage(buf.data, tw, th, buf.strides[0], QImage.Format.Format_BGR888)
+        t0 = time.perf_counter()
+        view.set_frame(img, idx)
+        view.repaint()
+        gui += time.perf_counter() - t0
+        app.processEvents()
+    view.close()
+    return gui / len(frames) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--size", default="960x720")
+    args = parser.parse_args()
+    size = tuple(int(v) for v in args.size.split("x"))
+
+    app = QApplication(sys.argv)
+    frames = make_frames(args.frames)
+    old = bench_old(app, frames, size)
+    new = bench_new(app, frames, size)
+    print(f"Widget size {size[0]}x{size[1]}, 640x480 frames, {args.frames} frames")
+    print(f"Old QLabel path : {old:6.2f} ms GUI-thread per frame")
+    print(f"VideoWidget path: {new:6.2f} ms GUI-thread per frame ({old / new:.1f}x less)")
+
+
+if __name__ == "__main__":
+    main()
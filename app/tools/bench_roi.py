@@ -0,0 +1,167 @@
+# Latency of ROI crop inference vs full-frame inference on chase clips.
+# Usage: python app/tools/bench_roi.py [--model app/models/best.onnx] [--video clip.mp4 ...] [--roi-imgsz 320]
+# Each frame is run twice: full frame at --imgsz, and the way VideoThread does it in CHASING
+# (crop around the locked track at --roi-imgsz, full frame when the crop finds nothing).
+# Without --video a synthetic approach clip is generated; without --model a stand-in detector
+# finds the red target by colour and burns CPU in proportion to imgsz^2 (--cost-ms at 640).
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from inference import detections as det
+import roi
+from inference import load_backend
+from tracker import Tracker, iou_matrix
+
+
+class StandInModel:
+    """Colour-blob detector with a realistic, imgsz-dependent cost."""
+
+    name = "stand-in"
+    names = {0: "trash"}
+
+    def __init__(self, cost_ms):
+        self.passes = 1
+        img = np.zeros((640, 640, 3), np.uint8)
+        t0 = time.perf_counter()
+        self._burn(img, 20)
+        self.passes = max(1, int(cost_ms / ((time.perf_counter() - t0) / 20 * 1000)))
+
+    def _burn(self, img, passes):
+        kernel = np.ones((5, 5), np.float32) / 25
+        for _ in range(passes):
+            img = cv2.filter2D(img, -1, kernel)
+
+    def predict(self, frame, conf=0.25, imgsz=640, max_det=300, iou=0.7):
+        self._burn(cv2.resize(frame, (imgsz, imgsz)), self.passes)
+        mask = cv2.inRange(frame, (0, 0, 150), (80, 80, 255))
+        n, _, stats, _ = cv2.connectedComponentsWithStats(mask)
+        rows = [[x, y, x + w, y + h, 0.9, 0] for x, y, w, h, area in stats[1:n] if area >= 30]
+        return np.array(rows[:max_det], np.float32).reshape(-1, 6)
+
+
+def synthetic_clip(frames=300, w=640, h=480, seed=0):
+    """Rover approaching a red object: the box grows, drifts with steering and leaves the view twice."""
+    rng = np.random.default_rng(seed)
+    background = cv2.GaussianBlur(rng.integers(60, 200, (h, w, 3), dtype=np.uint8), (0, 0), 3)
+    for f in range(frames):
+        t = f / frames
+        size = 20 + 140 * t
+        cx = w / 2 + 180 * np.sin(f / 25.0) * (1 - t)
+        cy = h * 0.55 + 60 * t
+        frame = np.roll(background, int(40 * np.sin(f / 25.0)), axis=1).copy()
+        if not (90 <= f < 105 or 200 <= f < 210):   # target out of view
+            x1, y1 = int(cx - size / 2), int(cy - size / 2)
+            cv2.rectangle(frame, (x1, y1), (int(x1 + size), int(y1 + size * 0.7)), (30, 30, 220), -1)
+        yield frame
+
+
+def video_clip(path):
+    if os.path.isdir(path):
+        for name in sorted(os.listdir(path)):
+            frame = cv2.imread(os.path.join(path, name))
+            if frame is not None:
+                yield frame
+        return
+    cap = cv2.VideoCapture(path)
+    while True:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        yield frame
+    cap.release()
+
+
+def fit(frame):
+    # Same as the capture stage: at most 640 wide
+    h, w = frame.shape[:2]
+    return cv2.resize(frame, (640, int(h * 640 / w))) if w > 640 else frame
+
+
+def run(model, frames, conf, imgsz, roi_imgsz, fps):
+    tracker = Tracker(max_age=0.5)
+    full_ms, mode_ms, crop_ms = [], [], []
+    crops = hits = agree = compared = 0
+    for i, frame in enumerate(frames):
+        frame = fit(frame)
+        stamp = i / fps
+
+        t0 = time.perf_counter()
+        full = model.predict(frame, conf=conf, imgsz=imgsz, max_det=5)
+        full_ms.append((time.perf_counter() - t0) * 1000)
+
+        locked = tracker.locked(stamp)
+        t0 = time.perf_counter()
+        boxes = None
+        if locked is not None:
+            box = (locked['x1'], locked['y1'], locked['x2'], locked['y2'])
+            tc = time.perf_counter()
+            boxes, win = roi.predict(model, frame, box, conf, roi_imgsz, max_det=5)
+            if win is not None:
+                crops += 1
+                crop_ms.append((time.perf_counter() - tc) * 1000)
+                hits += bool(len(boxes))
+        if boxes is None or not len(boxes):
+            boxes = model.predict(frame, conf=conf, imgsz=imgsz, max_det=5)
+        mode_ms.append((time.perf_counter() - t0) * 1000)
+
+        dets = det.from_boxes(boxes)
+        tracker.update(dets, stamp)
+        # Does the ROI path still see what the full frame sees?
+        if len(full):
+            compared += 1
+            best = det.best(det.from_boxes(full))
+            ref = np.array([[best['x1'], best['y1'], best['x2'], best['y2']]])
+            agree += bool(len(dets)) and iou_matrix(ref, det.xyxy(dets)).max() >= 0.5
+
+    return {
+        'frames': len(full_ms),
+        'full': np.array(full_ms),
+        'mode': np.array(mode_ms),
+        'crop': np.array(crop_ms),
+        'crops': crops,
+        'hits': hits,
+        'agree_pct': 100.0 * agree / compared if compared else float('nan'),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default=None)
+    parser.add_argument("--video", nargs="*", default=[], help="recorded chase clips (files or frame folders)")
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--roi-imgsz", type=int, default=320)
+    parser.add_argument("--conf", type=float, default=0.25)
+    parser.add_argument("--fps", type=float, default=15.0, help="inference rate the clip is replayed at")
+    parser.add_argument("--cost-ms", type=float, default=60.0, help="stand-in model cost at imgsz 640")
+    args = parser.parse_args()
+
+    model = load_backend(args.model) if args.model else StandInModel(args.cost_ms)
+    clips = [(os.path.basename(p), video_clip(p)) for p in args.video] or [("synthetic", synthetic_clip())]
+
+    print(f"Model: {args.model or f'stand-in, {args.cost_ms:.0f}ms at 640'}, "
+          f"full imgsz {args.imgsz}, ROI imgsz {args.roi_imgsz}")
+    print(f"{'clip':<20} {'frames':>6} | {'full p50/p95 ms':>15} | {'ROI mode p50/p95 ms':>19} {'saved':>6} | "
+          f"{'crop ms':>7} {'crops':>5} {'hit%':>5} | {'agree%':>6}")
+    for name, frames in clips:
+        r = run(model, frames, args.conf, args.imgsz, args.roi_imgsz, args.fps)
+        if not r['frames']:
+            print(f"{name:<20} no frames")
+            continue
+        f50, f95 = np.percentile(r['full'], (50, 95))
+        m50, m95 = np.percentile(r['mode'], (50, 95))
+        saved = 100.0 * (1 - r['mode'].sum() / r['full'].sum())
+        crop = f"{np.median(r['crop']):.1f}" if len(r['crop']) else "--"
+        hit = 100.0 * r['hits'] / r['crops'] if r['crops'] else 0.0
+        print(f"{name[:20]:<20} {r['frames']:>6} | {f50:>7.1f}/{f95:<7.1f} | {m50:>9.1f}/{m95:<9.1f} {saved:>5.0f}% | "
+              f"{crop:>7} {r['crops']:>5} {hit:>5.0f} | {r['agree_pct']:>6.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+# End-to-end run of the real RobotApp against RoverSim, no hardware: time to reach every trash item
+# and the loop latency from a camera frame showing an item to the first MOVE reacting to it.
+# Usage: QT_QPA_PLATFORM=offscreen python app/tools/bench_rover_sim.py [--model app/models/best.onnx]
+#        [--items 3] [--seed 0] [--no-search] [--timeout 120] [--json out.json]
+# The app runs unmodified (UDP to the simulator on 127.0.0.1:8888, camera from its MJPEG stream), only the
+# completion dialog answers itself: "Continue Scanning" while items are left, otherwise "Return to Manual".
+# Without --model the stand-in colour detector of bench_roi.py is used (--cost-ms per 640 inference).
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from PyQt6.QtCore import QTimer
+from PyQt6.QtWidgets import QApplication
+
+import main as app_main
+import network
+from bench_roi import StandInModel
+from kinematics import MAX_WHEEL_SPEED
+from replay import pct
+from rover_sim import RoverSim
+
+
+def run(app, args):
+    sim = RoverSim(port=network.ROBOT_PORT, cam_port=args.cam_port, fps=args.fps,
+                   jpeg_quality=args.jpeg_quality, items=args.items, seed=args.seed,
+                   max_bearing=np.pi if args.search else np.radians(25),  # standing mode: items start in view
+                   wheel_speed=args.wheel_speed,
+                   delay=args.delay_ms / 1000, jitter=args.jitter_ms / 1000).start()
+
+    class AutoDialog:
+        """Stands in for DetectionCompleteDialog, which would block on a click."""
+
+        def __init__(self, trash_name, parent=None, scan_mode_on=False):
+            self.result = "continue" if scan_mode_on and sim.remaining() else "manual"
+
+        def exec(self):
+            return 1
+
+    app_main.DetectionCompleteDialog = AutoDialog
+    w = app_main.RobotApp()
+    w.update_robot_ip("127.0.0.1")
+    w.video_thread.update_source(sim.camera.url)
+    if args.model:
+        from inference import load_backend
+        w.video_thread.model = load_backend(args.model, args.backend)
+    else:
+        w.video_thread.model = StandInModel(args.cost_ms)
+    w.show()
+
+    state = {"t_auto": None, "end": None}
+
+    def start_auto():
+        w.panel_set.chk_spin.setChecked(args.search)
+        w.btn_mode.setChecked(True)
+        w.set_mode(True)
+        sim.reset_metrics()
+        state["t_auto"] = time.time()
+
+    def poll():
+        if state["t_auto"] is None:
+            return
+        done = not sim.remaining() or not w.is_auto
+        if done or time.time() - state["t_auto"] > args.timeout:
+            state["end"] = "done" if done else "timeout"
+            poller.stop()
+            w.close()
+            app.quit()
+
+    # Let the stream connect and the link negotiate before switching to auto
+    QTimer.singleShot(int(args.warmup * 1000), start_auto)
+    poller = QTimer()
+    poller.timeout.connect(poll)
+    poller.start(100)
+    app.exec()
+    sim.stop()
+    return sim, w, state
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", help="model file for the app; default: stand-in colour detector")
+    parser.add_argument("--backend", default="auto")
+    parser.add_argument("--cost-ms", type=float, default=30.0, help="stand-in inference cost at imgsz 640")
+    parser.add_argument("--items", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-search", dest="search", action="store_false", help="standing detection mode")
+    parser.add_argument("--timeout", type=float, default=120.0, help="seconds in auto mode")
+    parser.add_argument("--warmup", type=float, default=2.0, help="seconds before switching to auto")
+    parser.add_argument("--cam-port", type=int, default=0, help="0: any free port")
+    parser.add_argument("--wheel-speed", type=float, default=MAX_WHEEL_SPEED, help="m/s at PWM 255")
+    parser.add_argument("--fps", type=float, default=15.0, help="camera frame rate")
+    parser.add_argument("--jpeg-quality", type=int, default=70)
+    parser.add_argument("--delay-ms", type=float, default=0.0, help="robot -> app link delay")
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--verbose", action="store_true", help="keep the app's console output")
+    parser.add_argument("--json", help="write the results here")
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv[:1])
+    out = io.StringIO()
+    with contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(out):
+        sim, w, state = run(app, args)
+
+    reached = [r for r in sim.reaches if r[1] is not None]
+    false_stops = len(sim.reaches) - len(reached)
+    reach_s = [r[2] for r in reached]
+    latency_ms = [v * 1000 for v in sim.latencies]
+    stats = w.video_thread.get_stats()
+    result = {
+        "model": args.model or f"stand-in ({args.cost_ms:.0f} ms)",
+        "search": args.search,
+        "items": args.items,
+        "reached": len(reached),
+        "false_stops": false_stops,
+        "bumps": sim.bumps,
+        "end": state["end"],
+        "time_to_reach_s": [round(v, 2) for v in reach_s],
+        "loop_latency_ms": pct(latency_ms),
+        "frames_served": sim.frames_rendered,
+        "commands": len(sim.command_log()),
+        "pipeline": stats,
+    }
+
+    print(f"{result['model']}, {'search' if args.search else 'standing'} mode, "
+          f"{len(reached)}/{args.items} items reached ({state['end']}), {false_stops} false stops, {sim.bumps} bumps")
+    if reach_s:
+        print(f"time to reach: {', '.join(f'{v:.1f}s' for v in reach_s)} (mean {np.mean(reach_s):.1f}s)")
+    if latency_ms:
+        lat = result["loop_latency_ms"]
+        print(f"frame -> reaction latency: p50 {lat['p50']}ms  p95 {lat['p95']}ms  max {max(latency_ms):.0f}ms "
+              f"(n={lat['n']})")
+    print(f"camera frames served {sim.frames_rendered}, commands received {result['commands']}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2, default=str)
+    return 0 if reached else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
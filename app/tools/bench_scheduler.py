@@ -0,0 +1,116 @@
+# CPU usage and decision latency per robot state: fixed every-frame inference vs InferenceScheduler.
+# Usage: python app/tools/bench_scheduler.py [--model app/models/best.onnx] [--cost-ms 60] [--scale 1.0]
+# Runs a real VideoThread on the fake ESP32-CAM stream and walks through a scripted state timeline.
+# Without --model a stand-in burns CPU in proportion to imgsz^2 (--cost-ms at 640).
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+if not os.environ.get("DISPLAY") and sys.platform.startswith("linux"):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtGui import QGuiApplication
+
+from inference import load_backend
+from robot_controller import RobotState
+from video import VideoThread
+from fake_mjpeg_server import MjpegServer
+from bench_mjpeg_client import synthetic_source
+
+TIMELINE = [
+    # (state, seconds); None = manual mode
+    (None, 3),
+    (RobotState.SEARCH_WAIT, 4),
+    (RobotState.VERIFYING, 2),
+    (RobotState.ALIGNING, 3),
+    (RobotState.CHASING, 4),
+]
+
+
+class BurnModel:
+    """CPU stand-in for a detector: filter passes over an imgsz x imgsz image."""
+
+    name = "burn"
+    names = {0: "trash"}
+
+    def __init__(self, cost_ms):
+        self.passes = 1
+        img = np.zeros((640, 640, 3), np.uint8)
+        t0 = time.perf_counter()
+        self._burn(img, 20)
+        per_pass = (time.perf_counter() - t0) / 20 * 1000
+        self.passes = max(1, int(cost_ms / per_pass))
+
+    def _burn(self, img, passes):
+        kernel = np.ones((5, 5), np.float32) / 25
+        for _ in range(passes):
+            img = cv2.filter2D(img, -1, kernel)
+        return img
+
+    def predict(self, frame, conf=0.25, imgsz=640, max_det=300, iou=0.7):
+        self._burn(cv2.resize(frame, (imgsz, imgsz)), self.passes)
+        h, w = frame.shape[:2]
+        return np.array([[w * 0.4, h * 0.4, w * 0.6, h * 0.6, 0.8, 0]], np.float32)
+
+
+def run(app, url, model, adaptive, scale):
+    vt = VideoThread(url, "unused")
+    vt.model = model
+    vt.scheduler.adaptive = adaptive
+    vt.process_every_n_frames = 1
+    vt.start()
+    time.sleep(1.0)
+    vt.scheduler.reset_stats()
+    for state, seconds in TIMELINE:
+        auto = state is not None
+        vt.set_ai_mode(auto)
+        vt.scheduler.set_state(state or RobotState.IDLE, auto=auto)
+        t_end = time.time() + seconds * scale
+        while time.time() < t_end:
+            app.processEvents()
+            # Release display buffers like the video widget would
+            for slot in range(3):
+                vt.release_frame(slot)
+            time.sleep(0.02)
+    snap = vt.scheduler.snapshot()
+    vt.stop()
+    return snap
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default=None)
+    parser.add_argument("--cost-ms", type=float, default=60.0, help="stand-in model cost at imgsz 640")
+    parser.add_argument("--scale", type=float, default=1.0, help="stretch the timeline")
+    parser.add_argument("--fps", type=float, default=20.0, help="camera frame rate")
+    args = parser.parse_args()
+
+    app = QGuiApplication(sys.argv)
+    model = load_backend(args.model) if args.model else BurnModel(args.cost_ms)
+    server = MjpegServer(synthetic_source(640, 480), port=0, fps=args.fps).start()
+
+    results = {}
+    for adaptive in (False, True):
+        results[adaptive] = run(app, server.url, model, adaptive, args.scale)
+    server.stop()
+
+    print(f"Model: {args.model or f'stand-in, {args.cost_ms:.0f}ms at 640'}, camera {args.fps:.0f} fps")
+    print(f"{'state':<12} | {'fixed: CPU%':>11} {'Hz':>5} {'p50 ms':>7} | {'adaptive: CPU%':>14} {'Hz':>5} {'p50 ms':>7} {'p95 ms':>7}")
+    names = ["MANUAL"] + [s.value for s, _ in TIMELINE if s is not None]
+    for name in names:
+        f = results[False]['per_state'].get(name, {})
+        a = results[True]['per_state'].get(name, {})
+        fmt = lambda v: "--" if v is None else f"{v}"
+        print(f"{name:<12} | {f.get('cpu_pct', 0):>11} {f.get('rate_hz', 0):>5} {fmt(f.get('decision_p50_ms')):>7} | "
+              f"{a.get('cpu_pct', 0):>14} {a.get('rate_hz', 0):>5} {fmt(a.get('decision_p50_ms')):>7} "
+              f"{fmt(a.get('decision_p95_ms')):>7}")
+    print(f"Adaptive final backoff x{results[True]['backoff']}, inference EWMA {results[True]['latency_ms']}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# Cold start to first paint of the app: python app/src/main.py --profile-startup, one fresh process per run.
+# Usage: python app/tools/bench_startup.py [--runs 5] [--budget-ms 1500] [--json out.json]
+# The first run is "cold" (app/src bytecode caches removed, so every module is compiled again), the others
+# are warm. Launch -> first paint is measured from the spawn, so interpreter startup is included; the
+# child's own profile splits the rest into imports and init phases. The window never needs a display
+# (QT_QPA_PLATFORM=offscreen when there is none) and each child is killed once it has painted.
+# Exit code 1 when the warm median misses --budget-ms: that is when the manual controls show up.
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+
+def clear_bytecode():
+    for root, dirs, _ in os.walk(SRC):
+        if "__pycache__" in dirs:
+            shutil.rmtree(os.path.join(root, "__pycache__"), ignore_errors=True)
+            dirs.remove("__pycache__")
+
+
+def launch(out_path, timeout):
+    env = dict(os.environ)
+    if not env.get("DISPLAY") and sys.platform.startswith("linux"):
+        env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    t0 = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "main.py", "--profile-startup", out_path], cwd=SRC, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        # The profile is written at the first paint, once it is complete the run is over
+        while time.perf_counter() - t0 < timeout:
+            if os.path.exists(out_path):
+                try:
+                    with open(out_path) as f:
+                        profile = json.load(f)
+                    break
+                except ValueError:
+                    pass
+            if proc.poll() is not None:
+                raise RuntimeError(f"main.py exited with {proc.returncode} before the first paint")
+            time.sleep(0.005)
+        else:
+            raise RuntimeError(f"no first paint within {timeout:.0f}s")
+        wall = time.perf_counter() - t0
+    finally:
+        proc.kill()
+        proc.wait()
+    profile['launch_to_paint_s'] = round(wall, 4)
+    return profile
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5, help="warm runs after the cold one")
+    parser.add_argument("--budget-ms", type=float, default=1500.0, help="launch -> first paint budget")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--top", type=int, default=8)
+    parser.add_argument("--json", help="write all runs here")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="startup-")
+    runs = []
+    try:
+        for i in range(args.runs + 1):
+            if i == 0:
+                clear_bytecode()
+            runs.append(launch(os.path.join(tmp, f"run{i}.json"), args.timeout))
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    def phase_ms(run, name):
+        return sum(p['seconds'] for p in run['phases'] if p['name'] == name) * 1000
+
+    phases = [p['name'] for p in runs[0]['phases']]
+    print(f"{'run':<6} {'launch->paint ms':>16} {'main->paint ms':>14} {'imports ms':>10} "
+          + " ".join(f"{name[:12]:>12}" for name in phases))
+    for i, run in enumerate(runs):
+        print(f"{'cold' if i == 0 else f'warm{i}':<6} {run['launch_to_paint_s'] * 1000:>16.0f} "
+              f"{run['first_paint_s'] * 1000:>14.0f} {run['imports_s'] * 1000:>10.0f} "
+              + " ".join(f"{phase_ms(run, name):>12.1f}" for name in phases))
+
+    warm = runs[1:] or runs
+    median = statistics.median(r['launch_to_paint_s'] for r in warm) * 1000
+    print(f"\nwarm median launch -> first paint: {median:.0f} ms (budget {args.budget_ms:.0f} ms)")
+    print("Heaviest imports by main.py (warm median, cumulative):")
+    top_level = {name: statistics.median(r['top_level'].get(name, 0.0) for r in warm) for name in warm[0]['top_level']}
+    for name, secs in sorted(top_level.items(), key=lambda kv: -kv[1])[:args.top]:
+        print(f"  {name:<24} {secs * 1000:8.1f} ms")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({'budget_ms': args.budget_ms, 'warm_median_ms': round(median, 1), 'runs': runs}, f, indent=2)
+    return 0 if median <= args.budget_ms else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+# Tracker cost and quality on synthetic scenes of 1..200 moving objects.
+# Usage: python app/tools/bench_tracker.py [--frames 300] [--every 3] [--miss 0.1]
+# Inference runs every `--every` frames, the frames in between use Tracker.predict().
+# Compared with the old behaviour: hold the last detection, target = highest confidence box.
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from inference import detections as det
+from tracker import Tracker, iou_matrix
+
+W, H = 640, 480
+
+
+class Scene:
+    """Boxes moving at constant velocity plus a shared pan (robot turning), bouncing off the edges."""
+
+    def __init__(self, n, rng, fps):
+        self.rng = rng
+        self.dt = 1.0 / fps
+        self.size = rng.uniform(20, 80, (n, 2))
+        self.pos = rng.uniform(self.size, np.array([W, H]) - self.size, (n, 2))
+        self.vel = rng.uniform(-120, 120, (n, 2))
+        self.pan = 0.0
+
+    def step(self, t):
+        self.pan = 150 * np.sin(t * 1.5)  # px/s, camera swinging left / right
+        self.pos += (self.vel + [self.pan, 0]) * self.dt
+        for axis, limit in ((0, W), (1, H)):
+            low = self.pos[:, axis] < self.size[:, axis]
+            high = self.pos[:, axis] > limit - self.size[:, axis]
+            self.vel[low | high, axis] *= -1
+            self.pos[:, axis] = np.clip(self.pos[:, axis], self.size[:, axis], limit - self.size[:, axis])
+
+    def boxes(self):
+        half = self.size / 2
+        return np.hstack([self.pos - half, self.pos + half])
+
+    def detect(self, noise, miss):
+        boxes = self.boxes() + self.rng.normal(0, noise, (len(self.pos), 4))
+        keep = self.rng.random(len(boxes)) >= miss
+        conf = self.rng.uniform(0.3, 0.9, len(boxes))
+        rows = np.hstack([boxes, conf[:, None], np.zeros((len(boxes), 1))])[keep]
+        return det.from_boxes(rows), np.nonzero(keep)[0]
+
+
+def gt_assign(gt, boxes):
+    """GT index -> row in boxes, IoU >= 0.3, greedy."""
+    iou = iou_matrix(gt, boxes)
+    out = {}
+    used = set()
+    for g, b in zip(*np.unravel_index(np.argsort(-iou, axis=None), iou.shape)):
+        if iou[g, b] < 0.3:
+            break
+        if g in out or b in used:
+            continue
+        out[g] = b
+        used.add(b)
+    return out
+
+
+def run(n, frames, every, noise, miss, seed=0, fps=20.0):
+    rng = np.random.default_rng(seed)
+    scene = Scene(n, rng, fps)
+    tracker = Tracker(max_age=1.0, min_hits=2)
+    t_update, t_predict = [], []
+    err_track, err_hold = [], []
+    id_of_gt = {}
+    switches = 0
+    last_det = {}            # GT index -> last detected center (baseline: hold)
+    lock_changes = 0
+    argmax_changes = 0
+    prev_lock = prev_argmax = None
+
+    for f in range(frames):
+        t = f / fps
+        scene.step(t)
+        gt = scene.boxes()
+        if f % every == 0:
+            dets, visible = scene.detect(noise, miss)
+            t0 = time.perf_counter()
+            tracks = tracker.update(dets, t)
+            t_update.append(time.perf_counter() - t0)
+            for gi, di in zip(visible, range(len(dets))):
+                last_det[gi] = np.array([dets['center_x'][di], (dets['y1'][di] + dets['y2'][di]) / 2])
+            if len(dets):
+                top = int(visible[int(dets['conf'].argmax())])
+                argmax_changes += prev_argmax is not None and top != prev_argmax
+                prev_argmax = top
+            lock_changes += prev_lock is not None and tracker.locked_id != prev_lock
+            prev_lock = tracker.locked_id
+        else:
+            t0 = time.perf_counter()
+            tracks = tracker.predict(t)
+            t_predict.append(time.perf_counter() - t0)
+
+        match = gt_assign(gt, det.xyxy(tracks)) if len(tracks) else {}
+        for g, row in match.items():
+            tid = int(tracks['track_id'][row])
+            if g in id_of_gt and id_of_gt[g] != tid:
+                switches += 1
+            id_of_gt[g] = tid
+            if f % every:
+                center = np.array([tracks['center_x'][row], (tracks['y1'][row] + tracks['y2'][row]) / 2])
+                err_track.append(np.linalg.norm(center - scene.pos[g]))
+                if g in last_det:
+                    err_hold.append(np.linalg.norm(last_det[g] - scene.pos[g]))
+
+    return {
+        'update_ms': np.mean(t_update) * 1000,
+        'predict_ms': np.mean(t_predict) * 1000 if t_predict else 0.0,
+        'switches': switches,
+        'err_track': np.mean(err_track) if err_track else float('nan'),
+        'err_hold': np.mean(err_hold) if err_hold else float('nan'),
+        'lock_changes': lock_changes,
+        'argmax_changes': argmax_changes,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--every", type=int, default=3, help="inference every N frames (process_every_n_frames)")
+    parser.add_argument("--noise", type=float, default=3.0, help="detector box noise, px")
+    parser.add_argument("--miss", type=float, default=0.1, help="probability a box is missed")
+    args = parser.parse_args()
+
+    print(f"{args.frames} frames @20fps, inference every {args.every}, noise {args.noise}px, miss {args.miss:.0%}")
+    print(f"{'objects':>7} {'update ms':>9} {'predict ms':>10} {'ID sw':>6} "
+          f"{'err track':>9} {'err hold':>8} {'target changes (lock / max-conf)':>33}")
+    for n in (1, 5, 20, 50, 100, 200):
+        r = run(n, args.frames, args.every, args.noise, args.miss)
+        print(f"{n:>7} {r['update_ms']:>9.3f} {r['predict_ms']:>10.3f} {r['switches']:>6} "
+              f"{r['err_track']:>8.1f}px {r['err_hold']:>7.1f}px {r['lock_changes']:>18} / {r['argmax_changes']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+# NetworkThread command throughput and queue latency under burst, against local UDP sinks.
+# Usage: python app/tools/bench_transport.py [--commands 20000] [--robots 4] [--burst 500]
+# 1) throughput: non-coalesced commands from one thread, legacy direct sendto vs the asyncio queue
+# 2) burst: one GUI-like thread per robot fires MOVE bursts, with and without MOVE coalescing
+import argparse
+import json
+import os
+import socket
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from PyQt6.QtCore import QCoreApplication
+
+from network import NetworkThread
+
+
+class Sink:
+    """Counts datagrams, keeps the last MOVE and the send->receive latency of stamped commands."""
+
+    def __init__(self):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 << 20)
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.settimeout(0.2)
+        self.port = self.sock.getsockname()[1]
+        self.received = 0
+        self.last_move = None
+        self.latency = []
+        self._running = True
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def _loop(self):
+        while self._running:
+            try:
+                data, _ = self.sock.recvfrom(2048)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            now = time.perf_counter()
+            try:
+                cmd = json.loads(data)
+            except ValueError:
+                continue  # HELLO probes, the sink never answers so the link stays JSON
+            self.received += 1
+            if "t" in cmd:
+                self.latency.append((now - cmd["t"]) * 1000)
+            if cmd.get("cmd") == "MOVE":
+                self.last_move = cmd
+
+    def wait_idle(self, quiet=0.3):
+        last = -1
+        while last != self.received:
+            last = self.received
+            time.sleep(quiet)
+
+    def close(self):
+        self._running = False
+        self._thread.join()
+        self.sock.close()
+
+
+def start_net(app, sink):
+    net = NetworkThread("127.0.0.1", port=0, robot_port=sink.port)
+    net.start()
+    net.transport.wait_ready(2.0)
+    app.processEvents()
+    return net
+
+
+def bench_legacy(sink, n):
+    """The old send_command: json.dumps + sendto on the caller's thread, shared socket."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    addr = ("127.0.0.1", sink.port)
+    before = sink.received
+    t0 = time.perf_counter()
+    for i in range(n):
+        sock.sendto(json.dumps({"cmd": "STOP", "L": 0, "R": 0, "t": time.perf_counter()}).encode(), addr)
+    call = time.perf_counter() - t0
+    sink.wait_idle()
+    sock.close()
+    return n / call, sink.received - before
+
+
+def bench_queue(app, sink, n):
+    net = start_net(app, sink)
+    before = sink.received
+    t0 = time.perf_counter()
+    for i in range(n):
+        net.send_command({"cmd": "STOP", "L": 0, "R": 0, "t": time.perf_counter()})
+    call = time.perf_counter() - t0
+    sink.wait_idle()
+    stats = net.get_stats()
+    net.stop()
+    return n / call, sink.received - before, stats
+
+
+def bench_burst(app, sinks, burst, bursts, coalesce):
+    net = NetworkThread("127.0.0.1", port=0, robot_port=sinks[0].port)
+    for s in sinks[1:]:
+        net.add_robot("127.0.0.1", s.port)
+    net.start()
+    net.transport.wait_ready(2.0)
+    for s in sinks:
+        s.latency.clear()
+    before = [s.received for s in sinks]
+    last_sent = {}
+
+    def producer(sink):
+        for b in range(bursts):
+            for i in range(burst):
+                cmd = {"cmd": "MOVE", "L": b, "R": i, "t": time.perf_counter()}
+                if coalesce:
+                    net.send_command(cmd, "127.0.0.1", sink.port)
+                else:
+                    link = net.add_robot("127.0.0.1", sink.port)
+                    net.transport.send(link.encode(cmd), link.addr)
+                last_sent[sink.port] = cmd
+            time.sleep(0.02)  # GUI timers fire in bursts, then idle
+
+    threads = [threading.Thread(target=producer, args=(s,)) for s in sinks]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+    for s in sinks:
+        s.wait_idle()
+    stats = net.get_stats()
+    net.stop()
+
+    delivered = sum(s.received - b for s, b in zip(sinks, before))
+    latest_ok = all(s.last_move == last_sent[s.port] for s in sinks)
+    lat = np.array([x for s in sinks for x in s.latency])
+    return elapsed, delivered, latest_ok, stats, lat
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--commands", type=int, default=20000)
+    parser.add_argument("--robots", type=int, default=4)
+    parser.add_argument("--burst", type=int, default=500)
+    parser.add_argument("--bursts", type=int, default=10)
+    args = parser.parse_args()
+
+    app = QCoreApplication(sys.argv)
+
+    sink = Sink()
+    rate, got = bench_legacy(sink, args.commands)
+    print(f"Throughput, {args.commands} commands from one thread")
+    print(f"  legacy sendto : {rate:9.0f} cmd/s accepted, {args.commands} sent, {got} delivered")
+    rate, got, stats = bench_queue(app, sink, args.commands)
+    print(f"  asyncio queue : {rate:9.0f} cmd/s accepted, {stats['sent']} sent, {got} delivered, "
+          f"queue p50 {stats['queue_p50_ms']}ms p99 {stats['queue_p99_ms']}ms, max depth {stats['max_depth']}")
+    print("  (sent but not delivered = loopback receive buffer overflow in the sink)")
+    sink.close()
+
+    sinks = [Sink() for _ in range(args.robots)]
+    total = args.robots * args.burst * args.bursts
+    print(f"\nBurst: {args.robots} robots on one socket, {args.bursts} x {args.burst} MOVE per robot ({total} total)")
+    for coalesce in (False, True):
+        elapsed, delivered, latest_ok, stats, lat = bench_burst(app, sinks, args.burst, args.bursts, coalesce)
+        p50, p99 = np.percentile(lat, (50, 99)) if len(lat) else (0, 0)
+        print(f"  coalesce={'on ' if coalesce else 'off'}: {delivered:6d} on the wire, "
+              f"coalesced {stats['coalesced']:6d}, queue p99 {stats['queue_p99_ms']:7.3f}ms, "
+              f"end-to-end p50 {p50:6.2f}ms p99 {p99:6.2f}ms, latest MOVE delivered: {latest_ok}")
+    for s in sinks:
+        s.close()
+
+
+if __name__ == "__main__":
+    main()
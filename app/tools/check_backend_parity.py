@@ -0,0 +1,102 @@
+# Parity check: ONNX Runtime backend vs torch (ultralytics) backend on a fixed image set.
+# Usage: python app/tools/check_backend_parity.py --model app/models/best.pt --images path/to/images
+# Exits with status 1 when boxes or scores drift past the tolerances.
+import argparse
+import glob
+import os
+import sys
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from inference import TorchBackend, OnnxBackend, export_onnx
+
+IMAGE_EXT = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+def box_iou(a, b):
+    """Pairwise IoU between (N, 4) and (M, 4) xyxy arrays."""
+    tl = np.maximum(a[:, None, :2], b[None, :, :2])
+    br = np.minimum(a[:, None, 2:], b[None, :, 2:])
+    inter = (br - tl).clip(0).prod(2)
+    area_a = (a[:, 2:] - a[:, :2]).prod(1)
+    area_b = (b[:, 2:] - b[:, :2]).prod(1)
+    return inter / (area_a[:, None] + area_b[None, :] - inter + 1e-9)
+
+
+def compare(ref, test, min_iou):
+    """Greedy match of test boxes to reference boxes with the same class.
+
+    Returns (matched, unmatched_ref, unmatched_test, max_box_px, max_score_diff).
+    """
+    if len(ref) == 0 or len(test) == 0:
+        return 0, len(ref), len(test), 0.0, 0.0
+
+    iou = box_iou(ref[:, :4], test[:, :4])
+    iou[ref[:, 5][:, None] != test[:, 5][None, :]] = 0
+    matched, max_px, max_score = 0, 0.0, 0.0
+    used = set()
+    for i in np.argsort(-ref[:, 4]):
+        j = int(iou[i].argmax())
+        if iou[i, j] < min_iou or j in used:
+            continue
+        used.add(j)
+        matched += 1
+        max_px = max(max_px, float(np.abs(ref[i, :4] - test[j, :4]).max()))
+        max_score = max(max_score, float(abs(ref[i, 4] - test[j, 4])))
+    return matched, len(ref) - matched, len(test) - matched, max_px, max_score
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default="app/models/best.pt")
+    parser.add_argument("--onnx", default=None, help="existing ONNX export (default: export next to --model)")
+    parser.add_argument("--images", required=True)
+    parser.add_argument("--conf", type=float, default=0.25)
+    parser.add_argument("--min-iou", type=float, default=0.9)
+    parser.add_argument("--max-px", type=float, default=4.0)
+    parser.add_argument("--max-score", type=float, default=0.05)
+    args = parser.parse_args()
+
+    files = sorted(f for f in glob.glob(os.path.join(args.images, "*")) if f.lower().endswith(IMAGE_EXT))
+    if not files:
+        print(f"No images found in {args.images}")
+        sys.exit(1)
+
+    onnx_path = args.onnx or export_onnx(args.model)
+    ref_backend = TorchBackend(args.model)
+    test_backend = OnnxBackend(onnx_path)
+
+    total = {"matched": 0, "missing": 0, "extra": 0}
+    worst_px, worst_score = 0.0, 0.0
+    for path in files:
+        frame = cv2.imread(path)
+        if frame is None:
+            continue
+        ref = ref_backend.predict(frame, conf=args.conf)
+        test = test_backend.predict(frame, conf=args.conf)
+        matched, missing, extra, px, score = compare(ref, test, args.min_iou)
+        total["matched"] += matched
+        total["missing"] += missing
+        total["extra"] += extra
+        worst_px = max(worst_px, px)
+        worst_score = max(worst_score, score)
+        if missing or extra:
+            print(f"{os.path.basename(path)}: torch={len(ref)} onnx={len(test)} matched={matched}")
+
+    print(f"Images: {len(files)}, matched boxes: {total['matched']}, "
+          f"missing: {total['missing']}, extra: {total['extra']}")
+    print(f"Max box error: {worst_px:.2f}px, max score error: {worst_score:.4f}")
+
+    # Boxes right at the conf threshold can legitimately flip, allow a small number
+    allowed = max(1, total["matched"] // 50)
+    ok = (worst_px <= args.max_px and worst_score <= args.max_score
+          and total["missing"] + total["extra"] <= allowed)
+    print("PARITY OK" if ok else "PARITY FAILED")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# NetworkThread RTT / loss / reordering metrics against the robot simulator with injected impairments.
+# Usage: python app/tools/check_link_metrics.py [--seconds 8]
+# Each scenario prints injected vs measured values and the auto-mode speed factor.
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from PyQt6.QtCore import QCoreApplication
+
+from network import NetworkThread
+from robot_sim import RobotSim
+
+SCENARIOS = [
+    # name, delay ms, jitter ms, loss
+    ("clean", 0, 0, 0.0),
+    ("wifi 30ms", 30, 10, 0.0),
+    ("lossy 10%", 20, 5, 0.10),
+    ("jitter > probe", 50, 400, 0.0),
+    ("bad link", 200, 50, 0.20),
+]
+
+
+def run_scenario(app, delay, jitter, loss, seconds):
+    sim = RobotSim(port=0, delay=delay / 1000, jitter=jitter / 1000, loss=loss, seed=1).start()
+    net = NetworkThread("127.0.0.1", port=0, robot_port=sim.port)
+    net.start()
+    t_end = time.time() + seconds
+    while time.time() < t_end:
+        app.processEvents()
+        time.sleep(0.05)
+    net.metrics.expire()
+    stats = net.metrics.snapshot()
+    factor = net.metrics.speed_factor()
+    proto = net.protocol
+    net.stop()
+    sim.stop()
+    return proto, stats, factor
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=8.0)
+    args = parser.parse_args()
+
+    app = QCoreApplication(sys.argv)
+    print(f"{'scenario':<15} {'inject':>16} | {'p50':>6} {'p95':>6} {'p99':>6} {'loss%':>6} {'reord':>5} {'late':>4}  speed")
+    for name, delay, jitter, loss in SCENARIOS:
+        proto, s, factor = run_scenario(app, delay, jitter, loss, args.seconds)
+        inject = f"{delay}+U({jitter})ms {loss * 100:.0f}%"
+        if proto != "binary":
+            print(f"{name:<15} {inject:>16} | negotiation failed ({proto})")
+            continue
+        print(f"{name:<15} {inject:>16} | {s['rtt_p50']:>6} {s['rtt_p95']:>6} {s['rtt_p99']:>6} "
+              f"{s['loss_pct']:>6} {s['reordered']:>5} {s['late']:>4}  x{factor:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# Lost-target check: a locked track whose object disappears must expire (tracker max_age), and the
+# controller must fall back to SEARCH_WAIT (search on) or IDLE LOST_TARGET_TIMEOUT after the last
+# detection, not after the tracker stopped extrapolating it.
+# Usage: python app/tools/check_tracker_expiry.py
+# Runs RobotApp.auto_control_loop's tracker -> controller path on a virtual clock: detections at 10 Hz,
+# control ticks at 20 Hz. After the object disappears the detector either keeps publishing empty
+# results or publishes nothing at all (inference paused), both must end the chase.
+# Exits with status 1 when a scenario fails.
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from inference import detections as det
+from clock import VirtualClock
+from robot_controller import RobotController, RobotState
+from tracker import Tracker
+
+TICK = 0.05
+INFER = 0.1
+
+
+def box(cx, cy=240, w=80, h=80, conf=0.8):
+    d = np.zeros(1, dtype=det.DETECTION_DTYPE)
+    d['x1'], d['y1'], d['x2'], d['y2'] = cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2
+    d['conf'], d['cls'], d['center_x'] = conf, 0, cx
+    return d
+
+
+def run(search, after, visible=3.0, limit=6.0):
+    """Object seen for `visible` s, then gone. Returns (state while visible, seconds until the
+    controller gave up, seconds until tracker.locked() went None, allowed seconds); None = never.
+    The last detection is at most one inference interval before the object is gone, so the allowed
+    time is LOST_TARGET_TIMEOUT plus a control tick from that detection."""
+    clock = VirtualClock(1000.0)
+    robot = RobotController(clock=clock)
+    if search:
+        robot.enable_search(True)
+    tracker = Tracker(max_age=robot.LOST_TARGET_TIMEOUT)
+    start = clock()
+    gone_at = start + visible
+    next_infer = start
+    seen_state = None
+    lost = unlocked = None
+    while clock() < gone_at + limit:
+        now = clock()
+        if now >= next_infer:
+            next_infer += INFER
+            if now < gone_at:
+                dets = box(320 + 5 * np.sin(now))
+            elif after == "empty":
+                dets = det.empty()
+            else:
+                dets = None                      # nothing published
+            if dets is not None:
+                tracker.update(dets, now)
+                robot.update_track(tracker.locked(), {})
+        # RobotApp.auto_control_loop
+        locked = tracker.locked(now)
+        robot.update_track(locked, {})
+        robot.compute_control()
+        if now < gone_at:
+            seen_state = robot.state
+        else:
+            if unlocked is None and locked is None:
+                unlocked = now - gone_at
+            if lost is None and robot.state in (RobotState.SEARCH_WAIT, RobotState.SEARCH_STEP, RobotState.IDLE):
+                lost = now - gone_at
+        clock.advance(TICK)
+    return seen_state, lost, unlocked, robot.LOST_TARGET_TIMEOUT + TICK
+
+
+def main():
+    failed = False
+    print(f"{'search':<7} {'after loss':<11} {'state':<9} {'unlocked s':>10} {'gave up s':>9} {'limit s':>8}")
+    for search in (True, False):
+        for after in ("empty", "nothing"):
+            state, lost, unlocked, limit = run(search, after)
+            ok = state == RobotState.CHASING and lost is not None and lost <= limit and unlocked is not None
+            failed |= not ok
+            fmt = lambda v: "never" if v is None else f"{v:.2f}"
+            print(f"{str(search):<7} {after:<11} {state.value:<9} {fmt(unlocked):>10} {fmt(lost):>9} "
+                  f"{limit:>8.2f}  {'ok' if ok else 'FAIL'}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
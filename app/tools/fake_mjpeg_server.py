@@ -0,0 +1,154 @@
+# Local stand-in for the ESP32-CAM :81/stream endpoint (same multipart boundary and part headers).
+# Replays recorded JPEG files in a loop, or serves frames from any callable.
+# Like the firmware (httpd_resp_send_chunk) the body is sent in chunked transfer encoding, one chunk for
+# the boundary, one for the part header and one for the JPEG; --no-chunked sends it as plain bytes.
+# Usage: python app/tools/fake_mjpeg_server.py --jpegs path/to/jpegs [--port 8081] [--fps 20] [--no-chunked]
+import argparse
+import glob
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PART_BOUNDARY = "123456789000000000000987654321"
+STREAM_CONTENT_TYPE = "multipart/x-mixed-replace;boundary=" + PART_BOUNDARY
+STREAM_BOUNDARY = ("\r\n--" + PART_BOUNDARY + "\r\n").encode()
+STREAM_PART = "Content-Type: image/jpeg\r\nContent-Length: %u\r\n\r\n"
+
+
+def jpeg_file_source(folder):
+    """Cycle over the .jpg files of a folder, returns a callable giving the next JPEG bytes."""
+    files = sorted(glob.glob(os.path.join(folder, "*.jpg")) + glob.glob(os.path.join(folder, "*.jpeg")))
+    if not files:
+        raise FileNotFoundError(f"No JPEG files in {folder}")
+    frames = []
+    for path in files:
+        with open(path, "rb") as f:
+            frames.append(f.read())
+    state = {"i": 0}
+
+    def next_frame():
+        data = frames[state["i"] % len(frames)]
+        state["i"] += 1
+        return data
+
+    return next_frame
+
+
+class MjpegServer:
+    """Threaded HTTP server streaming frame_source() as multipart JPEG on /stream.
+
+    drop_after: close every connection after this many frames (exercises client reconnect).
+    stall_after / stall_time: stop sending mid-stream for a while (exercises read timeouts).
+    chunked: Transfer-Encoding: chunked body, as the firmware sends it.
+    """
+
+    def __init__(self, frame_source, host="127.0.0.1", port=8081, fps=20.0,
+                 drop_after=0, stall_after=0, stall_time=0.0, chunked=True):
+        self.frame_source = frame_source
+        self.fps = fps
+        self.chunked = chunked
+        self.drop_after = drop_after
+        self.stall_after = stall_after
+        self.stall_time = stall_time
+        self.connections = 0
+        self.frames_sent = 0
+        self._lock = threading.Lock()
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                if not self.path.startswith("/stream"):
+                    self.send_error(404)
+                    return
+                with server._lock:
+                    server.connections += 1
+                self.send_response(200)
+                self.send_header("Content-Type", STREAM_CONTENT_TYPE)
+                self.send_header("Access-Control-Allow-Origin", "*")
+                if server.chunked:
+                    self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                server._stream(self.wfile)
+                self.close_connection = True
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+        self.url = f"http://{host}:{self.port}/stream"
+        self._thread = None
+
+    def _stream(self, wfile):
+        interval = 1.0 / self.fps if self.fps > 0 else 0
+        sent = 0
+        next_time = time.time()
+        if self.chunked:
+            def write(data):
+                wfile.write(b"%X\r\n" % len(data))
+                wfile.write(data)
+                wfile.write(b"\r\n")
+        else:
+            write = wfile.write
+        try:
+            while True:
+                if self.drop_after and sent >= self.drop_after:
+                    if self.chunked:
+                        wfile.write(b"0\r\n\r\n")
+                    return
+                if self.stall_after and sent == self.stall_after:
+                    time.sleep(self.stall_time)
+                jpg = self.frame_source()
+                write(STREAM_BOUNDARY)
+                write((STREAM_PART % len(jpg)).encode())
+                write(jpg)
+                wfile.flush()
+                sent += 1
+                with self._lock:
+                    self.frames_sent += 1
+                if interval:
+                    next_time += interval
+                    delay = next_time - time.time()
+                    if delay > 0:
+                        time.sleep(delay)
+                    else:
+                        next_time = time.time()
+        except (BrokenPipeError, ConnectionResetError, OSError):
+            pass
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jpegs", required=True)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--fps", type=float, default=20.0)
+    parser.add_argument("--drop-after", type=int, default=0)
+    parser.add_argument("--no-chunked", action="store_true", help="plain body instead of chunked transfer-encoding")
+    args = parser.parse_args()
+
+    server = MjpegServer(jpeg_file_source(args.jpegs), args.host, args.port, args.fps, args.drop_after,
+                         chunked=not args.no_chunked)
+    print(f"Serving {args.jpegs} at {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# Vectorized kinematic model of the rover: differential drive, ESP32-CAM view and front sonar.
+# Shared by sweep_controller.py (thousands of rovers per step) and robot_sim.py (one rover).
+import numpy as np
+
+TRACK_WIDTH = 0.15          # m between the wheels
+MAX_WHEEL_SPEED = 0.6       # m/s at PWM 255
+DEADBAND = 25               # |PWM| below this does not move the gear motors
+FOV = np.radians(62)        # OV2640 horizontal field of view
+MAX_RANGE = 4.0             # m, farther trash is too small for the detector
+SONAR_CONE = np.radians(15)
+SONAR_MAX_CM = 100          # SonarManager reports 100 when the echo times out (~1 m)
+
+
+class Rover:
+    """n rovers on a plane, theta = 0 faces +x, each with one target object."""
+
+    def __init__(self, n, width=640, height=480):
+        self.n = n
+        self.width = width
+        self.height = height
+        self.focal = (width / 2) / np.tan(FOV / 2)
+        self.max_wheel_speed = MAX_WHEEL_SPEED
+        self.x = np.zeros(n)
+        self.y = np.zeros(n)
+        self.theta = np.zeros(n)
+        self.target = np.zeros((n, 2))
+        self.target_size = np.full(n, 0.12)     # m, bottle / can sized
+        self.odometer = np.zeros(n)
+
+    def place_targets(self, rng, min_dist=1.0, max_dist=3.0, max_bearing=np.pi, scenes=None):
+        """Random target per rover; with scenes=k, rover i gets scene i % k (same scenes per parameter set)."""
+        k = scenes or self.n
+        dist = np.resize(rng.uniform(min_dist, max_dist, k), self.n)
+        bearing = np.resize(rng.uniform(-max_bearing, max_bearing, k), self.n)
+        self.target[:, 0] = self.x + dist * np.cos(self.theta + bearing)
+        self.target[:, 1] = self.y + dist * np.sin(self.theta + bearing)
+
+    def wheel_speed(self, pwm):
+        pwm = np.clip(np.asarray(pwm, dtype=np.float64), -255, 255)
+        return np.where(np.abs(pwm) < DEADBAND, 0.0, pwm / 255 * self.max_wheel_speed)
+
+    def step(self, L, R, dt, substeps=2):
+        vl, vr = self.wheel_speed(L), self.wheel_speed(R)
+        v = (vl + vr) / 2
+        omega = (vr - vl) / TRACK_WIDTH
+        h = dt / substeps
+        for _ in range(substeps):
+            self.x += v * np.cos(self.theta) * h
+            self.y += v * np.sin(self.theta) * h
+            self.theta += omega * h
+        self.odometer += np.abs(v) * dt
+        self.theta = (self.theta + np.pi) % (2 * np.pi) - np.pi
+
+    def relative(self):
+        """Distance (m) and bearing (rad, left positive) of every target."""
+        dx = self.target[:, 0] - self.x
+        dy = self.target[:, 1] - self.y
+        bearing = (np.arctan2(dy, dx) - self.theta + np.pi) % (2 * np.pi) - np.pi
+        return np.hypot(dx, dy), bearing
+
+    def camera(self):
+        """(visible, center_x, box_w): where the target shows up in the image."""
+        dist, bearing = self.relative()
+        visible = (np.abs(bearing) < FOV / 2) & (dist < MAX_RANGE) & (dist > 0.05)
+        center_x = self.width / 2 - self.focal * np.tan(np.where(visible, bearing, 0.0))
+        box_w = self.focal * self.target_size / np.maximum(dist, 0.05)
+        return visible, center_x, box_w
+
+    def sonar(self):
+        """Front sonar distance in cm: the target when inside the cone, otherwise nothing in range."""
+        dist, bearing = self.relative()
+        hit = np.abs(bearing) < SONAR_CONE
+        cm = (dist - self.target_size / 2) * 100
+        return np.where(hit, np.clip(cm, 2, SONAR_MAX_CM), SONAR_MAX_CM)
@@ -0,0 +1,321 @@
+# Replays a recorded session through the auto-mode loop, headless and on a virtual clock.
+# Record:  python app/src/main.py --record session.rec
+# Replay:  python app/tools/replay.py session.rec [--model app/models/best.onnx] [--latency-ms 60] [--json out.json]
+# The control loop runs at the times the recorded app sent MOVE/STOP, so every recorded command has a
+# replayed counterpart computed from the same inputs. Without --model the recorded detections are fed
+# back (controller + tracker regression, fully deterministic). With --model the frames are inferred again
+# the way VideoThread does it (scheduler plan, ROI crop, motion gate), each result published at frame
+# stamp + inference time (measured, or --latency-ms for a deterministic run).
+# Exit status 1 with --fail-on-diff when any command or state differs.
+import argparse
+import heapq
+import json
+import os
+import sys
+import time
+from collections import Counter
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from inference import detections as det
+import recording
+import roi
+from clock import VirtualClock
+from motion_gate import MotionGate
+from robot_controller import RobotController, RobotState
+from scheduler import InferenceScheduler
+from tracker import Tracker
+
+
+class Inference:
+    """VideoThread's inference stage on virtual time: one frame at a time, newest frame wins."""
+
+    def __init__(self, model, scheduler, tracker, latency_ms=None):
+        self.model = model
+        self.scheduler = scheduler
+        self.tracker = tracker
+        self.latency_ms = latency_ms
+        self.gate = MotionGate()
+        self.conf = 0.25
+        self.roi_max_age = 0.5     # VideoThread.roi_max_age
+        self.busy_until = 0.0
+        self.last_start = -1e9
+        self.last = det.empty()
+        self.pending = []          # heap of (publish time, seq, frame stamp, detections)
+        self._seq = 0
+        self.infer_ms = []
+        self.skipped = 0
+
+    def frame(self, jpeg, stamp):
+        plan = self.scheduler.plan()
+        if not plan.enabled or stamp < self.busy_until or stamp - self.last_start < self.scheduler.interval():
+            return
+        self.last_start = stamp
+        frame = recording.decode_frame(jpeg)
+        if plan.gate and self.gate.should_skip(frame, now=stamp):
+            self.skipped += 1
+            self._publish(stamp, stamp, self.last)
+            return
+
+        t0, cpu0 = time.perf_counter(), time.process_time()
+        boxes = None
+        locked = self.tracker.locked(stamp) if plan.roi else None
+        if locked is not None and locked['stale'] <= self.roi_max_age:
+            box = (locked['x1'], locked['y1'], locked['x2'], locked['y2'])
+            boxes, win = roi.predict(self.model, frame, box, self.conf, plan.roi_imgsz, max_det=5)
+        if boxes is None or not len(boxes):
+            boxes = self.model.predict(frame, conf=self.conf, imgsz=plan.imgsz, max_det=5)
+        elapsed = time.perf_counter() - t0
+        self.gate.inferred(frame, time.process_time() - cpu0, now=stamp)
+        self.scheduler.record(elapsed)
+
+        ms = elapsed * 1000 if self.latency_ms is None else self.latency_ms
+        self.infer_ms.append(ms)
+        self.busy_until = stamp + ms / 1000
+        self.last = det.from_boxes(boxes)
+        self._publish(self.busy_until, stamp, self.last)
+
+    def _publish(self, t, stamp, dets):
+        self._seq += 1
+        heapq.heappush(self.pending, (t, self._seq, stamp, dets))
+
+    def ready(self, now):
+        while self.pending and self.pending[0][0] <= now:
+            t, _, stamp, dets = heapq.heappop(self.pending)
+            yield t, stamp, dets
+
+
+class Replay:
+    def __init__(self, records, model=None, latency_ms=None, tolerance=0, overrides=None):
+        self.records = records
+        self.tolerance = tolerance
+        self.overrides = overrides or {}
+        self.clock = VirtualClock(records[0].t if records else 0.0)
+        self.robot = RobotController(clock=self.clock)
+        self.tracker = Tracker(max_age=self.robot.LOST_TARGET_TIMEOUT)
+        self.scheduler = InferenceScheduler()
+        self.inference = Inference(model, self.scheduler, self.tracker, latency_ms) if model else None
+        self.auto = False
+        self.paused = False          # REACHED, waiting for the completion dialog
+        self.factor = 1.0
+        self.sensors = (0, 0, 0)
+        self.recorded_state = None
+
+        self.ticks = 0
+        self.command_diffs = []
+        self.state_diffs = 0
+        self.abs_diff = []
+        self.decision_ms = []        # frame capture -> command that first used it
+        self.recorded_decision_ms = []
+        self.recorded_infer_ms = []
+        self._pending_decision = None
+        self._recorded_pending = None
+
+    # --- inputs ---
+    def _detections(self, stamp, dets):
+        self.tracker.update(dets, stamp)
+        self.robot.update_track(self.tracker.locked(), {})
+        self._pending_decision = stamp
+
+    def _event(self, ev):
+        name = ev.get("event")
+        if name == "config":
+            self.robot.apply_params(ev["params"])
+            self.robot.apply_params(self.overrides)
+            self.tracker.max_age = self.robot.LOST_TARGET_TIMEOUT
+            if self.inference:
+                self.inference.conf = ev.get("conf", self.inference.conf)
+            if ev.get("search"):
+                self.robot.enable_search(True)
+            else:
+                self.robot.search_enabled = False
+                if not self.auto:
+                    self.robot.state = RobotState.IDLE
+        elif name == "mode":
+            self.tracker.reset()
+            self.auto = ev["auto"]
+            self.paused = False
+            if self.auto:
+                if ev.get("search"):
+                    self.robot.enable_search(True)
+                else:
+                    self.robot.state = RobotState.IDLE
+                    self.robot.search_enabled = False
+                self.scheduler.set_state(self.robot.state)
+            else:
+                self.robot.emergency_stop()
+                self.scheduler.set_state(self.robot.state, auto=False)
+            self.recorded_state = ev.get("state", self.robot.state.value)
+        elif name == "continue":
+            self.robot.reset_after_reach()
+            self.tracker.reset()
+            self.paused = False
+            self.recorded_state = ev.get("state")
+        elif name == "state":
+            self.recorded_state = ev["state"]
+        elif name == "link":
+            self.factor = ev["factor"]
+        elif name == "close":
+            self.auto = False
+
+    # --- control loop (RobotApp.auto_control_loop) ---
+    def _tick(self, recorded):
+        now = self.clock.t
+        self.robot.update_sensors(*self.sensors)
+        self.robot.update_track(self.tracker.locked(now), {})
+        L, R, info = self.robot.compute_control()
+        self.scheduler.set_state(self.robot.state)
+        if self.robot.state == RobotState.REACHED:
+            cmd = {"cmd": "STOP", "L": 0, "R": 0}
+            self.paused = True
+        else:
+            if self.factor < 1.0:
+                L, R = L * self.factor, R * self.factor
+            cmd = {"cmd": "MOVE", "L": int(L), "R": int(R)}
+
+        self.ticks += 1
+        diff = max(abs(cmd["L"] - recorded.get("L", 0)), abs(cmd["R"] - recorded.get("R", 0)))
+        self.abs_diff.append(diff)
+        if cmd["cmd"] != recorded.get("cmd") or diff > self.tolerance:
+            self.command_diffs.append((now, recorded, cmd, self.robot.state.value, info))
+        if self.recorded_state is not None and self.robot.state.value != self.recorded_state:
+            self.state_diffs += 1
+        if self._pending_decision is not None:
+            self.decision_ms.append((now - self._pending_decision) * 1000)
+            self._pending_decision = None
+
+    def run(self):
+        for rec in self.records:
+            # Results that finished inferring before this record happened
+            if self.inference:
+                for t, stamp, dets in self.inference.ready(rec.t):
+                    self.clock.t = t
+                    self._detections(stamp, dets)
+            self.clock.t = max(self.clock.t, rec.t)
+
+            if rec.kind == recording.EVENT:
+                self._event(rec.data)
+            elif rec.kind == recording.TELEMETRY:
+                d = rec.data
+                F, L, R = self.sensors
+                self.sensors = (d.get("F", F), d.get("L", L), d.get("R", R))
+            elif rec.kind == recording.FRAME:
+                if self.inference and self.auto:
+                    self.inference.frame(rec.data, rec.t)
+            elif rec.kind == recording.DETECTIONS:
+                stamp, dets = rec.data
+                self.recorded_infer_ms.append((rec.t - stamp) * 1000)
+                self._recorded_pending = stamp
+                if not self.inference and self.auto:
+                    self._detections(stamp, dets)
+            elif rec.kind == recording.COMMAND:
+                cmd = rec.data
+                if cmd.get("cmd") not in ("MOVE", "STOP"):
+                    continue
+                if self._recorded_pending is not None:
+                    self.recorded_decision_ms.append((rec.t - self._recorded_pending) * 1000)
+                    self._recorded_pending = None
+                if self.auto and not self.paused:
+                    self._tick(cmd)
+        return self
+
+
+def load(path):
+    records = list(recording.read(path))
+    # Writer order is enqueue order; frames carry their capture stamp, so sort once by time
+    records.sort(key=lambda r: r.t)
+    return records
+
+
+def pct(values):
+    if not len(values):
+        return None
+    p50, p95, p99 = np.percentile(values, (50, 95, 99))
+    return {'p50': round(float(p50), 1), 'p95': round(float(p95), 1), 'p99': round(float(p99), 1), 'n': len(values)}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("recording")
+    parser.add_argument("--model", default=None, help="infer the recorded frames again with this model")
+    parser.add_argument("--backend", default="auto")
+    parser.add_argument("--latency-ms", type=float, default=None, help="fixed inference latency (deterministic)")
+    parser.add_argument("--tolerance", type=int, default=0, help="allowed |L|/|R| difference per command")
+    parser.add_argument("--set", action="append", default=[], metavar="NAME=VALUE",
+                        help="override a controller parameter, e.g. --set ALIGN_TOLERANCE=20")
+    parser.add_argument("--show", type=int, default=10, help="print the first N command diffs")
+    parser.add_argument("--json", default=None, help="write the summary here")
+    parser.add_argument("--fail-on-diff", action="store_true")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    records = load(args.recording)
+    load_s = time.perf_counter() - t0
+    if not records:
+        print("Empty recording")
+        return 1
+    counts = Counter(recording.KIND_NAMES.get(r.kind, "other") for r in records)
+
+    overrides = {}
+    for item in args.set:
+        name, _, value = item.partition("=")
+        overrides[name] = float(value) if "." in value else int(value)
+
+    model = None
+    if args.model:
+        from inference import load_backend
+        model = load_backend(args.model, args.backend)
+
+    t0 = time.perf_counter()
+    replay = Replay(records, model, args.latency_ms, args.tolerance, overrides).run()
+    wall = time.perf_counter() - t0
+    span = records[-1].t - records[0].t
+
+    summary = {
+        'recording': os.path.basename(args.recording),
+        'records': dict(counts),
+        'span_s': round(span, 1),
+        'replay_s': round(wall, 2),
+        'speedup': round(span / wall, 1) if wall > 0 else None,
+        'mode': 'model' if model else 'recorded detections',
+        'overrides': overrides,
+        'ticks': replay.ticks,
+        'command_diffs': len(replay.command_diffs),
+        'state_diffs': replay.state_diffs,
+        'max_abs_diff': int(max(replay.abs_diff)) if replay.abs_diff else 0,
+        'mean_abs_diff': round(float(np.mean(replay.abs_diff)), 2) if replay.abs_diff else 0.0,
+        'recorded': {'inference_ms': pct(replay.recorded_infer_ms), 'decision_ms': pct(replay.recorded_decision_ms)},
+        'replayed': {'decision_ms': pct(replay.decision_ms)},
+    }
+    if replay.inference:
+        summary['replayed']['inference_ms'] = pct(replay.inference.infer_ms)
+        summary['replayed']['gate_skips'] = replay.inference.skipped
+
+    print(f"{summary['recording']}: {span:.1f}s recorded, replayed in {wall:.2f}s (x{summary['speedup']}, "
+          f"load {load_s:.2f}s), {summary['mode']}" + (f", overrides {overrides}" if overrides else ""))
+    print("  records: " + ", ".join(f"{k} {v}" for k, v in sorted(counts.items())))
+    print(f"  control ticks {replay.ticks}: {len(replay.command_diffs)} command diffs (tolerance {args.tolerance}), "
+          f"{replay.state_diffs} state diffs, |dL/dR| max {summary['max_abs_diff']} mean {summary['mean_abs_diff']}")
+    for name, group in (("recorded", summary['recorded']), ("replayed", summary['replayed'])):
+        for key in ("inference_ms", "decision_ms"):
+            s = group.get(key)
+            if s:
+                print(f"  {name:<8} {key:<12} p50 {s['p50']:7.1f}  p95 {s['p95']:7.1f}  p99 {s['p99']:7.1f}  (n={s['n']})")
+    if replay.command_diffs:
+        print("  first diffs (t from start):")
+        for t, rec, cmd, state, info in replay.command_diffs[:args.show]:
+            print(f"    {t - records[0].t:8.3f}s recorded {rec.get('cmd')} {rec.get('L')}/{rec.get('R')}  "
+                  f"replayed {cmd['cmd']} {cmd['L']}/{cmd['R']}  [{state}: {info}]")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summary, f, indent=2)
+    if args.fail_on_diff and (replay.command_diffs or replay.state_diffs):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
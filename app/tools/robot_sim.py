@@ -0,0 +1,198 @@
+# Local UDP stand-in for esp32-firmware: same port, JSON + binary protocol, telemetry and failsafe.
+# Lets NetworkThread / protocol changes be exercised without the robot.
+# Usage: python app/tools/robot_sim.py [--port 8888] [--json-only] [--delay-ms 40 --jitter-ms 20 --loss 0.05]
+#        then point the app's Robot IP at 127.0.0.1
+import argparse
+import heapq
+import itertools
+import json
+import os
+import random
+import socket
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import protocol
+
+
+class RobotSim:
+    """Mirrors the firmware loop: receive commands, stream telemetry every 150 ms to the last sender,
+    stop the motors 500 ms after the last command.
+
+    json_only: behave like old firmware (binary packets are dropped, HELLO is never answered).
+    delay / jitter / loss: applied to everything the robot sends (PONG, telemetry, acks), so a
+    probe's RTT is delay + U(0, jitter) and jitter > probe interval produces reordering.
+    """
+
+    def __init__(self, host="127.0.0.1", port=8888, json_only=False,
+                 telemetry_interval=0.15, failsafe=0.5, distances=(120, 80, 80),
+                 delay=0.0, jitter=0.0, loss=0.0, seed=0):
+        self.json_only = json_only
+        self.delay = delay
+        self.jitter = jitter
+        self.loss = loss
+        self.dropped = 0
+        self._rng = random.Random(seed)
+        self._outbox = []                  # heap of (due, n, data, addr)
+        self._outbox_n = itertools.count()
+        self.telemetry_interval = telemetry_interval
+        self.failsafe = failsafe
+        self.distances = list(distances)   # F, L, R in cm
+        self.motor = (0, 0)
+        self.use_binary = False
+        self.commands = []                 # (time, cmd dict, "json"|"binary")
+        self.bad_packets = 0
+
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind((host, port))
+        self.sock.settimeout(0.002)
+        self.port = self.sock.getsockname()[1]
+        self._remote = None
+        self._last_cmd = 0.0
+        self._seq = 0
+        self._t0 = time.monotonic()
+        self._running = False
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _now_ms(self):
+        return int((time.monotonic() - self._t0) * 1000)
+
+    def _next_seq(self):
+        self._seq = (self._seq + 1) & 0xFFFF
+        return self._seq
+
+    def _send(self, data, addr):
+        if self.loss and self._rng.random() < self.loss:
+            self.dropped += 1
+            return
+        if not self.delay and not self.jitter:
+            self.sock.sendto(data, addr)
+            return
+        due = time.monotonic() + self.delay + self._rng.uniform(0, self.jitter)
+        heapq.heappush(self._outbox, (due, next(self._outbox_n), data, addr))
+
+    def _flush(self, now):
+        while self._outbox and self._outbox[0][0] <= now:
+            _, _, data, addr = heapq.heappop(self._outbox)
+            self.sock.sendto(data, addr)
+
+    def _record(self, cmd, fmt):
+        with self._lock:
+            self.commands.append((time.time(), cmd, fmt))
+        self._last_cmd = time.monotonic()
+        if cmd["cmd"] == "MOVE":
+            self.motor = (int(cmd.get("L", 0)), int(cmd.get("R", 0)))
+        elif cmd["cmd"] == "STOP":
+            self.motor = (0, 0)
+
+    def _handle(self, data, addr):
+        self._remote = addr
+        if data[:1] == bytes([protocol.MAGIC]):
+            msg = None if self.json_only else protocol.unpack(data)
+            if msg is None:
+                self.bad_packets += 1
+                return
+            self.use_binary = True
+            if msg.type == protocol.HELLO:
+                self._send(protocol.encode_hello_ack(self._next_seq(), self._now_ms()), addr)
+                return
+            if msg.type == protocol.PING:
+                self._send(protocol.encode_pong(msg, self._next_seq(), self._now_ms()), addr)
+                return
+            cmd = protocol.decode_command(msg)
+            if cmd:
+                self._record(cmd, "binary")
+            return
+        try:
+            cmd = json.loads(data.decode())
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            self.bad_packets += 1
+            return
+        self.use_binary = False
+        if isinstance(cmd, dict) and "cmd" in cmd:
+            self._record(cmd, "json")
+
+    def _send_telemetry(self):
+        if self._remote is None:
+            return
+        F, L, R = self.distances
+        if self.use_binary:
+            data = protocol.encode_telemetry(F, L, R, self._next_seq(), self._now_ms())
+        else:
+            data = json.dumps({"F": F, "L": L, "R": R}).encode()
+        self._send(data, self._remote)
+
+    def step(self):
+        """One pass of the firmware loop body. Override point for richer simulators."""
+        pass
+
+    def _loop(self):
+        last_send = 0.0
+        while self._running:
+            try:
+                data, addr = self.sock.recvfrom(1024)
+                self._handle(data, addr)
+            except socket.timeout:
+                pass
+            except OSError:
+                break
+            now = time.monotonic()
+            self._flush(now)
+            if now - last_send > self.telemetry_interval:
+                last_send = now
+                self._send_telemetry()
+            if now - self._last_cmd > self.failsafe:
+                self.motor = (0, 0)
+            self.step()
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._running = False
+        if self._thread:
+            self._thread.join(timeout=1.0)
+        self.sock.close()
+
+    def command_log(self):
+        with self._lock:
+            return list(self.commands)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8888)
+    parser.add_argument("--json-only", action="store_true", help="emulate firmware without the binary protocol")
+    parser.add_argument("--delay-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--loss", type=float, default=0.0, help="drop probability for outgoing packets")
+    args = parser.parse_args()
+
+    sim = RobotSim(args.host, args.port, json_only=args.json_only,
+                   delay=args.delay_ms / 1000, jitter=args.jitter_ms / 1000, loss=args.loss).start()
+    print(f"Robot simulator on {args.host}:{sim.port} ({'JSON only' if args.json_only else 'JSON + binary'})")
+    seen = 0
+    try:
+        while True:
+            time.sleep(0.5)
+            log = sim.command_log()
+            for stamp, cmd, fmt in log[seen:]:
+                if cmd["cmd"] != "MOVE":
+                    print(f"[{fmt}] {cmd}")
+            seen = len(log)
+            print(f"motor L={sim.motor[0]:4d} R={sim.motor[1]:4d}  cmds={seen}  "
+                  f"telemetry={'binary' if sim.use_binary else 'json'}", end="\r")
+    except KeyboardInterrupt:
+        sim.stop()
+
+
+if __name__ == "__main__":
+    main()
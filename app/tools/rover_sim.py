@@ -0,0 +1,304 @@
+# Headless rover: RobotSim's UDP protocol on a moving kinematics.Rover, three sonars and a rendered
+# ESP32-CAM view with trash sprites, streamed like esp32_cam-firmware (:81/stream, VGA MJPEG).
+# Usage: python app/tools/rover_sim.py [--items 3] [--seed 0] [--cam-port 8081] [--sprites dir/with/pngs]
+#        then set Robot IP 127.0.0.1 and CAM URL http://127.0.0.1:8081/stream in the app
+# Without --sprites the trash is drawn as red blocks (what bench_roi.StandInModel detects); with
+# PNG sprites (alpha used when present) a real model can be pointed at the stream.
+# Assumptions: square arena with walls, the camera and the three sonars sit on the rover's front
+# edge (SONAR_OFFSET), left / right sonars face +-SIDE_SONAR_ANGLE.
+import argparse
+import glob
+import os
+import sys
+import threading
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_mjpeg_server import MjpegServer
+from kinematics import Rover, FOV, MAX_RANGE, MAX_WHEEL_SPEED, SONAR_CONE
+from robot_sim import RobotSim
+
+ARENA = 2.0                         # m, walls at +-ARENA on both axes
+SONAR_OFFSET = 0.08                 # m from the rover centre to the sensors on the front edge
+SIDE_SONAR_ANGLE = np.radians(45)
+SONAR_RANGE_CM = 98                 # pulseIn timeout 5800 us in SonarManager
+SONAR_NONE_CM = 100                 # what the firmware reports when the echo times out
+CAMERA_HEIGHT = 0.10                # m above the floor
+TRASH_COLOR = (30, 30, 220)         # BGR
+MIN_SPRITE_PX = 8                   # narrower than this counts as not visible
+
+
+def load_sprites(folder):
+    sprites = []
+    for path in sorted(glob.glob(os.path.join(folder, "*.png"))):
+        img = cv2.imread(path, cv2.IMREAD_UNCHANGED)
+        if img is None:
+            continue
+        if img.ndim == 2:
+            img = cv2.cvtColor(img, cv2.COLOR_GRAY2BGRA)
+        elif img.shape[2] == 3:
+            img = cv2.cvtColor(img, cv2.COLOR_BGR2BGRA)
+        sprites.append(img)
+    if not sprites:
+        raise FileNotFoundError(f"No PNG sprites in {folder}")
+    return sprites
+
+
+class RoverSim(RobotSim):
+    """RobotSim whose motors drive a simulated rover in a walled arena with trash items.
+
+    Every loop pass integrates the last MOVE over the elapsed time and refreshes the F / L / R
+    sonars. render() draws what the camera sees; start() also serves it on an MjpegServer.
+
+    Metrics for end-to-end runs:
+      reaches    - STOP received with the front sonar under reach_cm: (time, item index or None
+                   for a wall, seconds since the previous reach or reset_metrics())
+      latencies  - seconds from the first served frame showing an item to the first forward
+                   MOVE (L == R > 0, the controller starting to verify it)
+      bumps      - times the rover drove into a wall or an item
+    """
+
+    def __init__(self, host="127.0.0.1", port=8888, cam_port=8081, fps=15.0, jpeg_quality=70,
+                 items=3, seed=0, sprites=None, max_bearing=np.pi, reach_cm=15, pickup=True,
+                 wheel_speed=MAX_WHEEL_SPEED, width=640, height=480, **kwargs):
+        super().__init__(host, port, seed=seed, **kwargs)
+        self.rover = Rover(1, width, height)
+        self.rover.max_wheel_speed = wheel_speed
+        self.jpeg_quality = jpeg_quality
+        self.reach_cm = reach_cm
+        self.pickup = pickup
+        self._world_lock = threading.Lock()
+        rng = np.random.default_rng(seed)
+
+        # Items: position, size (m), sprite index; 0.8 - 1.8 m away within max_bearing of the start heading
+        dist = rng.uniform(0.8, 1.8, items)
+        bearing = rng.uniform(-max_bearing, max_bearing, items)
+        self.items = np.stack([dist * np.cos(bearing), dist * np.sin(bearing)], axis=1)
+        self.item_size = rng.uniform(0.08, 0.14, items)
+        self.sprites = sprites or []
+        self.item_sprite = rng.integers(0, max(1, len(self.sprites)), items)
+        self.active = np.ones(items, bool)
+
+        # Far walls as a 360 degree panorama: grey texture (never red), shifted with the heading
+        pano_w = int(round(2 * np.pi * self.rover.focal))
+        tex = cv2.GaussianBlur(rng.integers(40, 200, (height // 2, pano_w), dtype=np.uint8), (0, 0), 4)
+        self.panorama = cv2.merge([tex + 15, tex, tex])
+        rows = np.linspace(90, 150, height - height // 2, dtype=np.uint8)
+        self.floor = np.repeat(np.repeat(rows[:, None], width, axis=1)[..., None], 3, axis=2)
+
+        self._last_step = time.monotonic()
+        self.reaches = []
+        self.latencies = []
+        self.bumps = 0
+        self._touching = False
+        self._sight_t = None
+        self._reacting = False
+        self._since = time.time()
+        self.frames_rendered = 0
+        self.camera = MjpegServer(self.jpeg, host, cam_port, fps)
+
+    # --- world ---
+    def _sensor_poses(self):
+        x, y, theta = self.rover.x[0], self.rover.y[0], self.rover.theta[0]
+        sx = x + SONAR_OFFSET * np.cos(theta)
+        sy = y + SONAR_OFFSET * np.sin(theta)
+        return sx, sy, theta + np.array([0.0, SIDE_SONAR_ANGLE, -SIDE_SONAR_ANGLE])
+
+    def _items_from(self, x, y, heading):
+        """Distance (m) to the near edge and bearing (rad, left positive) of the active items."""
+        d = self.items[self.active] - (x, y)
+        dist = np.hypot(d[:, 0], d[:, 1]) - self.item_size[self.active] / 2
+        bearing = (np.arctan2(d[:, 1], d[:, 0]) - heading + np.pi) % (2 * np.pi) - np.pi
+        return dist, bearing
+
+    def sonar(self):
+        """F, L, R in cm the way SonarManager reports them: walls and items, 100 when nothing is near."""
+        sx, sy, angles = self._sensor_poses()
+        out = []
+        for a in angles:
+            c, s = np.cos(a), np.sin(a)
+            wall = min((ARENA * np.sign(c) - sx) / c if c else np.inf,
+                       (ARENA * np.sign(s) - sy) / s if s else np.inf)
+            dist, bearing = self._items_from(sx, sy, a)
+            hit = dist[np.abs(bearing) < SONAR_CONE]
+            cm = min(wall, hit.min() if len(hit) else np.inf) * 100
+            out.append(int(np.clip(cm, 2, None)) if cm <= SONAR_RANGE_CM else SONAR_NONE_CM)
+        return out
+
+    def _blocked(self):
+        x, y = self.rover.x[0], self.rover.y[0]
+        if max(abs(x), abs(y)) > ARENA - SONAR_OFFSET:
+            return True
+        d = self.items[self.active] - (x, y)
+        return bool((np.hypot(d[:, 0], d[:, 1]) < self.item_size[self.active] / 2 + SONAR_OFFSET).any())
+
+    def step(self):
+        now = time.monotonic()
+        dt = now - self._last_step
+        self._last_step = now
+        with self._world_lock:
+            pose = self.rover.x.copy(), self.rover.y.copy(), self.rover.theta.copy()
+            self.rover.step(*self.motor, dt)
+            if self._blocked():
+                # Wheels spin, the rover does not move
+                self.rover.x, self.rover.y, self.rover.theta = pose
+                if not self._touching:
+                    self.bumps += 1
+                self._touching = True
+            else:
+                self._touching = False
+            self.distances = self.sonar()
+
+    # --- camera ---
+    def render(self):
+        """BGR frame of the current view: panorama walls, floor, items far to near."""
+        rv = self.rover
+        w, h = rv.width, rv.height
+        horizon = h // 2
+        with self._world_lock:
+            x, y, _ = self._sensor_poses()
+            theta = rv.theta[0]
+            dist, bearing = self._items_from(x, y, theta)
+            dist = dist + self.item_size[self.active] / 2     # projection uses the item centre
+            sizes = self.item_size[self.active]
+            sprite_ids = self.item_sprite[self.active]
+
+        # Heading left (theta up) moves the panorama to the right
+        shift = int(round(theta * rv.focal))
+        cols = (np.arange(w) - shift) % self.panorama.shape[1]
+        frame = np.empty((h, w, 3), np.uint8)
+        frame[:horizon] = self.panorama[:, cols]
+        frame[horizon:] = self.floor
+
+        visible = 0
+        for i in np.argsort(-dist):
+            d, b = dist[i], bearing[i]
+            if abs(b) >= FOV / 2 or d >= MAX_RANGE or d < 0.05:
+                continue
+            cx = w / 2 - rv.focal * np.tan(b)
+            size = rv.focal * sizes[i] / d
+            bottom = horizon + rv.focal * CAMERA_HEIGHT / d
+            x1, x2 = int(cx - size / 2), int(cx + size / 2)
+            y1, y2 = int(bottom - size * 1.2), int(bottom)
+            if size >= MIN_SPRITE_PX and x2 > 0 and x1 < w:
+                visible += 1
+            self._draw(frame, x1, y1, x2, y2, sprite_ids[i])
+        self._on_frame(visible)
+        return frame
+
+    def _draw(self, frame, x1, y1, x2, y2, sprite_id):
+        h, w = frame.shape[:2]
+        cx1, cy1, cx2, cy2 = max(x1, 0), max(y1, 0), min(x2, w), min(y2, h)
+        if cx2 <= cx1 or cy2 <= cy1:
+            return
+        if not self.sprites:
+            cv2.rectangle(frame, (cx1, cy1), (cx2 - 1, cy2 - 1), TRASH_COLOR, -1)
+            return
+        sprite = cv2.resize(self.sprites[sprite_id], (x2 - x1, y2 - y1))
+        part = sprite[cy1 - y1:cy2 - y1, cx1 - x1:cx2 - x1]
+        alpha = part[..., 3:].astype(np.float32) / 255
+        roi = frame[cy1:cy2, cx1:cx2]
+        roi[:] = (part[..., :3] * alpha + roi * (1 - alpha)).astype(np.uint8)
+
+    def jpeg(self):
+        frame = self.render()
+        ok, buf = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+        self.frames_rendered += 1
+        return buf.tobytes()
+
+    # --- metrics ---
+    def _on_frame(self, visible):
+        with self._lock:
+            if not visible:
+                # Out of view: the next sighting is a new one
+                self._sight_t = None
+                self._reacting = False
+            elif self._sight_t is None and not self._reacting:
+                self._sight_t = time.time()
+
+    def _record(self, cmd, fmt):
+        super()._record(cmd, fmt)
+        now = time.time()
+        if cmd["cmd"] == "MOVE":
+            L, R = self.motor
+            with self._lock:
+                if L == R > 0 and self._sight_t is not None:
+                    self.latencies.append(now - self._sight_t)
+                    self._sight_t = None
+                    self._reacting = True
+        elif cmd["cmd"] == "STOP" and self.distances[0] <= self.reach_cm:
+            with self._world_lock:
+                sx, sy, angles = self._sensor_poses()
+                dist, bearing = self._items_from(sx, sy, angles[0])
+                ahead = (np.abs(bearing) < SONAR_CONE) & (dist * 100 <= self.reach_cm)
+                item = int(np.flatnonzero(self.active)[ahead][np.argmin(dist[ahead])]) if ahead.any() else None
+                if item is not None and self.pickup:
+                    self.active[item] = False
+            with self._lock:
+                self.reaches.append((now, item, now - self._since))
+                self._since = now
+                self._sight_t = None
+                self._reacting = False
+
+    def reset_metrics(self):
+        """Start timing from now (call when auto mode is switched on)."""
+        with self._lock:
+            self._since = time.time()
+            self._sight_t = None
+            self._reacting = False
+            self.reaches.clear()
+            self.latencies.clear()
+        self.bumps = 0
+
+    def remaining(self):
+        return int(self.active.sum())
+
+    def start(self):
+        self.camera.start()
+        return super().start()
+
+    def stop(self):
+        self.camera.stop()
+        super().stop()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8888)
+    parser.add_argument("--cam-port", type=int, default=8081, help="the real camera uses 81")
+    parser.add_argument("--fps", type=float, default=15.0)
+    parser.add_argument("--jpeg-quality", type=int, default=70)
+    parser.add_argument("--items", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--sprites", help="folder of PNG sprites instead of red blocks")
+    parser.add_argument("--wheel-speed", type=float, default=MAX_WHEEL_SPEED, help="m/s at PWM 255")
+    parser.add_argument("--in-view", action="store_true", help="place the items in front of the rover")
+    parser.add_argument("--delay-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--loss", type=float, default=0.0, help="drop probability for outgoing packets")
+    args = parser.parse_args()
+
+    sim = RoverSim(args.host, args.port, args.cam_port, args.fps, args.jpeg_quality, args.items, args.seed,
+                   load_sprites(args.sprites) if args.sprites else None,
+                   max_bearing=np.radians(25) if args.in_view else np.pi, wheel_speed=args.wheel_speed,
+                   delay=args.delay_ms / 1000, jitter=args.jitter_ms / 1000, loss=args.loss).start()
+    print(f"Rover simulator on {args.host}:{sim.port}, camera at {sim.camera.url}, {args.items} items")
+    try:
+        while True:
+            time.sleep(0.5)
+            rv = sim.rover
+            F, L, R = sim.distances
+            print(f"x={rv.x[0]:5.2f} y={rv.y[0]:5.2f} heading={np.degrees(rv.theta[0]):5.0f}  "
+                  f"motor L={sim.motor[0]:4d} R={sim.motor[1]:4d}  sonar F={F:3d} L={L:3d} R={R:3d}  "
+                  f"reached={len(sim.reaches)} left={sim.remaining()} bumps={sim.bumps}", end="\r")
+    except KeyboardInterrupt:
+        sim.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+# Controller parameter sweep on simulated rovers: every grid point x --repeats random scenes, all at once.
+# Usage: python app/tools/sweep_controller.py [--repeats 50] [--timeout 30] [--fp 0.05] [--check 20]
+#        python app/tools/sweep_controller.py --grid ALIGN_TOLERANCE=20,40,60 --grid CONFIRM_TIME=0.5,1.0
+# VecController steps the auto-mode state machine for all instances per control tick, kinematics.Rover
+# moves them. Detections arrive every --infer-ms with --latency-ms delay, with misses, pixel noise and
+# false positives. --check runs that many scalar RobotControllers on a VirtualClock alongside and
+# verifies they issue exactly the same commands.
+import argparse
+import contextlib
+import io
+import itertools
+import os
+import sys
+import time
+from collections import deque
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from inference import detections as det
+from clock import VirtualClock
+from kinematics import Rover
+from robot_controller import RobotController
+from vec_controller import VecController, REACHED
+
+DEFAULT_GRID = {
+    "ALIGN_TOLERANCE": [10, 20, 40, 60, 80],
+    "TURN_SENSITIVITY": [0.05, 0.1, 0.2, 0.4],
+    "CONFIRM_TIME": [0.3, 0.6, 1.0, 1.5],
+}
+
+
+def parse_grid(items):
+    grid = {}
+    for item in items:
+        name, _, values = item.partition("=")
+        grid[name] = [float(v) for v in values.split(",")]
+    return grid or DEFAULT_GRID
+
+
+def detect(rover, rng, miss, noise, fp):
+    """One inference result per rover: (seen, conf, center_x) as the controller would get from det.best()."""
+    visible, cx, box_w = rover.camera()
+    seen = visible & (rng.random(rover.n) >= miss)
+    conf = np.where(seen, rng.uniform(0.45, 0.9, rover.n), 0.0)
+    cx = cx + rng.normal(0, noise, rover.n)
+    # False positives: a low-confidence box somewhere, wins only when the real target is not seen
+    ghost = (rng.random(rover.n) < fp) & ~seen
+    conf = np.where(ghost, rng.uniform(0.2, 0.4, rover.n), conf)
+    cx = np.where(ghost, rng.uniform(0, rover.width, rover.n), cx)
+    # Quantize the way a DETECTION_DTYPE row does (float32 corners, float32 centre)
+    x1 = (cx - box_w / 2).astype(np.float32)
+    x2 = (cx + box_w / 2).astype(np.float32)
+    center = ((x1 + x2) * np.float32(0.5)).astype(np.float64)
+    return seen | ghost, conf.astype(np.float32).astype(np.float64), center, x1, x2
+
+
+def simulate(params, n, args, seed=0):
+    rng = np.random.default_rng(seed)
+    rover = Rover(n)
+    rover.place_targets(rng, max_bearing=np.pi if args.search else np.radians(25), scenes=args.repeats)
+    ctl = VecController(n, **params)
+    ctl.enable_search(np.full(n, args.search), 0.0)
+
+    # Cross-checked instances spread over the whole grid
+    checked = np.unique(np.linspace(0, n - 1, min(args.check, n)).astype(int)) if args.check else []
+    clocks = [VirtualClock() for _ in checked]
+    scalars = [RobotController(clock=c) for c in clocks]
+    for i, sc in zip(checked, scalars):
+        sc.apply_params({k: (v[i] if np.ndim(v) else v) for k, v in params.items()})
+        if args.search:
+            sc.enable_search(True)
+    mismatches = 0
+
+    dt = args.tick_ms / 1000
+    infer_every = max(1, round(args.infer_ms / args.tick_ms))
+    delay = max(0, round(args.latency_ms / args.tick_ms))
+    pending = deque()
+    reach_time = np.full(n, np.nan)
+    L = np.zeros(n, np.int64)
+    R = np.zeros(n, np.int64)
+
+    steps = int(args.timeout / dt)
+    for k in range(1, steps + 1):
+        now = k * dt
+        active = np.isnan(reach_time)
+        rover.step(np.where(active, L, 0), np.where(active, R, 0), dt)
+        if k % infer_every == 0:
+            pending.append((k + delay, detect(rover, rng, args.miss, args.noise, args.fp)))
+        while pending and pending[0][0] <= k:
+            _, (seen, conf, cx, x1, x2) = pending.popleft()
+            ctl.update_detection(seen & active, conf, cx, now)
+            for i, sc, clock in zip(checked, scalars, clocks):
+                clock.set(now)
+                if seen[i] and active[i]:
+                    sc.update_detection(det.from_boxes([[x1[i], 200, x2[i], 280, conf[i], 0]]))
+
+        sonar = rover.sonar()
+        ctl.update_sensors(sonar)
+        L, R = ctl.compute_control(now)
+        for i, sc, clock in zip(checked, scalars, clocks):
+            if not active[i]:
+                continue
+            clock.set(now)
+            sc.update_sensors(sonar[i], 0, 0)
+            sl, sr, _ = sc.compute_control()
+            mismatches += (sl, sr) != (L[i], R[i])
+        reach_time[active & (ctl.state == REACHED)] = now
+        if not np.isnan(reach_time).any():
+            break
+
+    dist, bearing = rover.relative()
+    # Reached and actually facing the object (the sonar cone can also be hit at an angle)
+    success = ~np.isnan(reach_time) & (np.abs(bearing) < np.radians(10))
+    return reach_time, success, rover.odometer, mismatches, len(checked)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--grid", action="append", default=[], metavar="NAME=V1,V2,...")
+    parser.add_argument("--repeats", type=int, default=50, help="random scenes per grid point")
+    parser.add_argument("--timeout", type=float, default=30.0, help="simulated seconds per run")
+    parser.add_argument("--tick-ms", type=float, default=50.0, help="auto loop period (auto_timer)")
+    parser.add_argument("--infer-ms", type=float, default=100.0, help="inference period")
+    parser.add_argument("--latency-ms", type=float, default=100.0, help="capture -> detection delay")
+    parser.add_argument("--miss", type=float, default=0.15, help="probability a visible target is missed")
+    parser.add_argument("--noise", type=float, default=6.0, help="detector centre noise, px")
+    parser.add_argument("--fp", type=float, default=0.05, help="false positive probability per frame")
+    parser.add_argument("--no-search", dest="search", action="store_false", help="targets start in view")
+    parser.add_argument("--check", type=int, default=20, help="scalar controllers to cross-check")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    grid = parse_grid(args.grid)
+    names = list(grid)
+    combos = list(itertools.product(*grid.values()))
+    n = len(combos) * args.repeats
+    # Instance i runs grid point i // repeats in scene i % repeats
+    params = {name: np.repeat([c[j] for c in combos], args.repeats) for j, name in enumerate(names)}
+
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):  # the scalar controllers print every transition
+        reach, success, odo, mismatches, checked = simulate(params, n, args)
+    wall = time.perf_counter() - t0
+
+    reach = reach.reshape(len(combos), args.repeats)
+    success = success.reshape(len(combos), args.repeats)
+    odo = odo.reshape(len(combos), args.repeats)
+    rate = success.mean(axis=1)
+    with np.errstate(all="ignore"):
+        mean_t = np.nanmean(np.where(success, reach, np.nan), axis=1)
+        p90_t = np.nanpercentile(np.where(success, reach, np.nan), 90, axis=1)
+
+    print(f"{len(combos)} grid points x {args.repeats} scenes = {n} rovers, {args.timeout:.0f}s simulated each, "
+          f"{wall:.1f}s wall ({n * args.timeout / wall / 3600:.0f} rover-hours per second)")
+    print(f"search {'on' if args.search else 'off'}, inference {args.infer_ms:.0f}ms + {args.latency_ms:.0f}ms latency, "
+          f"miss {args.miss:.0%}, noise {args.noise}px, false positives {args.fp:.0%}")
+    if checked:
+        print(f"scalar cross-check on {checked} rovers: {mismatches} command mismatches")
+
+    order = sorted(range(len(combos)), key=lambda i: (-rate[i], np.nan_to_num(mean_t[i], nan=1e9)))
+    defaults = RobotController().params()
+    baseline = tuple(defaults[name] for name in names)
+    header = " ".join(f"{name:>16}" for name in names)
+    print(f"\n{header} {'success':>8} {'mean s':>7} {'p90 s':>6} {'path m':>7}")
+    shown = order[:args.top] + [i for i in order[args.top:] if combos[i] == baseline]
+    for i in shown:
+        mark = "  <- current defaults" if combos[i] == baseline else ""
+        values = " ".join(f"{v:>16g}" for v in combos[i])
+        print(f"{values} {rate[i]:>8.0%} {mean_t[i]:>7.1f} {p90_t[i]:>6.1f} {odo[i].mean():>7.2f}{mark}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -39,6 +39,71 @@ WiFiUDP udp;
 char packetBuffer[512];
 unsigned long lastCmdTime = 0;
 
+// Binary protocol (see app/src/protocol.py). Enabled once the app sends HELLO,
+// JSON stays supported for older app versions.
+#define PROTO_MAGIC 0xAB
+#define PROTO_VERSION 1
+#define PROTO_HEADER 9
+#define MSG_HELLO 0x01
+#define MSG_HELLO_ACK 0x02
+#define MSG_MOVE 0x10
+#define MSG_STOP 0x11
+#define MSG_SPEAK 0x12
+#define MSG_TELEMETRY 0x20
+#define MSG_PING 0x30
+#define MSG_PONG 0x31
+
+bool useBinary = false;
+uint16_t txSeq = 0;
+
+uint16_t crc16(const uint8_t *data, int len)
+{
+  uint16_t crc = 0xFFFF;
+  for (int i = 0; i < len; i++)
+  {
+    crc ^= (uint16_t)data[i] << 8;
+    for (int b = 0; b < 8; b++)
+      crc = (crc & 0x8000) ? (crc << 1) ^ 0x1021 : crc << 1;
+  }
+  return crc;
+}
+
+int16_t readI16(const uint8_t *p) { return (int16_t)(p[0] | (p[1] << 8)); }
+
+void writeU16(uint8_t *p, uint16_t v)
+{
+  p[0] = v & 0xFF;
+  p[1] = v >> 8;
+}
+
+// Header + payload + CRC into buf, returns packet length
+int packMessage(uint8_t *buf, uint8_t type, const uint8_t *payload, int payloadLen)
+{
+  uint32_t now = millis();
+  buf[0] = PROTO_MAGIC;
+  buf[1] = PROTO_VERSION;
+  buf[2] = type;
+  writeU16(buf + 3, ++txSeq);
+  buf[5] = now & 0xFF;
+  buf[6] = (now >> 8) & 0xFF;
+  buf[7] = (now >> 16) & 0xFF;
+  buf[8] = (now >> 24) & 0xFF;
+  memcpy(buf + PROTO_HEADER, payload, payloadLen);
+  int len = PROTO_HEADER + payloadLen;
+  writeU16(buf + len, crc16(buf, len));
+  return len + 2;
+}
+
+void sendPacket(const uint8_t *buf, int len)
+{
+  if (udp.remoteIP() != IPAddress(0, 0, 0, 0) && udp.remotePort() > 0)
+  {
+    udp.beginPacket(udp.remoteIP(), udp.remotePort());
+    udp.write(buf, len);
+    udp.endPacket();
+  }
+}
+
 void setMotor(int speedL, int speedR)
 {
   if (speedL > 0)
@@ -79,6 +144,63 @@ void setMotor(int speedL, int speedR)
   analogWrite(ENB, constrain(speedR, 0, 255));
 }
 
+void playSound(const char *filename);
+
+// Returns false if the packet is not a valid binary message
+bool handleBinary(const uint8_t *buf, int len)
+{
+  if (len < PROTO_HEADER + 2 || buf[0] != PROTO_MAGIC || buf[1] != PROTO_VERSION)
+    return false;
+  uint16_t crc = buf[len - 2] | (buf[len - 1] << 8);
+  if (crc16(buf, len - 2) != crc)
+    return false;
+
+  const uint8_t *payload = buf + PROTO_HEADER;
+  int payloadLen = len - PROTO_HEADER - 2;
+
+  useBinary = true;
+  switch (buf[2])
+  {
+  case MSG_HELLO:
+  {
+    uint8_t version = PROTO_VERSION;
+    uint8_t out[16];
+    sendPacket(out, packMessage(out, MSG_HELLO_ACK, &version, 1));
+    return true;
+  }
+  case MSG_PING:
+  {
+    // Echo seq + timestamp of the probe; does not feed the failsafe
+    uint8_t out[PROTO_HEADER + 6 + 2];
+    sendPacket(out, packMessage(out, MSG_PONG, buf + 3, 6));
+    return true;
+  }
+  case MSG_MOVE:
+    if (payloadLen != 4)
+      return false;
+    lastCmdTime = millis();
+    setMotor(readI16(payload), readI16(payload + 2));
+    return true;
+  case MSG_STOP:
+    lastCmdTime = millis();
+    setMotor(0, 0);
+    return true;
+  case MSG_SPEAK:
+  {
+    if (payloadLen < 1 || payload[0] + 1 > payloadLen)
+      return false;
+    char name[65];
+    int n = min((int)payload[0], 64);
+    memcpy(name, payload + 1, n);
+    name[n] = 0;
+    lastCmdTime = millis();
+    playSound(name);
+    return true;
+  }
+  }
+  return false;
+}
+
 void playSound(const char *filename)
 {
   Serial.printf("Request: %s\n", filename);
@@ -235,20 +357,28 @@ void loop()
     if (len > 0)
       packetBuffer[len] = 0;
 
-    StaticJsonDocument<256> doc;
-    DeserializationError error = deserializeJson(doc, packetBuffer);
-
-    if (!error)
+    if (len > 0 && (uint8_t)packetBuffer[0] == PROTO_MAGIC)
+    {
+      handleBinary((const uint8_t *)packetBuffer, len);
+    }
+    else
     {
-      lastCmdTime = millis();
-      const char *cmd = doc["cmd"];
-
-      if (strcmp(cmd, "MOVE") == 0)
-        setMotor(doc["L"], doc["R"]);
-      else if (strcmp(cmd, "SPEAK") == 0)
-        playSound(doc["file"]);
-      else if (strcmp(cmd, "STOP") == 0)
-        setMotor(0, 0);
+      StaticJsonDocument<256> doc;
+      DeserializationError error = deserializeJson(doc, packetBuffer);
+
+      if (!error)
+      {
+        useBinary = false; // JSON-only app, answer in JSON
+        lastCmdTime = millis();
+        const char *cmd = doc["cmd"];
+
+        if (strcmp(cmd, "MOVE") == 0)
+          setMotor(doc["L"], doc["R"]);
+        else if (strcmp(cmd, "SPEAK") == 0)
+          playSound(doc["file"]);
+        else if (strcmp(cmd, "STOP") == 0)
+          setMotor(0, 0);
+      }
     }
   }
 
@@ -257,19 +387,25 @@ void loop()
   if (millis() - lastSendTime > 150)
   {
     lastSendTime = millis();
-    StaticJsonDocument<128> docOut;
-    docOut["F"] = sharedDistF;
-    docOut["L"] = sharedDistL;
-    docOut["R"] = sharedDistR;
-
-    char outputBuffer[128];
-    serializeJson(docOut, outputBuffer);
-
-    if (udp.remoteIP() != IPAddress(0, 0, 0, 0) && udp.remotePort() > 0)
+    if (useBinary)
+    {
+      uint8_t payload[6];
+      writeU16(payload, (uint16_t)sharedDistF);
+      writeU16(payload + 2, (uint16_t)sharedDistL);
+      writeU16(payload + 4, (uint16_t)sharedDistR);
+      uint8_t out[PROTO_HEADER + 6 + 2];
+      sendPacket(out, packMessage(out, MSG_TELEMETRY, payload, 6));
+    }
+    else
     {
-      udp.beginPacket(udp.remoteIP(), udp.remotePort());
-      udp.write((const uint8_t *)outputBuffer, strlen(outputBuffer));
-      udp.endPacket();
+      StaticJsonDocument<128> docOut;
+      docOut["F"] = sharedDistF;
+      docOut["L"] = sharedDistL;
+      docOut["R"] = sharedDistR;
+
+      char outputBuffer[128];
+      serializeJson(docOut, outputBuffer);
+      sendPacket((const uint8_t *)outputBuffer, strlen(outputBuffer));
     }
   }
 